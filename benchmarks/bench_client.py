@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Measures the hot paths of VisionControllerClient against a FakeVisionManager on the loopback interface
+#
+# Usage: python benchmarks/bench_client.py [--iterations N] [--pipelined] [--codec NAME] [--output FILE] [--baseline FILE] [--tolerance RATIO]
+#
+# Benchmarks:
+#   executecommand/<command>        round trip latency of _ExecuteCommand
+#   images/<size>                   GetLatestDetectionResultImages throughput for images of the given size
+#   publishedstate/<slaves>         decoding cost of GetPublishedServerState for the given number of slaves
+#   processresponse/<response>      cost of _ProcessResponse on canned responses, with and without a command hook
+#
+# Every benchmark reports p50 and p99 in microseconds and ops/s. With --output the results are written as json, with --baseline they are compared with the json of an earlier run,
+# e.g. of the previous release, and the script exits with 1 if any benchmark got slower by more than the tolerance.
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import zmq
+
+from mujinvisioncontrollerclient.codec import GetCodec
+from mujinvisioncontrollerclient.commandhooks import CommandEvent, CommandHook
+from mujinvisioncontrollerclient.commandstatistics import CommandStatistics
+from mujinvisioncontrollerclient.fakevisionmanager import FakeVisionManager
+from mujinvisioncontrollerclient.version import __version__
+from mujinvisioncontrollerclient.visioncontrollerclient import VisionControllerClient
+
+_imageSizes = (64 * 1024, 1024 * 1024, 4 * 1024 * 1024)
+_slaveCounts = (1, 16, 64, 256)
+
+
+class _DecodeTimeHook(CommandHook):
+    """Collects decodeUS and responseBytes of the published states received by GetPublishedServerState."""
+
+    def __init__(self):
+        self.decodeUS = []
+        self.responseBytes = 0
+
+    def OnAfterReceive(self, event, context):
+        if event.decodeUS is not None:
+            self.decodeUS.append(event.decodeUS)
+            self.responseBytes = event.responseBytes
+
+
+def _Percentile(sortedSamples, percentile):
+    return sortedSamples[min(len(sortedSamples) - 1, int(percentile / 100.0 * len(sortedSamples)))]
+
+
+def _Summarize(samplesUS, elapsed=None, numBytes=None):
+    """Returns p50US, p99US, meanUS and opsPerSecond of the samples. opsPerSecond is computed from elapsed, the wall time of the whole run, when given, so that it includes the time between the samples."""
+    samplesUS = sorted(samplesUS)
+    meanUS = float(sum(samplesUS)) / len(samplesUS)
+    if elapsed is None:
+        elapsed = sum(samplesUS) / 1e6
+    summary = {
+        'count': len(samplesUS),
+        'p50US': _Percentile(samplesUS, 50),
+        'p99US': _Percentile(samplesUS, 99),
+        'meanUS': meanUS,
+        'opsPerSecond': len(samplesUS) / elapsed if elapsed > 0 else None,
+    }
+    if numBytes is not None:
+        summary['bytes'] = numBytes
+        summary['megabytesPerSecond'] = summary['opsPerSecond'] * numBytes / 1e6 if summary['opsPerSecond'] else None
+    return summary
+
+
+def _Measure(fn, iterations, warmup=10):
+    for _ in range(warmup):
+        fn()
+    samplesUS = []
+    starttime = time.perf_counter()
+    for _ in range(iterations):
+        commandstarttime = time.perf_counter()
+        fn()
+        samplesUS.append((time.perf_counter() - commandstarttime) * 1e6)
+    return samplesUS, time.perf_counter() - starttime
+
+
+def _PrintResult(name, summary):
+    print('%-40s %10.1f %10.1f %12.1f' % (name, summary['p50US'], summary['p99US'], summary['opsPerSecond'] or 0))
+
+
+def _BenchExecuteCommand(options, ctx, results):
+    with FakeVisionManager(ctx=ctx, codec=options.codec, initialTaskIds=('task0',), detectionInterval=0.05) as server:
+        client = VisionControllerClient(commandport=server.commandport, ctx=ctx, slaverequestid='bench', pipelined=options.pipelined, codec=options.codec)
+        try:
+            for name, fn in (
+                ('Ping', lambda: client._ExecuteCommand({'command': 'Ping'})),
+                ('GetLatestDetectedObjects', lambda: client._ExecuteCommand({'command': 'GetLatestDetectedObjects', 'taskId': 'task0'})),
+            ):
+                samplesUS, elapsed = _Measure(fn, options.iterations)
+                results['executecommand/%s' % name] = _Summarize(samplesUS, elapsed)
+        finally:
+            client.Destroy()
+
+
+def _BenchImages(options, ctx, results):
+    for imageSize in _imageSizes:
+        # the newest result is returned right away, so the rate of the detection results does not matter
+        with FakeVisionManager(ctx=ctx, codec=options.codec, initialTaskIds=('task0',), imageSize=imageSize, numImages=2, detectionInterval=0.05) as server:
+            client = VisionControllerClient(commandport=server.commandport, ctx=ctx, slaverequestid='bench', pipelined=options.pipelined, codec=options.codec)
+            try:
+                numBytes = len(client.GetLatestDetectionResultImages(taskId='task0', zerocopy=True))
+                iterations = max(20, options.iterations * 64 * 1024 // imageSize)
+                samplesUS, elapsed = _Measure(lambda: client.GetLatestDetectionResultImages(taskId='task0', zerocopy=True), iterations)
+                results['images/%dKiB' % (imageSize // 1024)] = _Summarize(samplesUS, elapsed, numBytes=numBytes)
+            finally:
+                client.Destroy()
+
+
+def _BenchPublishedState(options, ctx, results):
+    for numSlaves in _slaveCounts:
+        # every call waits for the next published state, so only the time spent decoding it is measured
+        with FakeVisionManager(ctx=ctx, codec=options.codec, initialTaskIds=('task0',), numExtraSlaves=numSlaves - 1, publishInterval=0.002) as server:
+            client = VisionControllerClient(commandport=server.commandport, ctx=ctx, slaverequestid='bench', codec=options.codec)
+            hook = _DecodeTimeHook()
+            try:
+                client.Ping()  # registers the slave with the server
+                client.AddCommandHook(hook)
+                iterations = max(20, options.iterations // 4)
+                while len(hook.decodeUS) < iterations:
+                    client.GetPublishedServerState(timeout=1.0)
+                results['publishedstate/%d' % numSlaves] = _Summarize(hook.decodeUS[:iterations], numBytes=hook.responseBytes)
+            finally:
+                client.Destroy()
+
+
+def _BenchProcessResponse(options, ctx, results):
+    codec = GetCodec(options.codec)
+    detectedObjectsCommand = {'command': 'GetLatestDetectedObjects', 'taskId': 'task0'}
+    with FakeVisionManager(ctx=ctx, codec=options.codec, initialTaskIds=('task0',), numDetectedObjects=50) as server:
+        client = VisionControllerClient(commandport=server.commandport, ctx=ctx, slaverequestid='bench', codec=options.codec)
+        try:
+            client.WaitForNewDetectedObjects(taskId='task0', timeout=5.0)
+            detectedObjects = codec.Encode(client.GetLatestDetectedObjects(taskId='task0'))
+        finally:
+            client.Destroy()
+    images = bytes(1024 * 1024)
+    responses = (
+        ('detectedobjects', detectedObjectsCommand, detectedObjects, True),
+        ('images', {'command': 'GetLatestDetectionResultImages'}, images, False),
+        ('ping', {'command': 'Ping'}, codec.Encode({'timestamp': 1700000000000}), True),
+    )
+    # no server is needed, the canned responses are handed to _ProcessResponse directly
+    client = VisionControllerClient(commandport=1, ctx=ctx, codec=options.codec)
+    statistics = CommandStatistics()
+    try:
+        for name, command, response, recvjson in responses:
+            samplesUS, elapsed = _Measure(lambda: client._ProcessResponse(response, command=command, recvjson=recvjson), options.iterations)
+            results['processresponse/%s' % name] = _Summarize(samplesUS, elapsed, numBytes=len(response))
+            samplesUS, elapsed = _Measure(lambda: client._ProcessResponse(response, command=command, recvjson=recvjson, event=CommandEvent((statistics,), command['command'], 'command', command)), options.iterations)
+            results['processresponse/%s+hook' % name] = _Summarize(samplesUS, elapsed, numBytes=len(response))
+    finally:
+        client.Destroy()
+
+
+def _Compare(report, baseline, tolerance):
+    """Prints the benchmarks whose p50 grew or whose ops/s dropped by more than tolerance compared with the baseline. Returns the number of regressions."""
+    numRegressions = 0
+    print('')
+    for key in ('codec', 'pipelined'):
+        if baseline.get('metadata', {}).get(key) != report['metadata'][key]:
+            print('warning: baseline was run with %s=%r, this run with %s=%r' % (key, baseline.get('metadata', {}).get(key), key, report['metadata'][key]))
+    results = report['results']
+    print('%-40s %10s %10s %10s' % ('compared with baseline', 'p50', 'ops/s', ''))
+    for name, summary in results.items():
+        baselineSummary = baseline.get('results', {}).get(name)
+        if baselineSummary is None:
+            continue
+        p50Ratio = summary['p50US'] / baselineSummary['p50US'] if baselineSummary['p50US'] else 1.0
+        opsRatio = summary['opsPerSecond'] / baselineSummary['opsPerSecond'] if baselineSummary.get('opsPerSecond') and summary['opsPerSecond'] else 1.0
+        regressed = p50Ratio > 1.0 + tolerance or opsRatio < 1.0 / (1.0 + tolerance)
+        if regressed:
+            numRegressions += 1
+        print('%-40s %9.2fx %9.2fx %10s' % (name, p50Ratio, opsRatio, 'REGRESSED' if regressed else ''))
+    return numRegressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--pipelined', action='store_true', help='send the commands through a PipelinedCommandChannel instead of REQ sockets')
+    parser.add_argument('--codec', default=None, help='codec of the client and the server, see codec.GetCodec')
+    parser.add_argument('--benchmarks', default='executecommand,images,publishedstate,processresponse', help='comma separated benchmarks to run')
+    parser.add_argument('--output', default=None, help='json file to write the results to')
+    parser.add_argument('--baseline', default=None, help='json file written by an earlier run to compare the results with')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='relative slowdown reported as a regression (Default: 0.2)')
+    options = parser.parse_args()
+
+    benchmarkfns = {
+        'executecommand': _BenchExecuteCommand,
+        'images': _BenchImages,
+        'publishedstate': _BenchPublishedState,
+        'processresponse': _BenchProcessResponse,
+    }
+    ctx = zmq.Context()
+    results = {}
+    try:
+        print('%-40s %10s %10s %12s' % ('benchmark', 'p50 (us)', 'p99 (us)', 'ops/s'))
+        for benchmarkName in options.benchmarks.split(','):
+            benchmarkResults = {}
+            benchmarkfns[benchmarkName](options, ctx, benchmarkResults)
+            for name, summary in benchmarkResults.items():
+                _PrintResult(name, summary)
+            results.update(benchmarkResults)
+    finally:
+        ctx.destroy(linger=0)
+
+    report = {
+        'metadata': {
+            'version': __version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'zmq': zmq.zmq_version(),
+            'codec': GetCodec(options.codec).name,
+            'pipelined': options.pipelined,
+            'iterations': options.iterations,
+            'timestamp': int(time.time()),
+        },
+        'results': results,
+    }
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+        if _Compare(report, baseline, options.tolerance) > 0:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Compares the codecs on payloads shaped like the ones exchanged with the vision manager
+#
+# Usage: python benchmarks/bench_codec.py [--iterations N] [--numObjects N] [--numSlaves N]
+
+import argparse
+import random
+import timeit
+
+from mujinvisioncontrollerclient.codec import GetAvailableCodecNames, GetCodec
+
+
+def _MakeDetectedObjectsResponse(numObjects):
+    random.seed(0)
+    objects = []
+    for index in range(numObjects):
+        objects.append({
+            'name': 'detected_%d' % index,
+            'object_uri': 'mujin:/box0.mujin.dae',
+            'translation_': [random.uniform(-500, 500) for _ in range(3)],
+            'quat_': [random.uniform(-1, 1) for _ in range(4)],
+            'confidence': {'global_confidence': random.random(), 'confidence': random.random()},
+            'sensortimestamp': 1700000000000 + index,
+            'isPickable': bool(index % 2),
+            'extra': {'type': 'box', 'sizeXYZ': [300.0, 200.0, 150.0]},
+        })
+    return {
+        'objects': objects,
+        'statistics': {'numDetectedObjects': numObjects, 'detectionTimeMS': 123.4},
+        'detectionResultState': {'taskId': 'task0', 'cycleIndex': 'cycle0', 'isFinal': True, 'resultTimestamp': 1700000000000},
+    }
+
+
+def _MakePublishedState(numSlaves):
+    slavestates = {}
+    for index in range(numSlaves):
+        slavestates['slaverequestid-slave%d' % index] = {
+            'taskId': 'task%d' % index,
+            'taskStatus': 'Active',
+            'detectionResultTimestamps': list(range(50)),
+            'statistics': {'cycle%d' % cycle: {'elapsedTime': cycle * 0.1, 'numDetectedObjects': cycle} for cycle in range(20)},
+        }
+    return {'timestamp': 1700000000000, 'tasks': [{'taskId': 'task0'}], 'slavestates': slavestates}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--numObjects', type=int, default=100, help='number of objects in the GetLatestDetectedObjects response')
+    parser.add_argument('--numSlaves', type=int, default=16, help='number of slaves in the published state')
+    options = parser.parse_args()
+
+    command = {'command': 'GetLatestDetectedObjects', 'taskId': 'task0', 'cycleIndex': 'cycle0', 'taskType': 'objectdetection', 'slaverequestid': 'slave0'}
+    payloads = [
+        ('command', command),
+        ('detectedobjects', _MakeDetectedObjectsResponse(options.numObjects)),
+        ('publishedstate', _MakePublishedState(options.numSlaves)),
+    ]
+    print('%-10s %-16s %10s %12s %12s' % ('codec', 'payload', 'bytes', 'encode (us)', 'decode (us)'))
+    for name in GetAvailableCodecNames():
+        codec = GetCodec(name)
+        for payloadName, payload in payloads:
+            data = codec.Encode(payload)
+            encodeTime = min(timeit.repeat(lambda: codec.Encode(payload), number=options.iterations, repeat=3)) / options.iterations
+            decodeTime = min(timeit.repeat(lambda: codec.Decode(data), number=options.iterations, repeat=3)) / options.iterations
+            print('%-10s %-16s %10d %12.1f %12.1f' % (name, payloadName, len(data), encodeTime * 1e6, decodeTime * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Compares decoding the whole published server state with decoding only one slave entry
+#
+# Usage: python benchmarks/bench_publishedstatedecode.py [--iterations N]
+
+import argparse
+import json
+import timeit
+
+from mujinvisioncontrollerclient.publishedstatedecoder import DecodePartialServerState, DecodeSlaveState
+
+
+def _MakeServerState(numSlaves):
+    slavestates = {}
+    for index in range(numSlaves):
+        slavestates['slaverequestid-slave%d' % index] = {
+            'taskId': 'task%d' % index,
+            'taskType': 'objectdetection',
+            'taskStatus': 'Active',
+            'detectionResultTimestamps': list(range(50)),
+            'statistics': {'cycle%d' % cycle: {'elapsedTime': cycle * 0.1, 'numDetectedObjects': cycle} for cycle in range(20)},
+        }
+    return json.dumps({'timestamp': 1, 'tasks': [{'taskId': 'task0'}], 'slavestates': slavestates}).encode('utf-8')
+
+
+def _FullDecode(rawServerState, slaverequestid):
+    return json.loads(rawServerState)['slavestates'].get('slaverequestid-%s' % slaverequestid)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=200)
+    options = parser.parse_args()
+
+    print('%8s %10s %14s %14s %14s' % ('slaves', 'bytes', 'full (us)', 'slave (us)', 'partial (us)'))
+    for numSlaves in (1, 4, 16, 64, 256):
+        rawServerState = _MakeServerState(numSlaves)
+        # look up the last slave, the worst case for the selective decoder
+        slaverequestid = 'slave%d' % (numSlaves - 1)
+        assert DecodeSlaveState(rawServerState, slaverequestid) == _FullDecode(rawServerState, slaverequestid)
+        results = []
+        for fn in (
+            lambda: _FullDecode(rawServerState, slaverequestid),
+            lambda: DecodeSlaveState(rawServerState, slaverequestid),
+            lambda: DecodePartialServerState(rawServerState, slaverequestid),
+        ):
+            results.append(min(timeit.repeat(fn, number=options.iterations, repeat=3)) / options.iterations * 1e6)
+        print('%8d %10d %14.1f %14.1f %14.1f' % (numSlaves, len(rawServerState), results[0], results[1], results[2]))
+
+
+if __name__ == '__main__':
+    main()
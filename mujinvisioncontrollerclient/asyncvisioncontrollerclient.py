@@ -0,0 +1,620 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Mujin vision controller client for bin picking task, asyncio version
+#
+# AsyncVisionControllerClient mirrors the commands of VisionControllerClient with the same signatures, but awaits the replies on the asyncio event loop
+# instead of blocking a thread. Two parts of the design differ from the sync client on purpose:
+#
+# - mujinplanningclient.zmqclient.ZmqClient is a blocking socket and cannot be awaited, so commands go through _AsyncZmqSocketPool, a small pool of
+#   zmq.asyncio REQ sockets per endpoint. Each awaiting command takes a socket out of the pool for one request and reply, which lets up to limit commands
+#   run concurrently on one endpoint. A socket whose reply did not arrive is closed instead of being returned, since a REQ socket cannot send again until
+#   it received the reply.
+# - There are no command hooks. Replies are decoded and their errors raised by codec.DecodeResponse, the same function as in the sync client, so both
+#   raise the same errors for the same replies without importing visioncontrollerclient, which would pull in mujinplanningclient.
+
+# system imports
+import asyncio
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Union # noqa: F401 # used in type check
+    import mujinvisiontypes as types
+    from .codec import Codec # noqa: F401 # used in type check
+
+# mujin imports
+from . import VisionControllerClientError, VisionControllerTimeoutError
+from . import zmq
+from . import ugettext as _
+from .codec import DecodeResponse, GetCodec
+import zmq.asyncio
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+
+class _AsyncZmqSocketPool(object):
+    """Pool of REQ sockets connected to one endpoint, so that up to limit commands can be awaited concurrently.
+
+    A REQ socket is in an undefined state once a request was sent and the reply was not received, so sockets that timed out or whose waiting task was cancelled are closed instead of being returned to the pool.
+    """
+
+    _ctx = None  # type: Optional[zmq.asyncio.Context]
+    _url = None  # type: Optional[str]
+    _limit = 3  # type: int
+    _idle = None  # type: Optional[List[zmq.asyncio.Socket]] # sockets ready for a new request
+    _numsockets = 0  # type: int # number of sockets created and not yet closed, including idle ones
+    _condition = None  # type: Optional[asyncio.Condition]
+
+    def __init__(self, url, ctx, limit=3):
+        # type: (str, zmq.asyncio.Context, int) -> None
+        self._url = url
+        self._ctx = ctx
+        self._limit = limit
+        self._idle = []
+        self._numsockets = 0
+        self._condition = None
+
+    def _GetCondition(self):
+        # type: () -> asyncio.Condition
+        # created lazily so that the pool is bound to the loop that actually uses it
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def AcquireSocket(self):
+        # type: () -> zmq.asyncio.Socket
+        condition = self._GetCondition()
+        async with condition:
+            while not self._idle and self._numsockets >= self._limit:
+                await condition.wait()
+            if self._idle:
+                return self._idle.pop()
+            socket = self._ctx.socket(zmq.REQ)
+            socket.setsockopt(zmq.LINGER, 100)
+            socket.connect(self._url)
+            self._numsockets += 1
+            return socket
+
+    async def ReleaseSocket(self, socket, reuse=True):
+        # type: (zmq.asyncio.Socket, bool) -> None
+        condition = self._GetCondition()
+        async with condition:
+            if reuse and self._idle is not None:
+                self._idle.append(socket)
+            else:
+                socket.close()
+                self._numsockets -= 1
+            condition.notify()
+
+    def Destroy(self):
+        # type: () -> None
+        if self._idle is not None:
+            for socket in self._idle:
+                socket.close(linger=0)
+            self._idle = None
+
+
+class AsyncVisionControllerClient(object):
+    """Mujin Vision Controller client for binpicking tasks, with awaitable commands.
+
+    Every command waits on the zmq sockets through the asyncio event loop, so one process can drive many vision managers concurrently without one thread per client. Error semantics match VisionControllerClient: errors returned by the vision manager raise VisionControllerClientError, and commands that do not get a reply in time raise VisionControllerTimeoutError.
+    """
+
+    _ctx = None  # type: Optional[zmq.asyncio.Context] # zeromq context to use
+    _ctxown = None  # type: Optional[zmq.asyncio.Context]
+    # if owning the zeromq context, need to destroy it once done, so this value is set
+    hostname = None  # type: Optional[str] # hostname of vision controller
+    commandport = None  # type: Optional[int] # command port of vision controller
+    configurationport = None  # type: Optional[int] # configuration port of vision controller, usually command port + 2
+    statusport = None  # type: Optional[int] # status publishing port of vision manager, usually command port + 1
+
+    _commandsocket = None  # type: Optional[_AsyncZmqSocketPool]
+    _configurationsocket = None  # type: Optional[_AsyncZmqSocketPool]
+
+    _callerid = None # the callerid to send to vision
+    _subscriber = None  # type: Optional[zmq.asyncio.Socket] # SUB socket used for subscribing to the state
+    _slaverequestid = None # slave request id used when calling vision manager master to route to the correct vision manager slave
+    _codec = None  # type: Optional[Codec] # encodes commands and decodes responses and published states
+    _deprecated = None # used to mark arguments as deprecated (set argument default value to this)
+
+    def __init__(self, hostname='127.0.0.1', commandport=7004, ctx=None, callerid=None, slaverequestid=None, codec=None):
+        # type: (str, int, Optional[zmq.asyncio.Context], Optional[str], Optional[str], Optional[Union[str, Codec]]) -> None
+        """Sets up the connections to the vision server
+
+        Args:
+            hostname (str, optional): e.g. visioncontroller1
+            commandport (int, optional): e.g. 7004
+            ctx (zmq.asyncio.Context, optional): The asyncio ZMQ context
+            callerid (str, optional): The callerid to send to vision.
+            slaverequestid (str, optional): slave request id used when calling vision manager master to route to the correct vision manager slave
+            codec (str or Codec, optional): Codec of the commands, responses and published states, e.g. 'orjson'. See codec.GetCodec. (Default: the json module picked by the package)
+        """
+        self.hostname = hostname
+        self.commandport = commandport
+        self.configurationport = commandport + 2
+        self.statusport = commandport + 1
+        self._callerid = callerid
+        self._slaverequestid = slaverequestid
+        self._codec = GetCodec(codec)
+
+        if ctx is None:
+            self._ctxown = zmq.asyncio.Context()
+            self._ctxown.linger = 100
+            self._ctx = self._ctxown
+        else:
+            self._ctx = ctx
+
+        self._commandsocket = _AsyncZmqSocketPool('tcp://%s:%d' % (self.hostname, self.commandport), ctx=self._ctx, limit=3)
+        self._configurationsocket = _AsyncZmqSocketPool('tcp://%s:%d' % (self.hostname, self.configurationport), ctx=self._ctx, limit=3)
+
+    def __del__(self):
+        self.Destroy()
+
+    def Destroy(self):
+        # type: () -> None
+        if self._commandsocket is not None:
+            try:
+                self._commandsocket.Destroy()
+                self._commandsocket = None
+            except Exception as e:
+                log.exception('problem destroying commandsocket: %s', e)
+
+        if self._configurationsocket is not None:
+            try:
+                self._configurationsocket.Destroy()
+                self._configurationsocket = None
+            except Exception as e:
+                log.exception('problem destroying configurationsocket: %s', e)
+
+        if self._subscriber is not None:
+            self._subscriber.close(linger=0)
+            self._subscriber = None
+
+        if self._ctxown is not None:
+            try:
+                self._ctxown.destroy()
+                self._ctxown = None
+            except Exception as e:
+                log.exception('problem destroying ctxown: %s', e)
+
+        self._ctx = None
+
+    def GetSlaveRequestId(self):
+        return self._slaverequestid
+
+    async def _SendAndReceive(self, socketpool, port, command, fireandforget=False, timeout=2.0, recvjson=True, zerocopy=False):
+        # type: (_AsyncZmqSocketPool, int, Dict, bool, Optional[float], bool, bool) -> Any
+        """Sends the command on a socket of the pool and awaits the raw reply, decoded by the caller with DecodeResponse.
+
+        If zerocopy is True and recvjson is False, the reply is a memoryview of the received zmq frame.
+
+        Raises:
+            VisionControllerTimeoutError
+            VisionControllerClientError
+        """
+        commandName = command.get('command') or ''
+        socket = await socketpool.AcquireSocket()
+        reuse = False
+        try:
+            await socket.send(self._codec.Encode(command))
+            if fireandforget:
+                # a REQ socket cannot send again before receiving, so do not reuse it
+                return None
+            events = await socket.poll(timeout=None if timeout is None else int(timeout * 1000), flags=zmq.POLLIN)
+            if not events:
+                raise VisionControllerTimeoutError(_('Timed out after %.03f seconds to get response message %s from %s:%d') % (timeout, commandName, self.hostname, port), errortype='timeout')
+            if zerocopy and not recvjson:
+                response = (await socket.recv(copy=False)).buffer
+            else:
+                response = await socket.recv()
+            reuse = True
+        except VisionControllerClientError:
+            raise
+        except zmq.ZMQError as e:
+            raise VisionControllerClientError(_('Problem sending command %s to %s:%d: %s') % (commandName, self.hostname, port, e), errortype='unknownerror')
+        finally:
+            # also reached when the awaiting task is cancelled
+            await socketpool.ReleaseSocket(socket, reuse=reuse)
+        return response
+
+    async def _ExecuteCommand(self, command, fireandforget=False, timeout=2.0, recvjson=True, slaverequestid=None, zerocopy=False):
+        # type: (Dict, bool, Optional[float], bool, Optional[str], bool) -> Any
+        """Executes given command.
+
+        Args:
+            command (dict): Command in json format.
+            fireandforget (bool, optional): Whether we should return immediately after sending the command. If True, return value is None.
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed.
+            recvjson (bool, optional): If True, a json is received.
+            slaverequestid (str, optional): Overrides the slave request id of the client.
+            zerocopy (bool, optional): Only used when recvjson is False. If True, the raw response is a memoryview of the received zmq frame. (Default: False)
+        """
+        assert self._commandsocket is not None
+        if self._callerid:
+            command['callerid'] = self._callerid
+        if slaverequestid is None:
+            slaverequestid = self._slaverequestid
+        if slaverequestid is not None:
+            command['slaverequestid'] = slaverequestid
+        response = await self._SendAndReceive(self._commandsocket, self.commandport, command, fireandforget=fireandforget, timeout=timeout, recvjson=recvjson, zerocopy=zerocopy)
+        if not fireandforget:
+            return DecodeResponse(self._codec, response, command=command, recvjson=recvjson, zerocopy=zerocopy)
+        return response
+
+    async def _SendConfiguration(self, configuration, fireandforget=False, timeout=2.0, recvjson=True, slaverequestid=None):
+        # type: (Dict, bool, Optional[float], bool, Optional[str]) -> Any
+        """Sends a configuration command.
+
+        Args:
+            configuration (dict): Configuration to send in json format.
+            fireandforget (bool, optional): Whether we should return immediately after sending the command. If True, return value is None.
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed.
+            recvjson (bool, optional): If True, a json is received.
+            slaverequestid (str, optional): id of slave to be configured
+        """
+        assert self._configurationsocket is not None
+        if self._callerid:
+            configuration['callerid'] = self._callerid
+        if slaverequestid is None:
+            slaverequestid = self._slaverequestid
+        if slaverequestid is not None:
+            configuration['slaverequestid'] = slaverequestid
+        response = await self._SendAndReceive(self._configurationsocket, self.configurationport, configuration, fireandforget=fireandforget, timeout=timeout, recvjson=recvjson)
+        if not fireandforget:
+            return DecodeResponse(self._codec, response, command=configuration, recvjson=recvjson)
+        return response
+
+    async def TerminateSlaves(self, slaverequestids, timeout=None, fireandforget=False, checkpreempt=True):
+        # type: (List[str], Optional[float], bool, Optional[bool]) -> Any
+        """Terminate slaves with specific slaverequestids
+
+        Args:
+            slaverequestids (list[str]): list of slaverequestid corresponding to slaves to be terminated
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed.
+            fireandforget (bool, optional): Whether we should return immediately after sending the command. If True, return value is None.
+            checkpreempt (bool, optional): Unused, kept for the signature of VisionControllerClient. Cancel the awaiting task to preempt the command.
+        """
+        return await self._SendConfiguration({'command': 'TerminateSlaves', 'slaverequestids': slaverequestids}, timeout=timeout, fireandforget=fireandforget)
+
+    async def CancelSlaves(self, slaverequestids, timeout=10, fireandforget=False, checkpreempt=True):
+        # type: (List[str], Optional[float], bool, Optional[bool]) -> Any
+        """Cancel the current commands on the slaves with specific slaverequestids
+
+        Args:
+            slaverequestids (list[str]): list of slaverequestid corresponding to slaves to be cancelled
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed.
+            fireandforget (bool, optional): Whether we should return immediately after sending the command. If True, return value is None.
+            checkpreempt (bool, optional): Unused, kept for the signature of VisionControllerClient. Cancel the awaiting task to preempt the command.
+        """
+        return await self._SendConfiguration({'command': 'cancel', 'slaverequestids': slaverequestids}, timeout=timeout, fireandforget=fireandforget)
+
+    #
+    # Commands
+    #
+
+    async def StartObjectDetectionTask(self, taskId=None, systemState=None, visionTaskParameters=None, timeout=2.0, **ignoredArgs):
+        # type: (Optional[str], Optional[types.SystemState], Optional[types.visionTaskObjectDetectionParametersSchema], float, Any) -> Optional[Dict[str, str]]
+        """Starts detection thread to continuously detect objects. See VisionControllerClient.StartObjectDetectionTask.
+
+        Args:
+            taskId (str, optional): If specified, the specific taskId to use.
+            systemState (types.SystemState, optional): The state of the system. Used to select the profile that the vision task will use.
+            visionTaskParameters (types.visionTaskObjectDetectionParametersSchema, optional): Parameters for the object detection task.
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+        """
+        command = {
+            'command': 'StartObjectDetectionTask',
+        }  # type: Dict[str, Any]
+        if taskId is not None:
+            command['taskId'] = taskId
+        if systemState is not None:
+            command['systemState'] = systemState
+        if visionTaskParameters is not None:
+            command['visionTaskParameters'] = visionTaskParameters
+        return await self._ExecuteCommand(command, timeout=timeout)
+
+    async def StartContainerDetectionTask(self, taskId=None, systemState=None, visionTaskParameters=None, timeout=2.0, **ignoredArgs):
+        # type: (Optional[str], Optional[types.SystemState], Optional[types.visionTaskContainerDetectionParametersSchema], float, Any) -> Optional[Dict[str, str]]
+        """Starts container detection thread to continuously detect a container. See VisionControllerClient.StartContainerDetectionTask.
+
+        Args:
+            taskId (str, optional): If specified, the specific taskId to use.
+            systemState (types.SystemState, optional): The state of the system. Used to select the profile that the vision task will use.
+            visionTaskParameters (types.visionTaskContainerDetectionParametersSchema, optional): Parameters for the container detection task.
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+        """
+        command = {
+            'command': 'StartContainerDetectionTask',
+        }  # type: Dict[str, Any]
+        if taskId is not None:
+            command['taskId'] = taskId
+        if systemState is not None:
+            command['systemState'] = systemState
+        if visionTaskParameters is not None:
+            command['visionTaskParameters'] = visionTaskParameters
+        return await self._ExecuteCommand(command, timeout=timeout)
+
+    async def StartVisualizePointCloudTask(self, taskId=None, systemState=None, visionTaskParameters=None, timeout=2.0):
+        # type: (Optional[str], Optional[types.SystemState], Optional[types.visionTaskVisualizePointCloudParametersSchema], float) -> Optional[Dict]
+        """Start point cloud visualization thread. See VisionControllerClient.StartVisualizePointCloudTask.
+
+        Args:
+            taskId (str, optional): If specified, the specific taskId to use.
+            systemState (types.SystemState, optional): The state of the system. Used to select the profile that the vision task will use.
+            visionTaskParameters (types.visionTaskVisualizePointCloudParametersSchema, optional): Parameters for the visualization task.
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+        """
+        command = {
+            'command': 'StartVisualizePointCloudTask',
+        }  # type: Dict[str, Any]
+        if taskId is not None:
+            command['taskId'] = taskId
+        if systemState is not None:
+            command['systemState'] = systemState
+        if visionTaskParameters is not None:
+            command['visionTaskParameters'] = visionTaskParameters
+        return await self._ExecuteCommand(command, timeout=timeout)
+
+    async def StopTask(self, taskId=None, taskIds=None, taskType=None, taskTypes=None, cycleIndex=None, waitForStop=True, removeTask=False, fireandforget=False, timeout=2.0):
+        # type: (Optional[str], Optional[List[str]], Optional[str], Optional[List[str]], Optional[str], bool, bool, bool, float) -> Optional[Dict[str, bool]]
+        """Stops a set of tasks that meet the filter criteria. See VisionControllerClient.StopTask.
+
+        Args:
+            taskId (str, optional): If specified, the specific taskId to stop
+            taskIds (list[str], optional): If specified, a list of taskIds to stop
+            taskType (str, optional): The task type to stop.
+            taskTypes (list[str], optional): If specified, a list of task types to stop.
+            cycleIndex (str, optional): Unique cycle index string for tracking, backing up, and differentiating cycles.
+            waitForStop (bool, optional): If True, then wait for task to stop, otherwise just trigger it to stop, but do not wait (Default: True)
+            removeTask (bool, optional): If True, then remove the task from being tracked by the vision manager and destroy all its resources. (Default: False)
+            fireandforget (bool, optional): If True, does not wait for the command to finish and returns immediately. (Default: False)
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+        """
+        command = {
+            'command': 'StopTask',
+            'waitForStop': waitForStop,
+            'removeTask': removeTask,
+        }  # type: Dict[str, Any]
+        if taskTypes is not None:
+            command['taskTypes'] = taskTypes
+        if taskId is not None:
+            command['taskId'] = taskId
+        if taskIds is not None:
+            command['taskIds'] = taskIds
+        if taskType is not None:
+            command['taskType'] = taskType
+        if cycleIndex is not None:
+            command['cycleIndex'] = cycleIndex
+        return await self._ExecuteCommand(command, timeout=timeout, fireandforget=fireandforget)
+
+    async def ResumeTask(self, taskId=None, taskIds=None, taskType=None, taskTypes=None, cycleIndex=None, waitForStop=_deprecated, fireandforget=False, timeout=2.0):
+        # type: (Optional[str], Optional[List[str]], Optional[str], Optional[List[str]], Optional[str], Optional[bool], bool, float) -> Optional[Dict[str, List[str]]]
+        """Resumes a set of tasks that meet the filter criteria. See VisionControllerClient.ResumeTask.
+
+        Args:
+            taskId (str, optional): If specified, the specific taskId to resume
+            taskIds (list[str], optional): If specified, a list of taskIds to resume
+            taskType (str, optional): The task type to resume.
+            taskTypes (list[str], optional): If specified, a list of task types to resume
+            cycleIndex (str, optional): Unique cycle index string for tracking, backing up, and differentiating cycles.
+            waitForStop (bool, optional): **deprecated** This is unused.
+            fireandforget (bool, optional): If True, does not wait for the command to finish and returns immediately. (Default: False)
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+        """
+        command = {
+            'command': 'ResumeTask',
+        }  # type: Dict[str, Any]
+        if taskId is not None:
+            command['taskId'] = taskId
+        if taskIds is not None:
+            command['taskIds'] = taskIds
+        if taskType is not None:
+            command['taskType'] = taskType
+        if taskTypes is not None:
+            command['taskTypes'] = taskTypes
+        if cycleIndex is not None:
+            command['cycleIndex'] = cycleIndex
+        return await self._ExecuteCommand(command, timeout=timeout, fireandforget=fireandforget)
+
+    async def BackupVisionLog(self, cycleIndex, sensorTimestamps=None, fireandforget=False, timeout=2.0):
+        # type: (str, Optional[List[float]], bool, float) -> Optional[Dict]
+        """Backs up the vision log for a given cycle index and/or sensor timestamps.
+
+        Args:
+            cycleIndex (str): Unique cycle index string for tracking, backing up, and differentiating cycles.
+            sensorTimestamps (list[float], optional): The sensor timestamps to backup
+            fireandforget (bool, optional): If True, does not wait for the command to finish and returns immediately. (Default: False)
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+        """
+        command = {
+            'command': 'BackupDetectionLogs',
+            'cycleIndex': cycleIndex,
+        }  # type: Dict[str, Any]
+        if sensorTimestamps is not None:
+            command['sensorTimestamps'] = sensorTimestamps
+        return await self._ExecuteCommand(command, fireandforget=fireandforget, timeout=timeout)
+
+    async def GetLatestDetectedObjects(self, taskId=None, cycleIndex=None, taskType=None, timeout=2.0, slaverequestid=None):
+        """Gets the latest detected objects. See VisionControllerClient.GetLatestDetectedObjects for the structure of the result.
+
+        Args:
+            taskId (str, optional): If specified, the taskId to retrieve the detected objects from.
+            cycleIndex (str, optional): Unique cycle index string for tracking, backing up, and differentiating cycles.
+            taskType (str, optional): The task type to retrieve the detected objects from.
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            slaverequestid (str, optional): Overrides the slave request id of the client.
+        """
+        command = {
+            'command': 'GetLatestDetectedObjects',
+        }  # type: Dict[str, Any]
+        if taskId is not None:
+            command['taskId'] = taskId
+        if cycleIndex is not None:
+            command['cycleIndex'] = cycleIndex
+        if taskType is not None:
+            command['taskType'] = taskType
+        return await self._ExecuteCommand(command, timeout=timeout, slaverequestid=slaverequestid)
+
+    async def GetLatestDetectionResultImages(self, taskId=None, cycleIndex=None, taskType=None, newerThanResultTimestampUS=0, sensorSelectionInfo=None, metadataOnly=False, imageTypes=None, limit=None, timeout=2.0, slaverequestid=None, zerocopy=False):
+        """Gets the latest detected result images.
+
+        There is no blockwait argument, schedule the returned coroutine as a task to keep the request in flight while doing other work.
+
+        Args:
+            taskId (str, optional): If specified, the taskId to retrieve the detected objects from.
+            cycleIndex (str, optional): Unique cycle index string for tracking, backing up, and differentiating cycles.
+            taskType (str, optional): If specified, the task type to retrieve the detected objects from.
+            newerThanResultTimestampUS (int, optional): If specified, starttimestamp of the image must be newer than this value in microseconds (linux-epoch). (Default: 0)
+            sensorSelectionInfo (dict, optional): Sensor selection infos (see schema).
+            metadataOnly (bool, optional): (Default: False)
+            imageTypes (list, optional): Mujin image types
+            limit (int, optional):
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            slaverequestid (str, optional): Overrides the slave request id of the client.
+            zerocopy (bool, optional): If True, returns a memoryview of the received zmq frame instead of a bytes copy. (Default: False)
+
+        Returns:
+            bytes: Raw image data
+        """
+        command = {
+            'command': 'GetLatestDetectionResultImages',
+            'newerThanResultTimestampUS': newerThanResultTimestampUS,
+            'metadataOnly': metadataOnly,
+        }  # type: Dict[str, Any]
+        if taskId is not None:
+            command['taskId'] = taskId
+        if cycleIndex is not None:
+            command['cycleIndex'] = cycleIndex
+        if taskType is not None:
+            command['taskType'] = taskType
+        if sensorSelectionInfo is not None:
+            command['sensorSelectionInfo'] = sensorSelectionInfo
+        if imageTypes is not None:
+            command['imageTypes'] = imageTypes
+        if limit is not None:
+            command['limit'] = limit
+        return await self._ExecuteCommand(command, timeout=timeout, recvjson=False, slaverequestid=slaverequestid, zerocopy=zerocopy)
+
+    async def GetDetectionHistory(self, timestamp, timeout=2.0, zerocopy=False):
+        # type: (int, float, bool) -> Optional[bytes]
+        """Gets detection result with given timestamp (sensor time)
+
+        Args:
+            timestamp (int): Unix timestamp in milliseconds of the sensor capture time ("targetsensortimestamp" from detected objects).
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            zerocopy (bool, optional): If True, returns a memoryview of the received zmq frame instead of a bytes copy. (Default: False)
+
+        Returns:
+            bytes: Binary blob of detection data
+        """
+        command = {
+            'command': 'GetDetectionHistory',
+            'timestamp': timestamp,
+        }  # type: Dict[str, Any]
+        return await self._ExecuteCommand(command, timeout=timeout, recvjson=False, zerocopy=zerocopy)
+
+    async def Ping(self, timeout=2.0, fireandforget=False):
+        # type: (float, bool) -> Optional[Dict]
+        """Sends a ping to the visionmanager.
+
+        Args:
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+        """
+        command = {
+            'command': 'Ping',
+        }
+        return await self._ExecuteCommand(command, fireandforget=fireandforget, timeout=timeout)
+
+    async def SetLogLevel(self, componentLevels, timeout=2.0):
+        # type: (Dict, float) -> Optional[Dict]
+        """Sets the log level for the visionmanager.
+
+        Args:
+            componentLevels (dict): A dictionary of component names and their respective log levels.
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+        """
+        command = {
+            'command': 'setloglevel',
+            'componentLevels': componentLevels,
+        }  # type: Dict[str, Any]
+        return await self._SendConfiguration(command, timeout=timeout)
+
+    async def Cancel(self, timeout=2.0):
+        # type: (float) -> Optional[Dict]
+        """Cancels the current command.
+
+        Args:
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+        """
+        log.info('Canceling command...')
+        command = {
+            'command': 'cancel',
+        }
+        return await self._SendConfiguration(command, timeout=timeout)
+
+    async def Quit(self, timeout=2.0):
+        # type: (float) -> Optional[Dict]
+        """Quits the visionmanager.
+
+        Args:
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+        """
+        log.info('Stopping visionserver...')
+        command = {
+            'command': 'quit',
+        }
+        return await self._SendConfiguration(command, timeout=timeout)
+
+    async def GetTaskStateService(self, taskId=None, cycleIndex=None, taskType=None, timeout=4.0):
+        # type: (Optional[str], Optional[str], Optional[str], float) -> Optional[Dict[str, Any]]
+        """Gets the task state from visionmanager. See VisionControllerClient.GetTaskStateService for the structure of the result.
+
+        Args:
+            taskId (str, optional): The taskId to retrieve the detected objects from. If not specified, defaults to current slaverequest id.
+            cycleIndex (str, optional): Unique cycle index string for tracking, backing up, and differentiating cycles.
+            taskType (str, optional): The taskType for which the status was requested. If not specified, defaults to the controller monitor task.
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 4.0)
+        """
+        command = {
+            'command': 'GetTaskState',
+        }  # type: Dict[str, Any]
+        if taskId is not None:
+            command['taskId'] = taskId
+        if cycleIndex is not None:
+            command['cycleIndex'] = cycleIndex
+        if taskType is not None:
+            command['taskType'] = taskType
+        return await self._ExecuteCommand(command, timeout=timeout)
+
+    async def GetPublishedStateService(self, timeout=4.0):
+        # type: (float) -> Optional[Dict[str, Any]]
+        """Gets the published state of the visionmanager through the command socket.
+
+        Args:
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 4.0)
+        """
+        return await self._ExecuteCommand({"command": "GetPublishedState"}, timeout=timeout)
+
+    async def GetPublishedServerState(self, timeout=2.0):
+        # type: (float) -> Optional[Dict[str, Any]]
+        """Return most recent published state. If publishing is disabled or nothing is received within timeout, then will return None
+        """
+        if self._subscriber is None:
+            self._subscriber = self._ctx.socket(zmq.SUB)
+            self._subscriber.setsockopt(zmq.CONFLATE, 1)
+            self._subscriber.setsockopt(zmq.SUBSCRIBE, b'')
+            self._subscriber.connect('tcp://%s:%d' % (self.hostname, self.statusport))
+        events = await self._subscriber.poll(timeout=int(timeout * 1000), flags=zmq.POLLIN)
+        if not events:
+            return None
+        rawServerState = await self._subscriber.recv()
+        return self._codec.Decode(rawServerState)
+
+    async def GetPublishedState(self, timeout=2.0):
+        # type: (float) -> Optional[Dict[str, Any]]
+        """Return most recent published state. If publishing is disabled, then will return None
+        """
+        serverState = await self.GetPublishedServerState(timeout=timeout)
+        if serverState is not None and 'slavestates' in serverState:
+            return serverState['slavestates'].get('slaverequestid-%s' % self._slaverequestid)
+        return None
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# REQ command socket lending a bounded number of zmqclient.ZmqClient instances to the calling threads
+
+# system imports
+import threading
+import time
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, List, Optional # noqa: F401 # used in type check
+
+# mujin imports
+from . import VisionControllerClientError, VisionControllerTimeoutError
+from . import ugettext as _
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+
+class CheckoutZmqClient(object):
+    """Command socket lending at most maxClients zmqclient.ZmqClient instances to the threads sending commands.
+
+    Like ThreadLocalZmqClient, it can be used by many threads at once and exposes the SendCommand/ReceiveCommand/IsWaitingReply interface, but the number of ZmqClients does not grow with the number of threads. A thread checks a ZmqClient out for one command and returns it once the reply is received. When all of them are in use, the thread waits for one to be returned, at most for the timeout of its command.
+
+    A command sent with blockwait=False keeps its ZmqClient checked out by the sending thread until that thread received the reply with ReceiveCommand.
+    """
+
+    _createfn = None  # type: Optional[Callable[[], Any]] # creates a new ZmqClient
+    _maxClients = 4  # type: int
+    _condition = None  # type: Optional[threading.Condition] # guards the members below, notified when a ZmqClient is returned
+    _clients = None  # type: Optional[List[Any]] # all the ZmqClients created and not destroyed
+    _idle = None  # type: Optional[List[Any]] # ZmqClients ready to be checked out
+    _waiting = None  # type: Optional[Dict[threading.Thread, Any]] # thread -> ZmqClient waiting for the reply of a command sent with blockwait=False
+    _isdestroying = False  # type: bool
+
+    def __init__(self, createfn, maxClients=4):
+        # type: (Callable[[], Any], int) -> None
+        """
+        Args:
+            createfn (Callable): Returns a new zmqclient.ZmqClient connected to the endpoint, called when a thread sends a command while all the ZmqClients are in use and there are fewer than maxClients.
+            maxClients (int, optional): Maximum number of ZmqClients. (Default: 4)
+        """
+        self._createfn = createfn
+        self._maxClients = maxClients
+        self._condition = threading.Condition()
+        self._clients = []
+        self._idle = []
+        self._waiting = {}
+        self._isdestroying = False
+
+    @staticmethod
+    def _DestroyClient(client):
+        # type: (Any) -> None
+        try:
+            client.Destroy()
+        except Exception as e:
+            log.exception('problem destroying zmq client: %s', e)
+
+    def _Checkout(self, timeout=None):
+        # type: (Optional[float]) -> Any
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._isdestroying:
+                    raise VisionControllerClientError(_('Command socket is destroyed'), errortype='unknownerror')
+                if self._idle:
+                    return self._idle.pop()
+                if len(self._clients) >= self._maxClients:
+                    # the ZmqClients of threads that exited while waiting for a reply can never be used again
+                    for thread in [thread for thread in self._waiting if not thread.is_alive()]:
+                        client = self._waiting.pop(thread)
+                        self._clients.remove(client)
+                        self._DestroyClient(client)
+                if len(self._clients) < self._maxClients:
+                    client = self._createfn()
+                    self._clients.append(client)
+                    return client
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise VisionControllerTimeoutError(_('Timed out after %.03f seconds waiting for one of the %d zmq clients to be free') % (timeout, self._maxClients), errortype='timeout')
+                self._condition.wait(remaining)
+
+    def _Return(self, client):
+        # type: (Any) -> None
+        thread = threading.current_thread()
+        with self._condition:
+            if client.IsWaitingReply():
+                self._waiting[thread] = client
+                return
+            self._waiting.pop(thread, None)
+            if not self._isdestroying:
+                self._idle.append(client)
+                self._condition.notify()
+
+    def _GetWaitingClient(self):
+        # type: () -> Any
+        with self._condition:
+            return self._waiting.get(threading.current_thread())
+
+    def GetNumClients(self):
+        # type: () -> int
+        """Returns the number of ZmqClients currently held, at most maxClients."""
+        with self._condition:
+            return len(self._clients)
+
+    def SendCommand(self, command, **kwargs):
+        # type: (Any, **Any) -> Any
+        """Sends the command on a ZmqClient checked out for it, see zmqclient.ZmqClient.SendCommand.
+
+        Raises:
+            VisionControllerTimeoutError: If no ZmqClient was free within the timeout of the command.
+        """
+        client = self._GetWaitingClient()
+        if client is None:
+            client = self._Checkout(timeout=kwargs.get('timeout'))
+        try:
+            return client.SendCommand(command, **kwargs)
+        finally:
+            self._Return(client)
+
+    def ReceiveCommand(self, **kwargs):
+        # type: (**Any) -> Any
+        """Receives the reply of the last command the current thread sent with blockwait=False, see zmqclient.ZmqClient.ReceiveCommand."""
+        client = self._GetWaitingClient()
+        if client is None:
+            raise VisionControllerClientError(_('No command is waiting for a reply on this thread'), errortype='invalidwait')
+        try:
+            return client.ReceiveCommand(**kwargs)
+        finally:
+            self._Return(client)
+
+    def IsWaitingReply(self):
+        # type: () -> bool
+        """Returns whether the current thread sent a command with blockwait=False and did not receive its reply yet."""
+        client = self._GetWaitingClient()
+        return client is not None and client.IsWaitingReply()
+
+    def SetDestroy(self):
+        # type: () -> None
+        """Makes all current and future waits of all threads abort."""
+        with self._condition:
+            self._isdestroying = True
+            self._condition.notify_all()
+            clients = list(self._clients)
+        for client in clients:
+            client.SetDestroy()
+
+    def Destroy(self):
+        # type: () -> None
+        self.SetDestroy()
+        with self._condition:
+            clients = list(self._clients)
+            self._clients = []
+            self._idle = []
+            self._waiting = {}
+        for client in clients:
+            self._DestroyClient(client)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Codecs encoding commands and decoding responses and published states
+
+# system imports
+import json as _stdjson
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Union # noqa: F401 # used in type check
+
+# mujin imports
+from . import VisionControllerClientError
+from . import json
+from . import ugettext as _
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+
+class Codec(object):
+    """Converts between python objects and the bytes sent over the zmq sockets.
+
+    Decode accepts bytes, bytearray, memoryview or str, so that received frames can be decoded without copying them into a new str first when the underlying library supports it.
+    """
+
+    name = None  # type: Optional[str] # name used to select the codec, see GetCodec
+
+    def Encode(self, obj):
+        # type: (Any) -> bytes
+        raise NotImplementedError()
+
+    def Decode(self, data):
+        # type: (Union[bytes, bytearray, memoryview, str]) -> Any
+        raise NotImplementedError()
+
+    def __repr__(self):
+        return '<%s %s>' % (self.__class__.__name__, self.name)
+
+
+class StdJsonCodec(Codec):
+    """Codec using the json module of the standard library."""
+
+    name = 'json'
+
+    def Encode(self, obj):
+        # type: (Any) -> bytes
+        return _stdjson.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def Decode(self, data):
+        # type: (Union[bytes, bytearray, memoryview, str]) -> Any
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return _stdjson.loads(data)
+
+
+class UJsonCodec(Codec):
+    """Codec using ujson."""
+
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def Encode(self, obj):
+        # type: (Any) -> bytes
+        return self._ujson.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+    def Decode(self, data):
+        # type: (Union[bytes, bytearray, memoryview, str]) -> Any
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return self._ujson.loads(data)
+
+
+class OrJsonCodec(Codec):
+    """Codec using orjson, which encodes straight to bytes and decodes bytes and memoryviews without copying them.
+
+    orjson does not encode numpy arrays unless asked to, so OPT_SERIALIZE_NUMPY is passed.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_SERIALIZE_NUMPY
+
+    def Encode(self, obj):
+        # type: (Any) -> bytes
+        return self._orjson.dumps(obj, option=self._options)
+
+    def Decode(self, data):
+        # type: (Union[bytes, bytearray, memoryview, str]) -> Any
+        return self._orjson.loads(data)
+
+
+_codecClasses = {
+    StdJsonCodec.name: StdJsonCodec,
+    UJsonCodec.name: UJsonCodec,
+    OrJsonCodec.name: OrJsonCodec,
+}  # type: Dict[str, type]
+
+_codecs = {}  # type: Dict[str, Codec] # codecs are stateless, so one instance per name is shared
+
+_rawResponseTypes = (bytes, bytearray, memoryview, str) # responses in these types still have to be decoded
+
+
+def GetCodec(name=None):
+    # type: (Optional[Union[str, Codec]]) -> Codec
+    """Returns the codec with the given name.
+
+    Args:
+        name (str or Codec, optional): One of 'json', 'ujson' or 'orjson'. A Codec instance is returned as is. If not specified, the json module picked by the package is used (ujson when installed, json otherwise).
+
+    Raises:
+        ValueError: If the codec is unknown or its library is not installed.
+    """
+    if isinstance(name, Codec):
+        return name
+    if name is None:
+        name = UJsonCodec.name if json.__name__ == 'ujson' else StdJsonCodec.name
+    codec = _codecs.get(name)
+    if codec is not None:
+        return codec
+    codecClass = _codecClasses.get(name)
+    if codecClass is None:
+        raise ValueError(_('Unknown codec %r, available codecs are %s') % (name, ', '.join(sorted(_codecClasses))))
+    try:
+        codec = codecClass()
+    except ImportError as e:
+        raise ValueError(_('Codec %r is not available: %s') % (name, e))
+    _codecs[name] = codec
+    return codec
+
+
+def GetAvailableCodecNames():
+    # type: () -> List[str]
+    """Returns the names of the codecs whose library is installed."""
+    names = []
+    for name in sorted(_codecClasses):
+        try:
+            GetCodec(name)
+        except ValueError:
+            continue
+        names.append(name)
+    return names
+
+
+def _RaiseResponseError(response):
+    # type: (Dict) -> None
+    if isinstance(response['error'], dict):  # until vision manager error handling is resolved
+        raise VisionControllerClientError(response['error'].get('desc', ''), errortype=response['error'].get('type', ''))
+    else:
+        raise VisionControllerClientError(_('Got unknown error from vision manager: %r') % response['error'], errortype='unknownerror')
+
+
+def DecodeResponse(codec, response, command=None, recvjson=True, zerocopy=False):
+    # type: (Codec, Any, Optional[Dict], bool, bool) -> Any
+    """Decodes the reply of the vision manager to a command and raises the error it carries. Shared by VisionControllerClient and AsyncVisionControllerClient, so that both raise the same errors for the same replies.
+
+    Args:
+        codec (Codec): Codec decoding the reply.
+        response: The raw reply, or a reply already decoded.
+        command (dict, optional): The command, used in the error messages.
+        recvjson (bool, optional): If True, the reply is decoded with the codec. Otherwise it is raw data, returned as is unless it is a json object, which is decoded and checked for an error. (Default: True)
+        zerocopy (bool, optional): If True, raw data received as bytes is returned as a memoryview. (Default: False)
+
+    Raises:
+        VisionControllerClientError: If the reply carries an error, or raw data is empty.
+    """
+    if recvjson:
+        if isinstance(response, _rawResponseTypes):
+            response = codec.Decode(response)
+        if 'error' in response:
+            _RaiseResponseError(response)
+    else:
+        # raw responses carrying an error are json objects. only the first and last bytes are looked at, so large blobs are neither copied nor scanned
+        if len(response) > 0 and response[:1] in (b'{', u'{') and response[-1:] in (b'}', u'}'):
+            response = codec.Decode(response)
+            if 'error' in response:
+                _RaiseResponseError(response)
+        elif zerocopy and isinstance(response, bytes):
+            response = memoryview(response)
+        if len(response) == 0:
+            raise VisionControllerClientError(_('Vision command %(command)s failed with empty response %(response)r') % {'command': command, 'response': response}, errortype='emptyresponseerror')
+    return response
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Hooks called around the commands sent by VisionControllerClient
+
+# system imports
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Dict, Optional, Sequence # noqa: F401 # used in type check
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+
+class CommandEvent(object):
+    """Describes one command round trip to the hooks. Timings are in microseconds and sizes in bytes, None when they do not apply, e.g. sendUS of a blocking command or responseBytes of a fireandforget command."""
+
+    __slots__ = ('commandName', 'channel', 'command', 'callerid', 'slaverequestid', 'cycleIndex', 'encodeUS', 'sendUS', 'waitUS', 'decodeUS', 'requestBytes', 'responseBytes', 'response', 'recvjson', 'hooks', 'contexts')
+
+    def __init__(self, hooks, commandName, channel, command=None):
+        # type: (Sequence[CommandHook], str, str, Optional[Dict[str, Any]]) -> None
+        self.commandName = commandName  # type: str
+        self.channel = channel  # type: str # 'command', 'configuration' or 'publishedstate'
+        self.command = command  # type: Optional[Dict[str, Any]] # the command as sent, must not be modified
+        self.callerid = None  # type: Optional[str]
+        self.slaverequestid = None  # type: Optional[str]
+        self.cycleIndex = None  # type: Optional[str]
+        if command is not None:
+            self.callerid = command.get('callerid')
+            self.slaverequestid = command.get('slaverequestid')
+            self.cycleIndex = command.get('cycleIndex')
+        self.encodeUS = None  # type: Optional[int]
+        self.sendUS = None  # type: Optional[int]
+        self.waitUS = None  # type: Optional[int]
+        self.decodeUS = None  # type: Optional[int]
+        self.requestBytes = None  # type: Optional[int]
+        self.responseBytes = None  # type: Optional[int]
+        self.response = None  # type: Any # raw response as received, before decoding, e.g. bytes or a memoryview. None until received and for fireandforget commands, must not be modified
+        self.recvjson = None  # type: Optional[bool] # whether the response is a reply encoded with the codec, rather than raw data like images. None until received
+        self.hooks = hooks  # type: Sequence[CommandHook] # hooks registered when the command was sent
+        self.contexts = None  # type: Optional[Sequence[Any]] # values returned by OnBeforeSend, in the order of hooks
+
+    def __repr__(self):
+        return '<CommandEvent %s %s>' % (self.channel, self.commandName)
+
+
+class CommandHook(object):
+    """Base class of the hooks registered with VisionControllerClient.AddCommandHook. Subclasses override the methods they need.
+
+    The methods are called on the thread running the command, or reading its result for commands sent with returnfuture=True, so they should return quickly. Exceptions they raise are logged and ignored.
+    """
+
+    def OnBeforeSend(self, event):
+        # type: (CommandEvent) -> Any
+        """Called after the command is encoded and before it is sent. The return value is passed back to OnAfterReceive or OnError, e.g. a tracing span."""
+        return None
+
+    def OnAfterReceive(self, event, context):
+        # type: (CommandEvent, Any) -> None
+        """Called after the reply is received and decoded, or after a fireandforget command is sent."""
+        pass
+
+    def OnError(self, event, error, context):
+        # type: (CommandEvent, Exception, Any) -> None
+        """Called when sending the command, waiting for or decoding its reply raised error. The timings of the phases that completed are set."""
+        pass
+
+
+def CallBeforeSend(event):
+    # type: (CommandEvent) -> None
+    contexts = []
+    for hook in event.hooks:
+        try:
+            contexts.append(hook.OnBeforeSend(event))
+        except Exception as e:
+            log.exception('command hook %r failed before sending %s: %s', hook, event.commandName, e)
+            contexts.append(None)
+    event.contexts = contexts
+
+
+def CallAfterReceive(event):
+    # type: (CommandEvent) -> None
+    for hook, context in zip(event.hooks, event.contexts or [None] * len(event.hooks)):
+        try:
+            hook.OnAfterReceive(event, context)
+        except Exception as e:
+            log.exception('command hook %r failed after receiving %s: %s', hook, event.commandName, e)
+
+
+def CallOnError(event, error):
+    # type: (CommandEvent, Exception) -> None
+    for hook, context in zip(event.hooks, event.contexts or [None] * len(event.hooks)):
+        try:
+            hook.OnError(event, error, context)
+        except Exception as e:
+            log.exception('command hook %r failed on error of %s: %s', hook, event.commandName, e)
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Records the commands, responses and published states of a client to a file and replays them
+
+"""Records the traffic of a VisionControllerClient, to reproduce it offline.
+
+A recording is an append-only file of one encoded record per line, and a sidecar file named like it with a .blobs suffix holding the raw data responses and the replies larger than blobThreshold, so that the lines stay small and can be read without loading the images. Every recording session starts with a session record. The records are:
+
+- session: timeUS, version, codec and the metadata given to the recorder.
+- command: timeUS when the command was sent, channel, commandName, the command as sent, fireandforget, the timings and sizes of CommandEvent, recvjson telling whether the response is a reply or raw data, and either the raw response inline in response, or its [offset, size] in the sidecar in blob. Failed commands have error with its type and desc, and the response if one was received, e.g. an error reply.
+- publishedstate: timeUS and the decoded state received by the published state thread. States read with GetPublishedServerState without the thread are command records of the publishedstate channel.
+
+ReplayCommands sends the recorded commands with a client, and FakeVisionManager.LoadRecording makes the stand-in server answer with the recorded responses and publish the recorded states.
+"""
+
+# system imports
+import os
+import threading
+import time
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterator, List, Optional, Tuple, Union # noqa: F401 # used in type check
+    from .codec import Codec # noqa: F401 # used in type check
+    from .commandhooks import CommandEvent # noqa: F401 # used in type check
+
+# mujin imports
+from . import VisionControllerClientError
+from . import ugettext as _
+from .codec import GetCodec
+from .commandhooks import CommandHook
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+recordingVersion = 1
+
+_eventKeys = ('encodeUS', 'sendUS', 'waitUS', 'decodeUS', 'requestBytes', 'responseBytes')
+
+
+def GetBlobFilename(filename):
+    # type: (str) -> str
+    """Returns the name of the sidecar file holding the large responses of the recording filename."""
+    return filename + '.blobs'
+
+
+def _GetRawBytes(response, codec):
+    # type: (Any, Codec) -> Optional[Union[bytes, memoryview]]
+    """Returns the raw response as a bytes-like object without copying it if possible, None if there is none."""
+    if response is None:
+        return None
+    if isinstance(response, bytes):
+        return response
+    if isinstance(response, str):
+        return response.encode('utf-8')
+    if isinstance(response, list):
+        return b''.join(bytes(part) for part in response)
+    if isinstance(response, dict):
+        return codec.Encode(response)
+    return memoryview(response).cast('B')
+
+
+class CommandRecorder(CommandHook):
+    """Command hook writing every command, its response and timings to a recording, see the module documentation. Thread safe.
+
+    Registered by VisionControllerClient.StartRecording, which also records the published states received by the published state thread.
+    """
+
+    _lock = None  # type: Optional[threading.Lock] # guards the files
+    _file = None  # type: Optional[Any] # the recording, opened for appending
+    _blobfile = None  # type: Optional[Any] # the sidecar, opened for appending
+    _bloboffset = 0  # type: int # size of the sidecar, where the next blob goes
+    _numRecords = 0  # type: int
+
+    def __init__(self, filename, codec=None, blobThreshold=64 * 1024, metadata=None):
+        # type: (str, Optional[Union[str, Codec]], int, Optional[Dict[str, Any]]) -> None
+        """Opens the recording for appending and writes a session record.
+
+        Args:
+            filename (str): The recording. The sidecar is GetBlobFilename(filename).
+            codec (str or Codec, optional): Codec of the records, see codec.GetCodec. Responses are stored as received whatever the codec.
+            blobThreshold (int, optional): Replies larger than this many bytes are stored in the sidecar. Raw data responses like images always are, unless they are json error replies. (Default: 64 KiB)
+            metadata (dict, optional): Stored in the session record, e.g. the hostname and slaverequestid of the client.
+        """
+        self._filename = filename
+        self._codec = GetCodec(codec)
+        self._blobThreshold = blobThreshold
+        self._lock = threading.Lock()
+        self._file = open(filename, 'ab')
+        self._blobfile = open(GetBlobFilename(filename), 'ab')
+        self._bloboffset = self._blobfile.seek(0, os.SEEK_END)
+        self._WriteRecord({'type': 'session', 'timeUS': int(time.time() * 1000000), 'version': recordingVersion, 'codec': self._codec.name, 'metadata': metadata or {}})
+
+    def __del__(self):
+        self.Close()
+
+    def Close(self):
+        # type: () -> None
+        """Flushes and closes the files. Later records are dropped."""
+        if self._lock is None:
+            return
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._blobfile is not None:
+                self._blobfile.close()
+                self._blobfile = None
+
+    def Flush(self):
+        # type: () -> None
+        with self._lock:
+            if self._blobfile is not None:
+                self._blobfile.flush()
+            if self._file is not None:
+                self._file.flush()
+
+    def GetFilename(self):
+        # type: () -> str
+        return self._filename
+
+    def GetNumRecords(self):
+        # type: () -> int
+        """Returns the number of records written, including the session record."""
+        return self._numRecords
+
+    def OnBeforeSend(self, event):
+        # type: (CommandEvent) -> int
+        return int(time.time() * 1000000)
+
+    def OnAfterReceive(self, event, context):
+        # type: (CommandEvent, Any) -> None
+        self._RecordCommand(event, context, None)
+
+    def OnError(self, event, error, context):
+        # type: (CommandEvent, Exception, Any) -> None
+        self._RecordCommand(event, context, error)
+
+    def RecordPublishedState(self, state):
+        # type: (Any) -> None
+        """Records a decoded published state. Meant to be a listener of the PublishedStateCache."""
+        self._WriteRecord({'type': 'publishedstate', 'timeUS': int(time.time() * 1000000), 'state': state})
+
+    def _RecordCommand(self, event, timeUS, error):
+        # type: (CommandEvent, Optional[int], Optional[Exception]) -> None
+        record = {
+            'type': 'command',
+            'timeUS': timeUS if timeUS is not None else int(time.time() * 1000000),
+            'channel': event.channel,
+            'commandName': event.commandName,
+            'command': event.command,
+            'fireandforget': event.channel != 'publishedstate' and error is None and event.response is None,
+        }  # type: Dict[str, Any]
+        for key in _eventKeys:
+            value = getattr(event, key)
+            if value is not None:
+                record[key] = value
+        if event.recvjson is not None:
+            record['recvjson'] = event.recvjson
+        if error is not None:
+            if isinstance(error, VisionControllerClientError):
+                record['error'] = {'type': error._type, 'desc': error._desc}
+            else:
+                record['error'] = {'type': error.__class__.__name__, 'desc': str(error)}
+        response = _GetRawBytes(event.response, self._codec)
+        self._WriteRecord(record, response)
+
+    def _WriteRecord(self, record, response=None):
+        # type: (Dict[str, Any], Optional[Union[bytes, memoryview]]) -> None
+        # only replies go inline: raw data can be valid utf-8 too, e.g. zero filled, and would be inflated by the escapes
+        if response is not None and len(response) <= self._blobThreshold and (record.get('recvjson') or bytes(response[:1]) == b'{'):
+            try:
+                record['response'] = bytes(response).decode('utf-8')
+                response = None
+            except UnicodeDecodeError:
+                pass
+        with self._lock:
+            if self._file is None:
+                return
+            if response is not None:
+                self._blobfile.write(response)
+                record['blob'] = [self._bloboffset, len(response)]
+                self._bloboffset += len(response)
+            self._file.write(self._codec.Encode(record) + b'\n')
+            self._numRecords += 1
+
+
+class CommandRecording(object):
+    """Reads a recording written by CommandRecorder."""
+
+    _blobfile = None  # type: Optional[Any] # opened on the first blob read
+
+    def __init__(self, filename, codec=None):
+        # type: (str, Optional[Union[str, Codec]]) -> None
+        """
+        Args:
+            filename (str): The recording.
+            codec (str or Codec, optional): Codec the recording was written with.
+        """
+        self._filename = filename
+        self._codec = GetCodec(codec)
+
+    def __del__(self):
+        self.Close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exctype, excvalue, traceback):
+        self.Close()
+
+    def Close(self):
+        # type: () -> None
+        if self._blobfile is not None:
+            self._blobfile.close()
+            self._blobfile = None
+
+    def IterRecords(self):
+        # type: () -> Iterator[Dict[str, Any]]
+        """Yields the records in the order they were written. A last line cut by a crash of the recording process is skipped."""
+        with open(self._filename, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    log.warning('skipping incomplete last record of %s', self._filename)
+                    break
+                yield self._codec.Decode(line)
+
+    def GetRecords(self, types=None, channels=None):
+        # type: (Optional[Tuple[str, ...]], Optional[Tuple[str, ...]]) -> List[Dict[str, Any]]
+        """Returns the records of the given types, and of the given channels for command records. None means all."""
+        return [record for record in self.IterRecords() if (types is None or record.get('type') in types) and (channels is None or record.get('type') != 'command' or record.get('channel') in channels)]
+
+    def GetResponse(self, record):
+        # type: (Dict[str, Any]) -> Optional[bytes]
+        """Returns the raw response of a command record, reading it from the sidecar if needed. None if no response was received."""
+        if 'response' in record:
+            return record['response'].encode('utf-8')
+        blob = record.get('blob')
+        if blob is None:
+            return None
+        offset, size = blob
+        if self._blobfile is None:
+            self._blobfile = open(GetBlobFilename(self._filename), 'rb')
+        self._blobfile.seek(offset)
+        data = self._blobfile.read(size)
+        if len(data) != size:
+            raise VisionControllerClientError(_('Blob of %(size)d bytes at %(offset)d is missing from %(filename)s') % {'size': size, 'offset': offset, 'filename': GetBlobFilename(self._filename)}, errortype='invalidrecording')
+        return data
+
+    def GetPublishedState(self, record):
+        # type: (Dict[str, Any]) -> Optional[bytes]
+        """Returns the raw published state of a publishedstate record or of a command record of the publishedstate channel. None if there is none."""
+        if record.get('type') == 'publishedstate':
+            return self._codec.Encode(record['state'])
+        if record.get('type') == 'command' and record.get('channel') == 'publishedstate':
+            return self.GetResponse(record)
+        return None
+
+
+def ReplayCommands(client, recording, speed=1.0, timeout=2.0):
+    # type: (Any, CommandRecording, Optional[float], float) -> Dict[str, Any]
+    """Sends the recorded commands and configuration commands with client, e.g. to compare the timings of two versions of the client on the same traffic with collectStatistics=True.
+
+    Commands are sent without waiting for the replies, with returnfuture=True, at their recorded times scaled by speed, so that commands that overlapped when recorded overlap again. Replies are decoded like when recorded, raw data responses are only checked for errors. The callerid and slaverequestid of the client replace the recorded ones when the client has them.
+
+    Args:
+        client (VisionControllerClient): Sends the commands.
+        recording (CommandRecording): The recording.
+        speed (float, optional): 2.0 replays twice as fast as recorded. None or 0 sends the commands as fast as possible. (Default: 1.0)
+        timeout (float, optional): Timeout in seconds of every command. (Default: 2.0)
+
+    Returns:
+        dict: numCommands, numErrors, errorTypes (errortype -> count), numRecordedErrors, duration and recordedDuration in seconds.
+    """
+    records = recording.GetRecords(types=('command',), channels=('command', 'configuration'))
+    result = {'numCommands': len(records), 'numErrors': 0, 'errorTypes': {}, 'numRecordedErrors': sum(1 for record in records if 'error' in record), 'duration': 0.0, 'recordedDuration': 0.0}  # type: Dict[str, Any]
+    if not records:
+        return result
+    result['recordedDuration'] = (records[-1]['timeUS'] - records[0]['timeUS']) / 1000000.0
+
+    def _AddError(error):
+        # type: (Exception) -> None
+        errortype = error._type if isinstance(error, VisionControllerClientError) else error.__class__.__name__
+        result['numErrors'] += 1
+        result['errorTypes'][errortype] = result['errorTypes'].get(errortype, 0) + 1
+
+    futures = []
+    firstTimeUS = records[0]['timeUS']
+    starttime = time.monotonic()
+    for record in records:
+        if speed:
+            delay = (record['timeUS'] - firstTimeUS) / 1000000.0 / speed - (time.monotonic() - starttime)
+            if delay > 0:
+                time.sleep(delay)
+        command = dict(record['command'])
+        fireandforget = bool(record.get('fireandforget'))
+        # recordings without recvjson stored the replies inline
+        recvjson = record.get('recvjson', 'response' in record)
+        try:
+            if record['channel'] == 'configuration':
+                future = client._SendConfiguration(command, fireandforget=fireandforget, timeout=timeout, recvjson=recvjson, returnfuture=not fireandforget)
+            else:
+                future = client._ExecuteCommand(command, fireandforget=fireandforget, timeout=timeout, recvjson=recvjson, returnfuture=not fireandforget)
+        except Exception as e:
+            _AddError(e)
+            continue
+        if not fireandforget:
+            futures.append(future)
+    for future in futures:
+        try:
+            future.result(timeout)
+        except Exception as e:
+            _AddError(e)
+    result['duration'] = time.monotonic() - starttime
+    return result
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Per-command histograms of timings and message sizes
+
+# system imports
+import threading
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional # noqa: F401 # used in type check
+    from .commandhooks import CommandEvent # noqa: F401 # used in type check
+
+# mujin imports
+from .commandhooks import CommandHook
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+
+class Log2Histogram(object):
+    """Histogram of non-negative integers with power of two buckets: bucket i counts the values v with v.bit_length() == i, i.e. 0 for 0 and [2**(i-1), 2**i) otherwise.
+
+    Adding a value is a handful of integer operations. Percentiles are estimated with the upper bound of their bucket, so they are within a factor two of the exact value.
+    """
+
+    __slots__ = ('count', 'sum', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        # type: () -> None
+        self.count = 0  # type: int
+        self.sum = 0  # type: int
+        self.min = None  # type: Optional[int]
+        self.max = None  # type: Optional[int]
+        self.buckets = [0] * 65  # type: List[int]
+
+    def Add(self, value):
+        # type: (int) -> None
+        if value < 0:
+            value = 0
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.buckets[min(value.bit_length(), 64)] += 1
+
+    def GetPercentile(self, percentile):
+        # type: (float) -> Optional[int]
+        """Returns an upper bound of the given percentile (0 to 100), capped by the maximum value. None if empty."""
+        if self.count == 0:
+            return None
+        rank = percentile / 100.0 * self.count
+        numValues = 0
+        for index, bucketCount in enumerate(self.buckets):
+            numValues += bucketCount
+            if bucketCount > 0 and numValues >= rank:
+                return min((1 << index) - 1, self.max)
+        return self.max
+
+    def ToDict(self):
+        # type: () -> Dict[str, Any]
+        """Returns count, sum, min, max, mean, p50, p90, p99 and the non-empty buckets as [upper bound, count] pairs."""
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+            'mean': float(self.sum) / self.count if self.count > 0 else None,
+            'p50': self.GetPercentile(50),
+            'p90': self.GetPercentile(90),
+            'p99': self.GetPercentile(99),
+            'buckets': [[(1 << index) - 1, bucketCount] for index, bucketCount in enumerate(self.buckets) if bucketCount > 0],
+        }
+
+
+class CommandStatistics(CommandHook):
+    """Thread safe histograms of the timings and message sizes of the commands sent by a client, per command name. Registered as a command hook by VisionControllerClient(collectStatistics=True).
+
+    Timings are recorded in microseconds under encodeUS, sendUS, waitUS and decodeUS, sizes in bytes under requestBytes and responseBytes, see CommandEvent. Commands that failed are not recorded.
+    """
+
+    _eventKeys = ('encodeUS', 'sendUS', 'waitUS', 'decodeUS', 'requestBytes', 'responseBytes')
+
+    _lock = None  # type: Optional[threading.Lock] # guards _histograms
+    _histograms = None  # type: Optional[Dict[str, Dict[str, Log2Histogram]]] # command name -> key -> histogram
+
+    def __init__(self):
+        # type: () -> None
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def OnAfterReceive(self, event, context):
+        # type: (CommandEvent, Any) -> None
+        with self._lock:
+            commandHistograms = self._histograms.get(event.commandName)
+            if commandHistograms is None:
+                commandHistograms = self._histograms[event.commandName] = {}
+            for key in self._eventKeys:
+                value = getattr(event, key)
+                if value is None:
+                    continue
+                histogram = commandHistograms.get(key)
+                if histogram is None:
+                    histogram = commandHistograms[key] = Log2Histogram()
+                histogram.Add(value)
+
+    def GetStatistics(self):
+        # type: () -> Dict[str, Dict[str, Dict[str, Any]]]
+        """Returns {command name: {key: histogram}}, see Log2Histogram.ToDict."""
+        with self._lock:
+            return dict((commandName, dict((key, histogram.ToDict()) for key, histogram in commandHistograms.items())) for commandName, commandHistograms in self._histograms.items())
+
+    def Reset(self):
+        # type: () -> None
+        with self._lock:
+            self._histograms = {}
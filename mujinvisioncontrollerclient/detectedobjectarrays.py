@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Vectorized extraction, transformation and filtering of the poses of detected objects
+
+"""Turns the detected objects of GetLatestDetectedObjects responses into numpy arrays, so that scoring and filtering run as array operations.
+
+Poses are 7 values, the quaternion followed by the translation: [qw, qx, qy, qz, x, y, z], taken from the quat_ and translation_ members of each detected object. Missing values are NaN, so objects without a pose never pass a filter.
+
+Typical use::
+
+    arrays = ExtractDetectedObjectArrays(response, attributeKeys=['confidence'])
+    poses = TransformPoses(robotFromWorldPose, arrays.poses)
+    arrays = arrays.Select(GetValidIntervalsMask(poses[:, 4], regionParameters['validIntervalsX']) & (arrays.attributes[:, 0] > 0.5))
+"""
+
+# system imports
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Sequence # noqa: F401 # used in type check
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# mujin imports
+from . import VisionControllerClientError
+from . import ugettext as _
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+
+def _CheckNumpy():
+    # type: () -> None
+    if numpy is None:
+        raise VisionControllerClientError(_('numpy is required to extract the poses of detected objects'), errortype='invaliddetectionresult')
+
+
+def ExtractPoses(detectedObjects):
+    # type: (Sequence[Dict[str, Any]]) -> numpy.ndarray
+    """Returns the poses of the detected objects as a (N, 7) float64 array of [qw, qx, qy, qz, x, y, z].
+
+    Args:
+        detectedObjects (list[dict]): detectedObjects of a detection result.
+
+    Raises:
+        VisionControllerClientError: If numpy is not installed, or a pose does not have the expected number of values.
+    """
+    _CheckNumpy()
+    poses = numpy.full((len(detectedObjects), 7), numpy.nan)
+    for index, detectedObject in enumerate(detectedObjects):
+        _FillPose(poses[index], detectedObject, index)
+    return poses
+
+
+def _FillPose(pose, detectedObject, index):
+    # type: (numpy.ndarray, Dict[str, Any], int) -> None
+    try:
+        quat = detectedObject.get('quat_')
+        if quat is not None:
+            pose[0:4] = quat
+        translation = detectedObject.get('translation_')
+        if translation is not None:
+            pose[4:7] = translation
+    except ValueError as e:
+        raise VisionControllerClientError(_('Detected object %d (%s) has an invalid pose: %s') % (index, detectedObject.get('name'), e), errortype='invaliddetectionresult')
+
+
+def _GetAttributeColumns(attributeKeys, attributeSizes):
+    # type: (Sequence[str], Optional[Sequence[int]]) -> List[int]
+    if attributeSizes is None:
+        return list(range(len(attributeKeys) + 1))
+    if len(attributeSizes) != len(attributeKeys):
+        raise ValueError(_('Got %d attribute sizes for %d attribute keys') % (len(attributeSizes), len(attributeKeys)))
+    columns = [0]
+    for size in attributeSizes:
+        columns.append(columns[-1] + size)
+    return columns
+
+
+def _FillAttributes(attributes, detectedObject, attributeKeys, columns, index):
+    # type: (numpy.ndarray, Dict[str, Any], Sequence[str], List[int], int) -> None
+    for ikey, key in enumerate(attributeKeys):
+        value = detectedObject.get(key)
+        if value is None:
+            continue
+        try:
+            attributes[columns[ikey]:columns[ikey + 1]] = value
+        except (TypeError, ValueError) as e:
+            raise VisionControllerClientError(_('Detected object %d (%s) has an invalid %s: %s') % (index, detectedObject.get('name'), key, e), errortype='invaliddetectionresult')
+
+
+def ExtractAttributes(detectedObjects, attributeKeys, attributeSizes=None):
+    # type: (Sequence[Dict[str, Any]], Sequence[str], Optional[Sequence[int]]) -> numpy.ndarray
+    """Returns numeric members of the detected objects as a (N, k) float64 array. Missing members are NaN.
+
+    Args:
+        detectedObjects (list[dict]): detectedObjects of a detection result.
+        attributeKeys (list[str]): Names of the members, e.g. ['confidence'].
+        attributeSizes (list[int], optional): Number of values of each member, e.g. 3 for an extents member. k is their sum. (Default: 1 for every member)
+    """
+    _CheckNumpy()
+    columns = _GetAttributeColumns(attributeKeys, attributeSizes)
+    attributes = numpy.full((len(detectedObjects), columns[-1]), numpy.nan)
+    for index, detectedObject in enumerate(detectedObjects):
+        _FillAttributes(attributes[index], detectedObject, attributeKeys, columns, index)
+    return attributes
+
+
+class DetectedObjectArrays(object):
+    """Arrays of the detected objects of all the detection results of a response, one row per object. See ExtractDetectedObjectArrays."""
+
+    poses = None  # type: Optional[numpy.ndarray] # (N, 7) [qw, qx, qy, qz, x, y, z]
+    attributes = None  # type: Optional[numpy.ndarray] # (N, k), columns in the order of attributeKeys
+    attributeKeys = None  # type: Optional[List[str]]
+    resultIndices = None  # type: Optional[numpy.ndarray] # (N,) index of the detection result of each object in detectionResults
+    objectIndices = None  # type: Optional[numpy.ndarray] # (N,) index of each object in the detectedObjects of its detection result
+
+    def __init__(self, poses, attributes, attributeKeys, resultIndices, objectIndices):
+        # type: (numpy.ndarray, numpy.ndarray, List[str], numpy.ndarray, numpy.ndarray) -> None
+        self.poses = poses
+        self.attributes = attributes
+        self.attributeKeys = attributeKeys
+        self.resultIndices = resultIndices
+        self.objectIndices = objectIndices
+
+    def __len__(self):
+        return len(self.poses)
+
+    def __repr__(self):
+        return '<DetectedObjectArrays %d objects>' % len(self.poses)
+
+    def Select(self, selection):
+        # type: (Any) -> DetectedObjectArrays
+        """Returns the rows selected by a boolean mask or an index array, e.g. a filter mask or the result of numpy.argsort on a score."""
+        return DetectedObjectArrays(self.poses[selection], self.attributes[selection], self.attributeKeys, self.resultIndices[selection], self.objectIndices[selection])
+
+    def GetDetectedObjects(self, response):
+        # type: (Dict[str, Any]) -> List[Dict[str, Any]]
+        """Returns the decoded detected objects of the rows, in row order, from the response the arrays were extracted from."""
+        detectionResults = response.get('detectionResults') or []
+        return [detectionResults[resultIndex]['detectedObjects'][objectIndex] for resultIndex, objectIndex in zip(self.resultIndices.tolist(), self.objectIndices.tolist())]
+
+
+def ExtractDetectedObjectArrays(response, attributeKeys=(), attributeSizes=None):
+    # type: (Dict[str, Any], Sequence[str], Optional[Sequence[int]]) -> DetectedObjectArrays
+    """Extracts the poses and attributes of the detected objects of all the detection results of a GetLatestDetectedObjects response, in one pass.
+
+    Args:
+        response (dict): Decoded response of GetLatestDetectedObjects.
+        attributeKeys (list[str], optional): See ExtractAttributes.
+        attributeSizes (list[int], optional): See ExtractAttributes.
+
+    Raises:
+        VisionControllerClientError: If numpy is not installed, or a pose or an attribute does not have the expected number of values.
+    """
+    _CheckNumpy()
+    detectionResults = response.get('detectionResults') or []
+    numObjects = sum(len(detectionResult.get('detectedObjects') or []) for detectionResult in detectionResults)
+    columns = _GetAttributeColumns(attributeKeys, attributeSizes)
+    poses = numpy.full((numObjects, 7), numpy.nan)
+    attributes = numpy.full((numObjects, columns[-1]), numpy.nan)
+    resultIndices = numpy.empty(numObjects, dtype=numpy.int32)
+    objectIndices = numpy.empty(numObjects, dtype=numpy.int32)
+    row = 0
+    for resultIndex, detectionResult in enumerate(detectionResults):
+        for objectIndex, detectedObject in enumerate(detectionResult.get('detectedObjects') or []):
+            _FillPose(poses[row], detectedObject, objectIndex)
+            if attributeKeys:
+                _FillAttributes(attributes[row], detectedObject, attributeKeys, columns, objectIndex)
+            resultIndices[row] = resultIndex
+            objectIndices[row] = objectIndex
+            row += 1
+    return DetectedObjectArrays(poses, attributes, list(attributeKeys), resultIndices, objectIndices)
+
+
+def MultiplyQuaternions(quat0, quat1):
+    # type: (numpy.ndarray, numpy.ndarray) -> numpy.ndarray
+    """Returns quat0 * quat1 for [qw, qx, qy, qz] quaternions of shape (4,) or (N, 4), broadcast against each other."""
+    w0, x0, y0, z0 = numpy.moveaxis(numpy.asarray(quat0, dtype=numpy.float64), -1, 0)
+    w1, x1, y1, z1 = numpy.moveaxis(numpy.asarray(quat1, dtype=numpy.float64), -1, 0)
+    return numpy.stack([
+        w0 * w1 - x0 * x1 - y0 * y1 - z0 * z1,
+        w0 * x1 + x0 * w1 + y0 * z1 - z0 * y1,
+        w0 * y1 - x0 * z1 + y0 * w1 + z0 * x1,
+        w0 * z1 + x0 * y1 - y0 * x1 + z0 * w1,
+    ], axis=-1)
+
+
+def RotateVectors(quat, vectors):
+    # type: (numpy.ndarray, numpy.ndarray) -> numpy.ndarray
+    """Rotates (3,) or (N, 3) vectors by unit [qw, qx, qy, qz] quaternions of shape (4,) or (N, 4)."""
+    quat = numpy.asarray(quat, dtype=numpy.float64)
+    vectors = numpy.asarray(vectors, dtype=numpy.float64)
+    w = quat[..., 0:1]
+    u = quat[..., 1:4]
+    uv = numpy.cross(u, vectors)
+    return vectors + 2.0 * (w * uv + numpy.cross(u, uv))
+
+
+def InvertPose(pose):
+    # type: (numpy.ndarray) -> numpy.ndarray
+    """Returns the inverse of a (7,) or (N, 7) pose."""
+    pose = numpy.asarray(pose, dtype=numpy.float64)
+    inverse = numpy.empty_like(pose)
+    inverse[..., 0] = pose[..., 0]
+    inverse[..., 1:4] = -pose[..., 1:4]
+    inverse[..., 4:7] = -RotateVectors(inverse[..., 0:4], pose[..., 4:7])
+    return inverse
+
+
+def TransformPoses(transform, poses):
+    # type: (numpy.ndarray, numpy.ndarray) -> numpy.ndarray
+    """Returns transform * poses, e.g. the poses in the robot frame given the pose of the world in the robot frame.
+
+    Args:
+        transform (numpy.ndarray): (7,) pose, or (N, 7) poses applied row by row.
+        poses (numpy.ndarray): (N, 7) poses.
+    """
+    transform = numpy.asarray(transform, dtype=numpy.float64)
+    poses = numpy.asarray(poses, dtype=numpy.float64)
+    transformed = numpy.empty(numpy.broadcast_shapes(transform.shape, poses.shape))
+    transformed[..., 0:4] = MultiplyQuaternions(transform[..., 0:4], poses[..., 0:4])
+    transformed[..., 4:7] = RotateVectors(transform[..., 0:4], poses[..., 4:7]) + transform[..., 4:7]
+    return transformed
+
+
+def GetValidIntervalsMask(values, validIntervals):
+    # type: (numpy.ndarray, Sequence[Sequence[float]]) -> numpy.ndarray
+    """Returns the boolean mask of the values lying in any of the [min, max] intervals, bounds included, e.g. the x of the translations against validIntervalsX of regionParametersSchema.
+
+    An empty list of intervals means no restriction, and every value passes. NaN values never pass.
+    """
+    values = numpy.asarray(values, dtype=numpy.float64)
+    if not validIntervals:
+        return ~numpy.isnan(values)
+    intervals = numpy.asarray(validIntervals, dtype=numpy.float64).reshape(-1, 2)
+    values = values[..., numpy.newaxis]
+    return ((values >= intervals[:, 0]) & (values <= intervals[:, 1])).any(axis=-1)
+
+
+def GetInRegionMask(poses, regionPose, regionExtents):
+    # type: (numpy.ndarray, numpy.ndarray, Sequence[float]) -> numpy.ndarray
+    """Returns the boolean mask of the poses whose translation lies in a box, bounds included.
+
+    Args:
+        poses (numpy.ndarray): (N, 7) poses.
+        regionPose (numpy.ndarray): (7,) pose of the center of the box, in the frame of the poses.
+        regionExtents (list[float]): Full size of the box along its x, y and z axes.
+    """
+    poses = numpy.asarray(poses, dtype=numpy.float64)
+    translations = RotateVectors(InvertPose(regionPose)[0:4], poses[:, 4:7] - numpy.asarray(regionPose, dtype=numpy.float64)[4:7])
+    halfExtents = 0.5 * numpy.asarray(regionExtents, dtype=numpy.float64)
+    return (numpy.abs(translations) <= halfExtents).all(axis=1)
+
+
+def GetRegionParametersMask(poses, regionParameters):
+    # type: (numpy.ndarray, Dict[str, Any]) -> numpy.ndarray
+    """Returns the boolean mask of the poses passing validIntervalsX and validIntervalsY of regionParametersSchema, applied to the x and y of the translations, and lying in the box of innerPose and innerExtents when both are given.
+
+    The poses have to be in the frame of the region parameters.
+    """
+    poses = numpy.asarray(poses, dtype=numpy.float64)
+    mask = GetValidIntervalsMask(poses[:, 4], regionParameters.get('validIntervalsX'))
+    mask &= GetValidIntervalsMask(poses[:, 5], regionParameters.get('validIntervalsY'))
+    if regionParameters.get('innerPose') is not None and regionParameters.get('innerExtents') is not None:
+        mask &= GetInRegionMask(poses, regionParameters['innerPose'], regionParameters['innerExtents'])
+    return mask
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Cache of GetLatestDetectedObjects responses shared by the callers of one process
+
+# system imports
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, Hashable, Optional # noqa: F401 # used in type check
+
+# mujin imports
+from . import VisionControllerTimeoutError
+from . import ugettext as _
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+
+class _CachedResponse(object):
+    __slots__ = ('future', 'fetchtime')
+
+    def __init__(self, future, fetchtime):
+        # type: (Future, float) -> None
+        self.future = future # resolved with the decoded response, or failed
+        self.fetchtime = fetchtime # time.monotonic() when the request was sent
+
+
+class DetectedObjectsCache(object):
+    """Caches decoded GetLatestDetectedObjects responses by key, e.g. (taskId, taskType, cycleIndex).
+
+    Callers asking for a key that is being fetched wait for that request instead of sending their own, and all of them get the same decoded object, which must therefore not be modified. Failed requests are not cached.
+
+    Entries are dropped by Invalidate, which the owner calls when a newer result may exist, and optionally when older than maxAge.
+    """
+
+    _fetchfn = None  # type: Optional[Callable[[Any, Optional[float]], Any]] # sends the request for a key and returns the decoded response
+    _maxAge = None  # type: Optional[float]
+    _lock = None  # type: Optional[threading.Lock] # guards everything below
+    _responses = None  # type: Optional[Dict[Any, _CachedResponse]]
+    _numHits = 0  # type: int # includes callers that waited for a request in flight
+    _numMisses = 0  # type: int
+    _numInvalidations = 0  # type: int
+
+    def __init__(self, fetchfn, maxAge=None):
+        # type: (Callable[[Any, Optional[float]], Any], Optional[float]) -> None
+        """Creates an empty cache.
+
+        Args:
+            fetchfn (Callable): Called with the key and the timeout given to Get, sends the request and returns the decoded response. Called on the thread of the first caller asking for the key.
+            maxAge (float, optional): Time in seconds after which a response is fetched again even if not invalidated. None means only Invalidate drops responses.
+        """
+        self._fetchfn = fetchfn
+        self._maxAge = maxAge
+        self._lock = threading.Lock()
+        self._responses = {}
+
+    def Get(self, key, timeout=None):
+        # type: (Hashable, Optional[float]) -> Any
+        """Returns the cached response of the key, fetching it if needed.
+
+        Args:
+            key: Key of the request.
+            timeout (float, optional): Passed to fetchfn when this caller sends the request, otherwise time in seconds to wait for the request sent by another caller. None means wait forever.
+
+        Raises:
+            VisionControllerTimeoutError: If the request of another caller did not finish within timeout.
+            Any error raised by fetchfn.
+        """
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None and self._maxAge is not None and cached.future.done() and time.monotonic() - cached.fetchtime > self._maxAge:
+                cached = None
+            if cached is not None:
+                self._numHits += 1
+                isfetcher = False
+            else:
+                self._numMisses += 1
+                cached = _CachedResponse(Future(), time.monotonic())
+                self._responses[key] = cached
+                isfetcher = True
+
+        if isfetcher:
+            try:
+                response = self._fetchfn(key, timeout)
+            except BaseException as e:
+                with self._lock:
+                    if self._responses.get(key) is cached:
+                        del self._responses[key]
+                cached.future.set_exception(e)
+                raise
+            cached.future.set_result(response)
+            return response
+
+        try:
+            return cached.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise VisionControllerTimeoutError(_('Timed out after %.03f seconds waiting for detected objects of %r requested by another caller') % (timeout, key), errortype='timeout')
+
+    def Invalidate(self):
+        # type: () -> None
+        """Drops all responses. Requests in flight still deliver their response to the callers already waiting for them."""
+        with self._lock:
+            if self._responses:
+                self._numInvalidations += 1
+                self._responses = {}
+
+    def GetStatistics(self):
+        # type: () -> Dict[str, int]
+        """Returns counters of the cache: hits, misses, invalidations and number of cached responses."""
+        with self._lock:
+            return {
+                'hits': self._numHits,
+                'misses': self._numMisses,
+                'invalidations': self._numInvalidations,
+                'numEntries': len(self._responses),
+            }
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Client side cache of the blobs returned by GetDetectionHistory
+
+# system imports
+import collections
+import itertools
+import mmap
+import os
+import threading
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Dict, Optional, Union # noqa: F401 # used in type check
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+
+class _SpilledEntry(object):
+    """Blob written to a file of the spill directory and mapped in memory."""
+
+    __slots__ = ('filename', 'size', 'mapped')
+
+    def __init__(self, filename, size, mapped):
+        # type: (str, int, Optional[mmap.mmap]) -> None
+        self.filename = filename
+        self.size = size
+        self.mapped = mapped # None for empty blobs, which cannot be mapped
+
+
+class DetectionHistoryCache(object):
+    """LRU cache of detection history blobs keyed by sensor timestamp, bounded by the total size of the blobs.
+
+    Blobs evicted from memory can be spilled to files in a directory, mapped in memory with mmap. Reading a spilled blob then costs no more than reading memory once the page cache has it, and the operating system can drop it under memory pressure. The files are removed when the blobs are evicted from the spill tier, or when the cache is destroyed.
+
+    The history of a sensor timestamp never changes, so entries are never invalidated. Use one cache per vision manager.
+    """
+
+    _lock = None  # type: Optional[threading.Lock] # guards everything below
+    _maxBytes = 0  # type: int # budget of the memory tier
+    _entries = None  # type: Optional[collections.OrderedDict] # timestamp -> blob, least recently used first
+    _numBytes = 0  # type: int # size of the blobs in _entries
+
+    _spillDirectory = None  # type: Optional[str] # directory of the spill tier, None if disabled
+    _maxSpillBytes = 0  # type: int # budget of the spill tier
+    _spilledEntries = None  # type: Optional[collections.OrderedDict] # timestamp -> _SpilledEntry, least recently used first
+    _numSpilledBytes = 0  # type: int
+    _spillsequence = None  # type: Optional[itertools.count] # makes the name of every spilled file unique, a timestamp can be spilled again while its previous file is still mapped
+
+    _numHits = 0  # type: int
+    _numSpillHits = 0  # type: int # hits served from the spill tier, included in _numHits
+    _numMisses = 0  # type: int
+    _numEvictions = 0  # type: int # blobs dropped from the cache altogether
+
+    def __init__(self, maxBytes=256 * 1024 * 1024, spillDirectory=None, maxSpillBytes=4 * 1024 * 1024 * 1024):
+        # type: (int, Optional[str], int) -> None
+        """Creates an empty cache.
+
+        Args:
+            maxBytes (int, optional): Total size in bytes of the blobs kept in memory. (Default: 256 MiB)
+            spillDirectory (str, optional): Directory of the spill tier. Created if it does not exist. If not specified, blobs evicted from memory are dropped.
+            maxSpillBytes (int, optional): Total size in bytes of the blobs kept in the spill directory. (Default: 4 GiB)
+        """
+        self._lock = threading.Lock()
+        self._maxBytes = maxBytes
+        self._entries = collections.OrderedDict()
+        self._spilledEntries = collections.OrderedDict()
+        self._spillsequence = itertools.count()
+        if spillDirectory is not None:
+            if not os.path.isdir(spillDirectory):
+                os.makedirs(spillDirectory)
+            self._spillDirectory = spillDirectory
+            self._maxSpillBytes = maxSpillBytes
+
+    def __del__(self):
+        self.Destroy()
+
+    def Destroy(self):
+        # type: () -> None
+        """Empties the cache and removes the spilled files."""
+        if self._lock is not None:
+            self.Clear()
+
+    def Clear(self):
+        # type: () -> None
+        with self._lock:
+            self._entries.clear()
+            self._numBytes = 0
+            spilledEntries = list(self._spilledEntries.values())
+            self._spilledEntries.clear()
+            self._numSpilledBytes = 0
+        for spilledEntry in spilledEntries:
+            self._RemoveSpilledEntry(spilledEntry)
+
+    def Get(self, timestamp):
+        # type: (int) -> Optional[Union[bytes, memoryview]]
+        """Returns the blob of the sensor timestamp, or None if it is not cached.
+
+        Blobs kept in memory are returned as they were given to Put. Spilled blobs are returned as a memoryview of the mapped file.
+        """
+        with self._lock:
+            data = self._entries.get(timestamp)
+            if data is not None:
+                self._entries.move_to_end(timestamp)
+                self._numHits += 1
+                return data
+            spilledEntry = self._spilledEntries.get(timestamp)
+            if spilledEntry is not None:
+                self._spilledEntries.move_to_end(timestamp)
+                self._numHits += 1
+                self._numSpillHits += 1
+                if spilledEntry.mapped is None:
+                    return b''
+                return memoryview(spilledEntry.mapped)
+            self._numMisses += 1
+            return None
+
+    def Put(self, timestamp, data):
+        # type: (int, Union[bytes, bytearray, memoryview]) -> None
+        """Adds the blob of the sensor timestamp, evicting the least recently used blobs when over budget."""
+        size = memoryview(data).nbytes
+        if isinstance(data, bytearray):
+            data = bytes(data) # the caller could modify it
+        tospill = []
+        toremove = []
+        with self._lock:
+            if timestamp in self._entries or timestamp in self._spilledEntries:
+                return
+            if size <= self._maxBytes:
+                self._entries[timestamp] = data
+                self._numBytes += size
+            else:
+                tospill.append((timestamp, data))
+            while self._numBytes > self._maxBytes:
+                evictedTimestamp, evictedData = self._entries.popitem(last=False)
+                self._numBytes -= memoryview(evictedData).nbytes
+                tospill.append((evictedTimestamp, evictedData))
+            if self._spillDirectory is None:
+                self._numEvictions += len(tospill)
+                return
+        # files are written without holding the lock
+        for spillTimestamp, spillData in tospill:
+            spilledEntry = self._WriteSpilledEntry(spillTimestamp, spillData)
+            with self._lock:
+                if spilledEntry is None or spilledEntry.size > self._maxSpillBytes:
+                    self._numEvictions += 1
+                    if spilledEntry is not None:
+                        toremove.append(spilledEntry)
+                    continue
+                if spillTimestamp in self._spilledEntries or spillTimestamp in self._entries:
+                    # while the file was written, the blob was put again by another thread and is already cached. the history of a timestamp never changes, so the cached copy is kept and callers holding a view of it are not disturbed
+                    toremove.append(spilledEntry)
+                    continue
+                self._spilledEntries[spillTimestamp] = spilledEntry
+                self._numSpilledBytes += spilledEntry.size
+                while self._numSpilledBytes > self._maxSpillBytes:
+                    evictedTimestamp, evictedEntry = self._spilledEntries.popitem(last=False)
+                    self._numSpilledBytes -= evictedEntry.size
+                    self._numEvictions += 1
+                    toremove.append(evictedEntry)
+        for spilledEntry in toremove:
+            self._RemoveSpilledEntry(spilledEntry)
+
+    def _WriteSpilledEntry(self, timestamp, data):
+        # type: (int, Union[bytes, memoryview]) -> Optional[_SpilledEntry]
+        filename = os.path.join(self._spillDirectory, 'detectionhistory-%x-%s-%d.bin' % (id(self), timestamp, next(self._spillsequence)))
+        try:
+            with open(filename, 'w+b') as f:
+                f.write(data)
+                f.flush()
+                size = f.tell()
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size > 0 else None
+        except (IOError, OSError, ValueError) as e:
+            log.warning('failed to spill detection history %s to %s: %s', timestamp, filename, e)
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+            return None
+        return _SpilledEntry(filename, size, mapped)
+
+    def _RemoveSpilledEntry(self, spilledEntry):
+        # type: (_SpilledEntry) -> None
+        if spilledEntry.mapped is not None:
+            try:
+                spilledEntry.mapped.close()
+            except BufferError:
+                # a caller still holds a view of it, the mapping goes away with the last view
+                pass
+        try:
+            os.remove(spilledEntry.filename)
+        except OSError as e:
+            log.warning('failed to remove spilled detection history %s: %s', spilledEntry.filename, e)
+
+    def GetStatistics(self):
+        # type: () -> Dict[str, int]
+        """Returns counters of the cache: hits, spillHits (included in hits), misses, evictions, and the number and size of the blobs in each tier."""
+        with self._lock:
+            return {
+                'hits': self._numHits,
+                'spillHits': self._numSpillHits,
+                'misses': self._numMisses,
+                'evictions': self._numEvictions,
+                'numEntries': len(self._entries),
+                'numBytes': self._numBytes,
+                'numSpilledEntries': len(self._spilledEntries),
+                'numSpilledBytes': self._numSpilledBytes,
+            }
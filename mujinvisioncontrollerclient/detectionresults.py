@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Typed view of the detection results returned by GetLatestDetectedObjects
+
+"""Wraps the decoded response of GetLatestDetectedObjects in compact objects.
+
+Nothing is built when parsing. The first time the poses, confidences or objects of a detection result are asked for, the poses and confidences of all its detected objects are packed into numpy arrays and their names and object uris into lists. The result then drops its reference to the decoded detectedObjects, so they are freed once the caller drops the response. Other members of the detected objects are not kept, read them from the response if needed. DetectedObject instances are only created when the list of objects is asked for. The decoded response is not modified, so it can be shared, e.g. with the DetectedObjectsCache.
+
+The confidence of a detected object is either a number, or a dict whose global_confidence is used.
+
+Poses are laid out as in detectedobjectarrays, which also has the functions transforming and filtering them.
+"""
+
+# system imports
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterator, List, Optional # noqa: F401 # used in type check
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# mujin imports
+from . import VisionControllerClientError
+from . import ugettext as _
+from .detectedobjectarrays import ExtractPoses
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+
+class DetectedObject(object):
+    """One detected object of a DetectionResult. Its pose is a view of the packed arrays of the result."""
+
+    __slots__ = ('name', 'objectUri', '_result', '_index')
+
+    def __init__(self, result, index, name, objectUri):
+        # type: (DetectionResult, int, Optional[str], Optional[str]) -> None
+        self.name = name  # type: Optional[str]
+        self.objectUri = objectUri  # type: Optional[str]
+        self._result = result
+        self._index = index
+
+    def __repr__(self):
+        return '<DetectedObject %s %d of %s>' % (self.name, self._index, self._result.taskId)
+
+    def GetIndex(self):
+        # type: () -> int
+        """Returns the index of the object in detectedObjects, which is also its row in the arrays of the result."""
+        return self._index
+
+    def GetPose(self):
+        # type: () -> numpy.ndarray
+        """Returns the pose [qw, qx, qy, qz, x, y, z] as a read-only view of DetectionResult.GetPoses."""
+        return self._result.GetPoses()[self._index]
+
+    def GetQuaternion(self):
+        # type: () -> numpy.ndarray
+        return self._result.GetPoses()[self._index, 0:4]
+
+    def GetTranslation(self):
+        # type: () -> numpy.ndarray
+        return self._result.GetPoses()[self._index, 4:7]
+
+    def GetConfidence(self):
+        # type: () -> float
+        """Returns the confidence of the object, NaN if it has none."""
+        return float(self._result.GetConfidences()[self._index])
+
+
+class DetectionResult(object):
+    """One entry of detectionResults, see ParseDetectionResults."""
+
+    __slots__ = ('taskId', 'cycleIndex', 'locationName', 'resultTimestampUS', 'imageStartTimestampMS', 'imageEndTimeStampMS', 'pointCloudId', 'statsUID', 'targetUpdateName', 'sensorSelectionInfos', 'info', '_numDetectedObjects', '_rawDetectedObjects', '_names', '_objectUris', '_detectedObjects', '_poses', '_confidences')
+
+    def __init__(self, info):
+        # type: (Dict[str, Any]) -> None
+        self.taskId = info.get('taskId')  # type: Optional[str]
+        self.cycleIndex = info.get('cycleIndex')  # type: Optional[str]
+        self.locationName = info.get('locationName')  # type: Optional[str]
+        self.resultTimestampUS = info.get('resultTimestampUS')  # type: Optional[int]
+        self.imageStartTimestampMS = info.get('imageStartTimestampMS')  # type: Optional[int]
+        self.imageEndTimeStampMS = info.get('imageEndTimeStampMS')  # type: Optional[int]
+        self.pointCloudId = info.get('pointCloudId')  # type: Optional[str]
+        self.statsUID = info.get('statsUID')  # type: Optional[str]
+        self.targetUpdateName = info.get('targetUpdateName')  # type: Optional[str]
+        self.sensorSelectionInfos = info.get('sensorSelectionInfos') or []  # type: List[Dict[str, Any]]
+        self.info = {key: value for key, value in info.items() if key != 'detectedObjects'}  # type: Dict[str, Any] # decoded entry of detectionResults without its detectedObjects, for the members not exposed here
+        self._rawDetectedObjects = info.get('detectedObjects') or []  # type: Optional[List[Dict[str, Any]]] # decoded detectedObjects, dropped once packed
+        self._numDetectedObjects = len(self._rawDetectedObjects)  # type: int
+        self._names = None  # type: Optional[List[Optional[str]]] # packed with the arrays
+        self._objectUris = None  # type: Optional[List[Optional[str]]] # packed with the arrays
+        self._detectedObjects = None  # type: Optional[List[DetectedObject]] # created on first access
+        self._poses = None  # type: Optional[numpy.ndarray] # (N, 7) float64, packed on first access
+        self._confidences = None  # type: Optional[numpy.ndarray] # (N,) float64, packed on first access
+
+    def __len__(self):
+        return self._numDetectedObjects
+
+    def __iter__(self):
+        # type: () -> Iterator[DetectedObject]
+        return iter(self.GetDetectedObjects())
+
+    def __repr__(self):
+        return '<DetectionResult %s %s %d objects>' % (self.taskId, self.resultTimestampUS, self._numDetectedObjects)
+
+    def GetDetectedObjects(self):
+        # type: () -> List[DetectedObject]
+        """Returns the detected objects. Packs the arrays of the result if not done yet, see GetPoses for the errors."""
+        if self._detectedObjects is None:
+            if self._poses is None:
+                self._PackArrays()
+            self._detectedObjects = [DetectedObject(self, index, name, objectUri) for index, (name, objectUri) in enumerate(zip(self._names, self._objectUris))]
+        return self._detectedObjects
+
+    def GetPoses(self):
+        # type: () -> numpy.ndarray
+        """Returns the poses of all the detected objects as a read-only (N, 7) float64 array of [qw, qx, qy, qz, x, y, z]. Missing quat_ or translation_ are NaN.
+
+        Raises:
+            VisionControllerClientError: If numpy is not installed, or a pose or confidence is invalid.
+        """
+        if self._poses is None:
+            self._PackArrays()
+        return self._poses
+
+    def GetConfidences(self):
+        # type: () -> numpy.ndarray
+        """Returns the confidences of all the detected objects as a read-only (N,) float64 array. Missing confidences are NaN, and the global_confidence is used when a confidence is a dict."""
+        if self._confidences is None:
+            self._PackArrays()
+        return self._confidences
+
+    def _PackArrays(self):
+        # type: () -> None
+        rawDetectedObjects = self._rawDetectedObjects
+        poses = ExtractPoses(rawDetectedObjects)
+        confidences = numpy.array([_GetConfidence(detectedObject, index) for index, detectedObject in enumerate(rawDetectedObjects)], dtype=numpy.float64)
+        poses.flags.writeable = False
+        confidences.flags.writeable = False
+        self._names = [detectedObject.get('name') for detectedObject in rawDetectedObjects]
+        self._objectUris = [detectedObject.get('object_uri') for detectedObject in rawDetectedObjects]
+        self._poses = poses
+        self._confidences = confidences
+        self._rawDetectedObjects = None
+
+
+def _GetConfidence(detectedObject, index):
+    # type: (Dict[str, Any], int) -> float
+    """Returns the confidence of a decoded detected object, the global_confidence if it is a dict, NaN if it has none."""
+    confidence = detectedObject.get('confidence')
+    if isinstance(confidence, dict):
+        confidence = confidence.get('global_confidence')
+    if confidence is None:
+        return float('nan')
+    try:
+        return float(confidence)
+    except (TypeError, ValueError) as e:
+        raise VisionControllerClientError(_('Detected object %d (%s) has an invalid confidence: %s') % (index, detectedObject.get('name'), e), errortype='invaliddetectionresult')
+
+
+def ParseDetectionResults(response):
+    # type: (Dict[str, Any]) -> List[DetectionResult]
+    """Wraps the detectionResults of a GetLatestDetectedObjects response. Nothing is copied until the poses or detected objects are asked for.
+
+    Args:
+        response (dict): Decoded response of GetLatestDetectedObjects.
+    """
+    return [DetectionResult(info) for info in response.get('detectionResults') or []]
@@ -0,0 +1,641 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Stand-in vision manager serving synthetic results, for tests and benchmarks of the client
+
+"""FakeVisionManager binds the ports of a vision manager and answers the commands sent by VisionControllerClient with synthetic results.
+
+- The command port and the configuration port are ROUTER sockets. They serve REQ clients, whose requests are [identity, b'', payload], and PipelinedCommandChannel, whose requests are [identity, b'', requestid, payload]. Replies can be delayed, so replies to pipelined requests can come back out of order.
+- The status port is a PUB socket publishing the server state, with one entry in slavestates per slave request id seen in the commands.
+- Started tasks produce a detection result every detectionInterval seconds, with numDetectedObjects objects and numImages images of imageSize bytes.
+- GetLatestDetectionResultImages replies in a layout of this stand-in only, read by ParseFakeResultImages: a little endian uint32 header size, a header encoded with the codec holding resultTimestampUS, taskId and an images list, then the image data. Real vision managers send their own format, which the client returns unparsed.
+
+LoadRecording replaces the synthetic replies and published states with the ones of a recording written by commandrecorder.CommandRecorder.
+
+Endpoints can be tcp, ipc or inproc. With tcp the ports are commandport, commandport + 1 (status) and commandport + 2 (configuration) as for a real vision manager. With ipc and inproc the port is only part of the endpoint names, see GetEndpoint.
+"""
+
+# system imports
+import heapq
+import itertools
+import os
+import random
+import struct
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, List, Optional, Tuple, Union # noqa: F401 # used in type check
+    from .codec import Codec # noqa: F401 # used in type check
+    from .commandrecorder import CommandRecording # noqa: F401 # used in type check
+
+# mujin imports
+from . import zmq
+from .codec import GetCodec
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+_imagesHeaderSizeStruct = struct.Struct('<I')
+
+
+def _EncodeResultImages(images, header, codec):
+    # type: (List[Tuple[Dict[str, Any], bytes]], Dict[str, Any], Codec) -> bytes
+    """Builds a GetLatestDetectionResultImages reply of FakeVisionManager, see ParseFakeResultImages."""
+    infos = []
+    offset = 0
+    for info, data in images:
+        infos.append(dict(info, offset=offset, size=len(data)))
+        offset += len(data)
+    encodedheader = codec.Encode(dict(header, images=infos))
+    return b''.join([_imagesHeaderSizeStruct.pack(len(encodedheader)), encodedheader] + [data for info, data in images])
+
+
+def ParseFakeResultImages(rawImages, codec=None):
+    # type: (Union[bytes, memoryview], Optional[Union[str, Codec]]) -> Tuple[Dict[str, Any], List[Tuple[Dict[str, Any], memoryview]]]
+    """Reads a GetLatestDetectionResultImages reply of FakeVisionManager, e.g. in tests. Only for this stand-in, real vision managers send another format.
+
+    Returns:
+        tuple: (header, list of (image info, image data as a memoryview of rawImages))
+    """
+    view = memoryview(rawImages).cast('B')
+    headerSize, = _imagesHeaderSizeStruct.unpack_from(view, 0)
+    dataOffset = _imagesHeaderSizeStruct.size + headerSize
+    header = GetCodec(codec).Decode(view[_imagesHeaderSizeStruct.size:dataOffset])
+    images = [(info, view[dataOffset + info['offset']:dataOffset + info['offset'] + info['size']]) for info in header['images']]
+    return header, images
+
+
+class _ParkedRequest(object):
+    """GetLatestDetectionResultImages waiting for a result newer than the latest one."""
+
+    __slots__ = ('socket', 'prefix', 'command')
+
+    def __init__(self, socket, prefix, command):
+        # type: (zmq.Socket, List[bytes], Dict[str, Any]) -> None
+        self.socket = socket
+        self.prefix = prefix
+        self.command = command
+
+
+class FakeVisionManager(object):
+    """Stand-in vision manager, see the module documentation. All sockets are used by one background thread started by Start."""
+
+    hostname = None  # type: Optional[str]
+    commandport = None  # type: Optional[int]
+    transport = None  # type: Optional[str] # 'tcp', 'ipc' or 'inproc'
+
+    _ctx = None  # type: Optional[zmq.Context]
+    _ctxown = None  # type: Optional[zmq.Context]
+    _codec = None  # type: Optional[Codec]
+    _ipcDirectory = None  # type: Optional[str]
+    _endpoints = None  # type: Optional[Dict[str, str]] # 'command', 'configuration', 'status' -> bound endpoint
+    _commandsocket = None  # type: Optional[zmq.Socket]
+    _configurationsocket = None  # type: Optional[zmq.Socket]
+    _statussocket = None  # type: Optional[zmq.Socket]
+    _thread = None  # type: Optional[threading.Thread]
+    _stopped = False  # type: bool
+
+    _numDetectedObjects = 10  # type: int
+    _detectionInterval = 0.1  # type: float
+    _numImages = 2  # type: int
+    _imageSize = 0  # type: int
+    _historySize = 0  # type: int
+    _numExtraSlaves = 0  # type: int
+    _publishInterval = 0.1  # type: float
+    _latency = 0.0  # type: float
+    _latencyJitter = 0.0  # type: float
+    _commandLatencies = None  # type: Optional[Dict[str, float]]
+    _errorRate = 0.0  # type: float
+    _commandErrorRates = None  # type: Optional[Dict[str, float]]
+    _dropRate = 0.0  # type: float
+    _random = None  # type: Optional[random.Random]
+
+    # only used by the server thread
+    _handlers = None  # type: Optional[Dict[str, Callable[[Dict[str, Any]], Any]]] # command name -> handler returning the reply, or None to park the request
+    _tasks = None  # type: Optional[Dict[str, Dict[str, Any]]] # taskId -> task state
+    _results = None  # type: Optional[Dict[str, Dict[str, Any]]] # taskId -> latest detection result
+    _latestResultTimestampUS = 0  # type: int
+    _slaverequestids = None  # type: Optional[List[str]]
+    _parkedRequests = None  # type: Optional[List[_ParkedRequest]]
+    _delayedReplies = None  # type: Optional[List[Tuple[float, int, zmq.Socket, List[bytes]]]] # heap of (due time, sequence, socket, frames)
+    _replysequence = None  # type: Optional[itertools.count]
+    _imageData = None  # type: Optional[bytes]
+    _historyData = None  # type: Optional[bytes]
+    _recordedReplies = None  # type: Optional[Dict[str, List[Tuple[Optional[bytes], Optional[float]]]]] # command name -> recorded (reply or None to drop, latency), set by LoadRecording
+    _recordedReplyIndices = None  # type: Optional[Dict[str, int]] # command name -> number of recorded replies sent
+    _recordedStates = None  # type: Optional[List[Tuple[float, bytes]]] # recorded (time in seconds from the first one, raw state), set by LoadRecording
+    _recordedStateIndex = 0  # type: int # next recorded state to publish
+    _recordingSpeed = 1.0  # type: Optional[float]
+
+    _countslock = None  # type: Optional[threading.Lock] # guards _commandCounts
+    _commandCounts = None  # type: Optional[Dict[str, int]] # command name -> number of commands received
+
+    def __init__(self, hostname='127.0.0.1', commandport=None, transport='tcp', ctx=None, codec=None, ipcDirectory=None, initialTaskIds=(), numDetectedObjects=10, detectionInterval=0.1, numImages=2, imageSize=640 * 480 * 2, historySize=1024 * 1024, numExtraSlaves=0, publishInterval=0.1, latency=0.0, latencyJitter=0.0, commandLatencies=None, errorRate=0.0, commandErrorRates=None, dropRate=0.0, seed=None):
+        # type: (str, Optional[int], str, Optional[zmq.Context], Optional[Union[str, Codec]], Optional[str], Tuple[str, ...], int, float, int, int, int, int, float, float, float, Optional[Dict[str, float]], float, Optional[Dict[str, float]], float, Optional[int]) -> None
+        """Creates the server. Nothing is bound until Start.
+
+        Args:
+            hostname (str, optional): Interface to bind with tcp. (Default: 127.0.0.1)
+            commandport (int, optional): Command port. With tcp, if not given, free consecutive ports are picked. With ipc and inproc it only names the endpoints.
+            transport (str, optional): 'tcp', 'ipc' or 'inproc'. inproc clients have to use the same ctx. (Default: tcp)
+            ctx (zmq.Context, optional): The ZMQ context. If not given, the server creates its own.
+            codec (str or Codec, optional): Codec of the commands and replies. (Default: the json module picked by the package)
+            ipcDirectory (str, optional): Directory of the ipc endpoints. (Default: the temporary directory)
+            initialTaskIds (tuple[str], optional): Tasks running from the start, so that results are produced without sending StartObjectDetectionTask first.
+            numDetectedObjects (int, optional): Number of detected objects of every detection result. (Default: 10)
+            detectionInterval (float, optional): Time in seconds between two detection results of the running tasks. (Default: 0.1)
+            numImages (int, optional): Number of images returned by GetLatestDetectionResultImages. (Default: 2)
+            imageSize (int, optional): Size in bytes of every image. (Default: 640 * 480 * 2)
+            historySize (int, optional): Size in bytes of the blobs returned by GetDetectionHistory. (Default: 1 MiB)
+            numExtraSlaves (int, optional): Number of idle slaves added to the published state, to make it as large as the one of a busy vision manager. (Default: 0)
+            publishInterval (float, optional): Time in seconds between two published states. A state is also published on every new detection result. (Default: 0.1)
+            latency (float, optional): Time in seconds every reply is delayed by. (Default: 0)
+            latencyJitter (float, optional): Maximum random time in seconds added to the latency. (Default: 0)
+            commandLatencies (dict, optional): Latency of specific commands, by command name, overriding latency.
+            errorRate (float, optional): Probability of replying with an error to a command. (Default: 0)
+            commandErrorRates (dict, optional): Error rate of specific commands, by command name, overriding errorRate.
+            dropRate (float, optional): Probability of never replying to a command, so that the client times out. (Default: 0)
+            seed (int, optional): Seed of the random numbers, for reproducible runs.
+        """
+        assert transport in ('tcp', 'ipc', 'inproc'), 'unknown transport %r' % transport
+        self.hostname = hostname
+        self.commandport = commandport
+        self.transport = transport
+        self._ctx = ctx
+        self._codec = GetCodec(codec)
+        self._ipcDirectory = ipcDirectory or tempfile.gettempdir()
+        self._numDetectedObjects = numDetectedObjects
+        self._detectionInterval = detectionInterval
+        self._numImages = numImages
+        self._imageSize = imageSize
+        self._historySize = historySize
+        self._numExtraSlaves = numExtraSlaves
+        self._publishInterval = publishInterval
+        self._latency = latency
+        self._latencyJitter = latencyJitter
+        self._commandLatencies = dict(commandLatencies or {})
+        self._errorRate = errorRate
+        self._commandErrorRates = dict(commandErrorRates or {})
+        self._dropRate = dropRate
+        self._random = random.Random(seed)
+        self._countslock = threading.Lock()
+        self._commandCounts = {}
+
+        self._handlers = {
+            'StartObjectDetectionTask': self._StartTask,
+            'StartContainerDetectionTask': self._StartTask,
+            'StartVisualizePointCloudTask': self._StartTask,
+            'StopTask': self._StopTask,
+            'ResumeTask': self._ResumeTask,
+            'GetLatestDetectedObjects': self._GetLatestDetectedObjects,
+            'GetLatestDetectionResultImages': self._GetLatestDetectionResultImages,
+            'GetDetectionHistory': self._GetDetectionHistory,
+            'GetTaskState': self._GetTaskState,
+            'GetPublishedState': lambda command: self._GetPublishedState(),
+            'BackupDetectionLogs': lambda command: {},
+            'Ping': lambda command: {'timestamp': int(time.time() * 1000)},
+            'setloglevel': lambda command: {},
+            'TerminateSlaves': lambda command: {},
+            'cancel': lambda command: {},
+            'quit': lambda command: {},
+        }
+        self._tasks = {}
+        self._results = {}
+        self._slaverequestids = []
+        self._parkedRequests = []
+        self._delayedReplies = []
+        self._replysequence = itertools.count()
+        self._recordedReplies = {}
+        self._recordedReplyIndices = {}
+        self._recordedStates = []
+        for taskId in initialTaskIds:
+            self._StartTask({'taskId': taskId, 'command': 'StartObjectDetectionTask'})
+
+    def __del__(self):
+        self.Destroy()
+
+    def __enter__(self):
+        self.Start()
+        return self
+
+    def __exit__(self, exctype, excvalue, traceback):
+        self.Destroy()
+
+    def Start(self):
+        # type: () -> None
+        """Binds the sockets and starts the server thread. Raises zmq.ZMQError if the endpoints cannot be bound."""
+        assert self._thread is None
+        if self._ctx is None:
+            self._ctxown = zmq.Context()
+            self._ctx = self._ctxown
+        self._Bind()
+        # payloads are built once, only the headers of the images change between results
+        self._imageData = bytes(self._imageSize)
+        self._historyData = bytes(self._historySize)
+        self._stopped = False
+        self._thread = threading.Thread(target=self._RunServerThread, name='FakeVisionManager')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def Destroy(self):
+        # type: () -> None
+        """Stops the server thread and closes the sockets."""
+        self._stopped = True
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for socket in (self._commandsocket, self._configurationsocket, self._statussocket):
+            if socket is not None:
+                socket.close(linger=0)
+        self._commandsocket = None
+        self._configurationsocket = None
+        self._statussocket = None
+        if self._ctxown is not None:
+            self._ctxown.term()
+            self._ctxown = None
+            self._ctx = None
+
+    def LoadRecording(self, recording, speed=1.0, replayLatency=True):
+        # type: (CommandRecording, Optional[float], bool) -> None
+        """Answers the commands found in the recording with their recorded replies, in the recorded order and starting over when all were sent, and publishes the recorded states instead of the synthetic ones. Commands that are not in the recording get synthetic replies. Has to be called before Start.
+
+        Commands that got no reply when recorded, e.g. because they timed out, are dropped. Error injection still applies.
+
+        Args:
+            recording (CommandRecording): The recording.
+            speed (float, optional): 2.0 replays twice as fast as recorded: the recorded latencies and the times between the published states are divided by it. None or 0 replies without delay and publishes every publishInterval. (Default: 1.0)
+            replayLatency (bool, optional): If True, replies are delayed by the recorded waitUS of the command, which includes the network, instead of latency. (Default: True)
+        """
+        assert self._thread is None, 'LoadRecording has to be called before Start'
+        recordedReplies = {}  # type: Dict[str, List[Tuple[Optional[bytes], Optional[float]]]]
+        recordedStates = []  # type: List[Tuple[float, bytes]]
+        firstStateTimeUS = None
+        for record in recording.IterRecords():
+            rawState = recording.GetPublishedState(record)
+            if rawState is not None:
+                if firstStateTimeUS is None:
+                    firstStateTimeUS = record['timeUS']
+                recordedStates.append(((record['timeUS'] - firstStateTimeUS) / 1000000.0, rawState))
+                continue
+            if record.get('type') != 'command' or record.get('channel') == 'publishedstate' or record.get('fireandforget') or not record.get('commandName'):
+                continue
+            latency = None
+            if replayLatency and record.get('waitUS') is not None:
+                latency = record['waitUS'] / 1000000.0 / speed if speed else 0.0
+            recordedReplies.setdefault(record['commandName'], []).append((recording.GetResponse(record), latency))
+        self._recordedReplies = recordedReplies
+        self._recordedReplyIndices = {}
+        self._recordedStates = recordedStates
+        self._recordedStateIndex = 0
+        self._recordingSpeed = speed
+
+    def GetEndpoint(self, name):
+        # type: (str) -> str
+        """Returns the endpoint clients connect to: name is 'command', 'configuration' or 'status'."""
+        return self._endpoints[name]
+
+    def GetCommandCounts(self):
+        # type: () -> Dict[str, int]
+        """Returns the number of commands received, by command name, including the dropped and failed ones."""
+        with self._countslock:
+            return dict(self._commandCounts)
+
+    def _Bind(self):
+        # type: () -> None
+        if self.transport == 'tcp':
+            self._BindTcp()
+            return
+        name = 'mujinvisionmanager-%s' % (self.commandport if self.commandport is not None else '%d-%x' % (os.getpid(), id(self)))
+        if self.transport == 'ipc':
+            endpointFormat = 'ipc://' + os.path.join(self._ipcDirectory, name + '-%s')
+        else:
+            endpointFormat = 'inproc://' + name + '-%s'
+        self._endpoints = dict((socketName, endpointFormat % socketName) for socketName in ('command', 'configuration', 'status'))
+        self._CreateSockets()
+        self._commandsocket.bind(self._endpoints['command'])
+        self._configurationsocket.bind(self._endpoints['configuration'])
+        self._statussocket.bind(self._endpoints['status'])
+
+    def _BindTcp(self):
+        # type: () -> None
+        for attempt in range(100):
+            self._CreateSockets()
+            try:
+                if self.commandport is None:
+                    commandport = self._commandsocket.bind_to_random_port('tcp://%s' % self.hostname, max_port=65533)
+                else:
+                    commandport = self.commandport
+                    self._commandsocket.bind('tcp://%s:%d' % (self.hostname, commandport))
+                self._statussocket.bind('tcp://%s:%d' % (self.hostname, commandport + 1))
+                self._configurationsocket.bind('tcp://%s:%d' % (self.hostname, commandport + 2))
+            except zmq.ZMQError:
+                for socket in (self._commandsocket, self._configurationsocket, self._statussocket):
+                    socket.close(linger=0)
+                if self.commandport is not None:
+                    raise
+                continue
+            self.commandport = commandport
+            self._endpoints = {
+                'command': 'tcp://%s:%d' % (self.hostname, commandport),
+                'status': 'tcp://%s:%d' % (self.hostname, commandport + 1),
+                'configuration': 'tcp://%s:%d' % (self.hostname, commandport + 2),
+            }
+            return
+        raise zmq.ZMQError(msg='no free consecutive ports on %s' % self.hostname)
+
+    def _CreateSockets(self):
+        # type: () -> None
+        self._commandsocket = self._ctx.socket(zmq.ROUTER)
+        self._configurationsocket = self._ctx.socket(zmq.ROUTER)
+        self._statussocket = self._ctx.socket(zmq.PUB)
+        for socket in (self._commandsocket, self._configurationsocket, self._statussocket):
+            socket.setsockopt(zmq.LINGER, 0)
+
+    def _RunServerThread(self):
+        # type: () -> None
+        poller = zmq.Poller()
+        poller.register(self._commandsocket, zmq.POLLIN)
+        poller.register(self._configurationsocket, zmq.POLLIN)
+        now = time.monotonic()
+        nextDetectionTime = now + self._detectionInterval
+        nextPublishTime = now
+        while not self._stopped:
+            now = time.monotonic()
+            waitTime = min(nextDetectionTime, nextPublishTime, now + 0.05)
+            if self._delayedReplies:
+                waitTime = min(waitTime, self._delayedReplies[0][0])
+            for socket, event in poller.poll(max(0, int((waitTime - now) * 1000))):
+                while True:
+                    try:
+                        frames = socket.recv_multipart(zmq.NOBLOCK)
+                    except zmq.Again:
+                        break
+                    self._HandleMessage(socket, frames)
+
+            now = time.monotonic()
+            if now >= nextDetectionTime:
+                nextDetectionTime = now + self._detectionInterval
+                if self._ProduceResults() and not self._recordedStates:
+                    nextPublishTime = now
+            while self._delayedReplies and self._delayedReplies[0][0] <= now:
+                dueTime, sequence, socket, frames = heapq.heappop(self._delayedReplies)
+                socket.send_multipart(frames)
+            if now >= nextPublishTime:
+                nextPublishTime = now + self._PublishState()
+
+    def _PublishState(self):
+        # type: () -> float
+        """Publishes the next state and returns the time in seconds until the following one."""
+        if not self._recordedStates:
+            self._statussocket.send(self._codec.Encode(self._GetPublishedState()))
+            return self._publishInterval
+        stateTime, rawState = self._recordedStates[self._recordedStateIndex]
+        self._statussocket.send(rawState)
+        self._recordedStateIndex = (self._recordedStateIndex + 1) % len(self._recordedStates)
+        if self._recordedStateIndex == 0 or not self._recordingSpeed:
+            return self._publishInterval
+        return max(0.0, (self._recordedStates[self._recordedStateIndex][0] - stateTime) / self._recordingSpeed)
+
+    def _HandleMessage(self, socket, frames):
+        # type: (zmq.Socket, List[bytes]) -> None
+        if len(frames) == 3 and not frames[1]:
+            prefix = frames[:2] # REQ: identity, delimiter
+        elif len(frames) == 4 and not frames[1]:
+            prefix = frames[:3] # pipelined: identity, delimiter, requestid
+        else:
+            log.warning('dropping message of %d frames', len(frames))
+            return
+        try:
+            command = self._codec.Decode(frames[-1])
+        except Exception as e:
+            self._Reply(socket, prefix, {'error': {'type': 'invalidcommand', 'desc': 'failed to decode command: %s' % e}}, None)
+            return
+        if not isinstance(command, dict) or not isinstance(command.get('command'), (str, type(None))):
+            self._Reply(socket, prefix, {'error': {'type': 'invalidcommand', 'desc': 'command has to be an object with a command name'}}, None)
+            return
+        # a failing command must not stop the server thread, the client gets an error instead
+        try:
+            self._HandleCommand(socket, prefix, command)
+        except Exception as e:
+            log.exception('failed to handle command %s: %s', command.get('command'), e)
+            self._Reply(socket, prefix, {'error': {'type': 'unknownerror', 'desc': 'failed to handle command %s: %s' % (command.get('command'), e)}}, None)
+
+    def _HandleCommand(self, socket, prefix, command):
+        # type: (zmq.Socket, List[bytes], Dict[str, Any]) -> None
+        commandName = command.get('command')
+        with self._countslock:
+            self._commandCounts[commandName] = self._commandCounts.get(commandName, 0) + 1
+        slaverequestid = command.get('slaverequestid')
+        if slaverequestid is not None and slaverequestid not in self._slaverequestids:
+            self._slaverequestids.append(slaverequestid)
+
+        if self._dropRate > 0 and self._random.random() < self._dropRate:
+            return
+        errorRate = self._commandErrorRates.get(commandName, self._errorRate)
+        if errorRate > 0 and self._random.random() < errorRate:
+            self._Reply(socket, prefix, {'error': {'type': 'injectederror', 'desc': 'injected error for %s' % commandName}}, commandName)
+            return
+        recordedReplies = self._recordedReplies.get(commandName)
+        if recordedReplies:
+            index = self._recordedReplyIndices.get(commandName, 0)
+            self._recordedReplyIndices[commandName] = index + 1
+            reply, latency = recordedReplies[index % len(recordedReplies)]
+            if reply is not None:
+                self._Reply(socket, prefix, reply, commandName, latency=latency)
+            return
+        handler = self._handlers.get(commandName)
+        if handler is None:
+            self._Reply(socket, prefix, {'error': {'type': 'unknowncommand', 'desc': 'unknown command %s' % commandName}}, commandName)
+            return
+        reply = handler(command)
+        if reply is None:
+            self._parkedRequests.append(_ParkedRequest(socket, prefix, command))
+            return
+        self._Reply(socket, prefix, reply, commandName)
+
+    def _Reply(self, socket, prefix, reply, commandName, latency=None):
+        # type: (zmq.Socket, List[bytes], Any, Optional[str], Optional[float]) -> None
+        if not isinstance(reply, bytes):
+            reply = self._codec.Encode(reply)
+        frames = prefix + [reply]
+        if latency is None:
+            latency = self._commandLatencies.get(commandName, self._latency)
+        if self._latencyJitter > 0:
+            latency += self._random.uniform(0, self._latencyJitter)
+        if latency <= 0:
+            socket.send_multipart(frames)
+            return
+        heapq.heappush(self._delayedReplies, (time.monotonic() + latency, next(self._replysequence), socket, frames))
+
+    def _ProduceResults(self):
+        # type: () -> bool
+        """Produces a detection result for every running task and serves the parked requests. Returns whether any result was produced."""
+        runningTasks = [task for task in self._tasks.values() if task['taskStatus'] == 'Active']
+        if not runningTasks:
+            return False
+        resultTimestampUS = max(int(time.time() * 1000000), self._latestResultTimestampUS + 1)
+        self._latestResultTimestampUS = resultTimestampUS
+        for task in runningTasks:
+            self._results[task['taskId']] = self._MakeDetectionResult(task, resultTimestampUS)
+        parkedRequests = self._parkedRequests
+        self._parkedRequests = []
+        for parkedRequest in parkedRequests:
+            try:
+                reply = self._GetLatestDetectionResultImages(parkedRequest.command)
+            except Exception as e:
+                log.exception('failed to handle parked command: %s', e)
+                reply = {'error': {'type': 'unknownerror', 'desc': 'failed to handle command GetLatestDetectionResultImages: %s' % e}}
+            if reply is None:
+                self._parkedRequests.append(parkedRequest)
+            else:
+                self._Reply(parkedRequest.socket, parkedRequest.prefix, reply, 'GetLatestDetectionResultImages')
+        return True
+
+    def _MakeDetectionResult(self, task, resultTimestampUS):
+        # type: (Dict[str, Any], int) -> Dict[str, Any]
+        uniform = self._random.uniform
+        detectedObjects = []
+        for index in range(self._numDetectedObjects):
+            detectedObjects.append({
+                'name': 'object%d' % index,
+                'object_uri': 'mujin:/object.mujin.dae',
+                'translation_': [uniform(-500, 500), uniform(-400, 400), uniform(0, 300)],
+                'quat_': [1.0, 0.0, 0.0, 0.0],
+                'confidence': uniform(0, 1),
+                'extents': [100.0, 80.0, 60.0],
+                'sensortimestamp': resultTimestampUS // 1000,
+            })
+        return {
+            'taskId': task['taskId'],
+            'taskType': task['taskType'],
+            'cycleIndex': task['cycleIndex'],
+            'locationName': task['locationName'],
+            'resultTimestampUS': resultTimestampUS,
+            'imageStartTimestampMS': resultTimestampUS // 1000 - 100,
+            'imageEndTimeStampMS': resultTimestampUS // 1000,
+            'pointCloudId': 'pointcloud-%d' % resultTimestampUS,
+            'statsUID': 'stats-%d' % resultTimestampUS,
+            'targetUpdateName': 'target',
+            'sensorSelectionInfos': [{'sensorName': 'camera%d' % index, 'sensorLinkName': 'camera%d_link' % index} for index in range(self._numImages)],
+            'detectionResultState': {},
+            'detectedObjects': detectedObjects,
+        }
+
+    def _GetResults(self, command):
+        # type: (Dict[str, Any]) -> List[Dict[str, Any]]
+        results = []
+        for taskId, result in self._results.items():
+            if command.get('taskId') is not None and taskId != command['taskId']:
+                continue
+            if command.get('taskType') is not None and result['taskType'] != command['taskType']:
+                continue
+            if command.get('cycleIndex') is not None and result['cycleIndex'] != command['cycleIndex']:
+                continue
+            results.append(result)
+        return results
+
+    def _StartTask(self, command):
+        # type: (Dict[str, Any]) -> Dict[str, Any]
+        taskId = command.get('taskId') or 'task%d' % len(self._tasks)
+        visionTaskParameters = command.get('visionTaskParameters') or {}
+        self._tasks[taskId] = {
+            'taskId': taskId,
+            'taskType': {'StartContainerDetectionTask': 'containerDetection', 'StartVisualizePointCloudTask': 'visualizePointCloud'}.get(command.get('command'), 'objectDetection'),
+            'taskStatus': 'Active',
+            'taskStatusMessage': '',
+            'isStopTask': False,
+            'initializeTaskMS': int(time.time() * 1000),
+            'cycleIndex': visionTaskParameters.get('cycleIndex') or command.get('cycleIndex'),
+            'locationName': visionTaskParameters.get('locationName') or 'source',
+            'taskParameters': visionTaskParameters,
+            'scenepk': 'fake.mujin.msgpack',
+        }
+        return {'taskId': taskId}
+
+    def _GetTasks(self, command):
+        # type: (Dict[str, Any]) -> List[Dict[str, Any]]
+        taskIds = set(command.get('taskIds') or [])
+        if command.get('taskId') is not None:
+            taskIds.add(command['taskId'])
+        taskTypes = set(command.get('taskTypes') or [])
+        if command.get('taskType') is not None:
+            taskTypes.add(command['taskType'])
+        return [task for task in self._tasks.values() if (not taskIds or task['taskId'] in taskIds) and (not taskTypes or task['taskType'] in taskTypes) and (command.get('cycleIndex') is None or task['cycleIndex'] == command['cycleIndex'])]
+
+    def _StopTask(self, command):
+        # type: (Dict[str, Any]) -> Dict[str, Any]
+        for task in self._GetTasks(command):
+            task['taskStatus'] = 'Stopped'
+            task['isStopTask'] = True
+            if command.get('removeTask'):
+                self._tasks.pop(task['taskId'], None)
+                self._results.pop(task['taskId'], None)
+        return {}
+
+    def _ResumeTask(self, command):
+        # type: (Dict[str, Any]) -> Dict[str, Any]
+        for task in self._GetTasks(command):
+            task['taskStatus'] = 'Active'
+            task['isStopTask'] = False
+        return {}
+
+    def _GetTaskState(self, command):
+        # type: (Dict[str, Any]) -> Dict[str, Any]
+        tasks = self._GetTasks(command)
+        if not tasks:
+            return {'taskId': command.get('taskId'), 'taskType': command.get('taskType'), 'taskStatus': 'NotFound', 'taskStatusMessage': '', 'isStopTask': True}
+        return dict((key, value) for key, value in tasks[0].items() if key not in ('cycleIndex', 'locationName'))
+
+    def _GetLatestDetectedObjects(self, command):
+        # type: (Dict[str, Any]) -> Dict[str, Any]
+        return {'detectionResults': self._GetResults(command)}
+
+    def _GetLatestDetectionResultImages(self, command):
+        # type: (Dict[str, Any]) -> Optional[Union[bytes, Dict[str, Any]]]
+        """Returns the images of the newest result newer than newerThanResultTimestampUS, None to wait for one."""
+        newerThanResultTimestampUS = command.get('newerThanResultTimestampUS') or 0
+        results = [result for result in self._GetResults(command) if result['resultTimestampUS'] > newerThanResultTimestampUS]
+        if not results:
+            if not any(task['taskStatus'] == 'Active' for task in self._GetTasks(command)):
+                return {'error': {'type': 'noresult', 'desc': 'no running task to produce a result newer than %d' % newerThanResultTimestampUS}}
+            return None
+        result = max(results, key=lambda result: result['resultTimestampUS'])
+        imageTypes = command.get('imageTypes') or ['depth']
+        images = []
+        for index in range(self._numImages):
+            info = {
+                'sensorName': 'camera%d' % index,
+                'sensorLinkName': 'camera%d_link' % index,
+                'imageType': imageTypes[index % len(imageTypes)],
+                'dtype': 'uint8',
+                'shape': [self._imageSize],
+                'resultTimestampUS': result['resultTimestampUS'],
+                'metadata': {},
+            }
+            images.append((info, b'' if command.get('metadataOnly') else self._imageData))
+        return _EncodeResultImages(images, {'resultTimestampUS': result['resultTimestampUS'], 'taskId': result['taskId']}, self._codec)
+
+    def _GetDetectionHistory(self, command):
+        # type: (Dict[str, Any]) -> bytes
+        return self._historyData
+
+    def _GetPublishedState(self):
+        # type: () -> Dict[str, Any]
+        tasks = [dict((key, task[key]) for key in ('taskId', 'taskType', 'taskStatus', 'cycleIndex')) for task in self._tasks.values()]
+        slavestates = {}
+        for slaverequestid in self._slaverequestids:
+            slavestates['slaverequestid-%s' % slaverequestid] = {
+                'runningTaskIds': sorted(task['taskId'] for task in self._tasks.values() if task['taskStatus'] == 'Active'),
+                'latestResultTimestampUS': self._latestResultTimestampUS,
+            }
+        for index in range(self._numExtraSlaves):
+            slavestates['slaverequestid-idle%d' % index] = {'runningTaskIds': [], 'latestResultTimestampUS': 0}
+        return {
+            'timestamp': int(time.time() * 1000),
+            'version': 'fake',
+            'statusMessage': '',
+            'tasks': tasks,
+            'slavestates': slavestates,
+        }
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Pool decoding the images of detection results off the caller thread
+
+# system imports
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future # noqa: F401 # used in type check
+    from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple # noqa: F401 # used in type check
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# mujin imports
+from . import VisionControllerTimeoutError
+from . import ugettext as _
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+
+def DecodeImage(key, data):
+    # type: (Any, Any) -> Any
+    """Default decode function of ImageDecodePool.
+
+    When key is a dict with a dtype, and optionally a shape, the data is taken as raw pixels and returned as a numpy array owning its memory. Other images are assumed to be encoded (png, jpeg, ...) and are decoded with cv2.imdecode when opencv is installed, otherwise returned as bytes.
+
+    Args:
+        key: Identifies the image, as given to ImageDecodePool.Submit.
+        data (bytes or memoryview): Image data.
+    """
+    if isinstance(key, dict) and key.get('dtype') is not None and numpy is not None:
+        array = numpy.frombuffer(data, dtype=numpy.dtype(key['dtype'])).copy()
+        if key.get('shape') is not None:
+            array = array.reshape(key['shape'])
+        return array
+    try:
+        import cv2
+    except ImportError:
+        return bytes(data)
+    return cv2.imdecode(numpy.frombuffer(data, dtype=numpy.uint8), cv2.IMREAD_UNCHANGED)
+
+
+class ImageDecodePool(object):
+    """Decodes images of detection results on a thread or process pool.
+
+    Images are given as (key, data) entries, key identifying the image for the decode function and the caller, e.g. a sensor name and image type or a metadata dict, and data being the encoded image, e.g. a memoryview slice of a GetLatestDetectionResultImages response. Splitting a response into images is left to the caller, since it depends on the vision manager.
+
+    At most maxPendingImages images are submitted and not yet decoded. When decoding falls behind, Submit blocks until an image is done, which slows down the fetching side instead of letting undecoded images pile up in memory.
+
+    Threads are enough when the decode function releases the GIL (numpy copies, opencv). Processes get the image data copied to them, so they only pay off for decoders holding the GIL.
+    """
+
+    _executor = None  # type: Optional[Executor]
+    _useProcesses = False  # type: bool
+    _decodefn = None  # type: Optional[Callable[[Any, Any], Any]]
+    _semaphore = None  # type: Optional[threading.BoundedSemaphore] # one slot per image that can be pending
+    _maxPendingImages = 0  # type: int
+
+    def __init__(self, decodefn=None, maxWorkers=None, useProcesses=False, maxPendingImages=None):
+        # type: (Optional[Callable[[Any, Any], Any]], Optional[int], bool, Optional[int]) -> None
+        """Starts the pool.
+
+        Args:
+            decodefn (Callable, optional): Called with the key and the data of an image, returns the decoded image. Has to be picklable (defined at module level) when useProcesses is True. (Default: DecodeImage)
+            maxWorkers (int, optional): Number of threads or processes. (Default: number of CPUs)
+            useProcesses (bool, optional): If True, decodes in processes instead of threads. (Default: False)
+            maxPendingImages (int, optional): Number of images that can be submitted and not yet decoded before Submit blocks. (Default: 2 * maxWorkers)
+        """
+        if maxWorkers is None:
+            maxWorkers = os.cpu_count() or 1
+        self._decodefn = decodefn or DecodeImage
+        self._useProcesses = useProcesses
+        self._maxPendingImages = maxPendingImages or 2 * maxWorkers
+        self._semaphore = threading.BoundedSemaphore(self._maxPendingImages)
+        if useProcesses:
+            self._executor = ProcessPoolExecutor(max_workers=maxWorkers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix='ImageDecodePool')
+
+    def __del__(self):
+        self.Destroy()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exctype, excvalue, traceback):
+        self.Destroy()
+
+    def Destroy(self):
+        # type: () -> None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def GetMaxPendingImages(self):
+        # type: () -> int
+        return self._maxPendingImages
+
+    def Submit(self, key, data, timeout=None):
+        # type: (Any, Any, Optional[float]) -> Future
+        """Submits one image for decoding. Blocks while maxPendingImages images are pending.
+
+        Args:
+            key: Identifies the image, passed to decodefn. Has to be picklable when useProcesses is True.
+            data (bytes or memoryview): The image data. Not copied, unless useProcesses is True.
+            timeout (float, optional): Time in seconds to wait for a free slot. None means wait forever.
+
+        Returns:
+            concurrent.futures.Future: resolved with the decoded image
+
+        Raises:
+            VisionControllerTimeoutError: If no slot got free within timeout.
+        """
+        if not self._semaphore.acquire(timeout=timeout):
+            raise VisionControllerTimeoutError(_('Timed out after %.03f seconds waiting to decode image %r, %d images are still being decoded') % (timeout, key, self._maxPendingImages), errortype='timeout')
+        try:
+            if self._useProcesses and isinstance(data, memoryview):
+                data = data.tobytes() # memoryviews cannot be pickled
+            future = self._executor.submit(self._decodefn, key, data)
+        except Exception:
+            self._semaphore.release()
+            raise
+        future.add_done_callback(lambda f: self._semaphore.release())
+        return future
+
+    def SubmitImages(self, images, timeout=None):
+        # type: (Iterable[Tuple[Any, Any]], Optional[float]) -> List[Future]
+        """Submits every (key, data) entry, see Submit. Returns the futures in the order of the images."""
+        return [self.Submit(key, data, timeout=timeout) for key, data in images]
+
+    def IterDecodedImages(self, images, ordered=False, timeout=None):
+        # type: (Iterable[Tuple[Any, Any]], bool, Optional[float]) -> Iterator[Tuple[Any, Any]]
+        """Decodes the images and yields (key, decoded image) pairs.
+
+        Images are submitted as slots get free, so an iterable producing images lazily is only read as fast as the pool decodes.
+
+        Args:
+            images (Iterable[tuple]): (key, data) entries of the images to decode, see Submit.
+            ordered (bool, optional): If True, yields in the order of the images. Otherwise yields each image as soon as it is decoded. (Default: False)
+            timeout (float, optional): Time in seconds to wait for a free slot when submitting. None means wait forever.
+        """
+        pending = {}  # type: Dict[Future, Tuple[int, Any]] # future -> (index, key)
+        decoded = {}  # type: Dict[int, Tuple[Any, Any]] # decoded images waiting for their turn when ordered
+        nextindex = 0
+        imageiter = enumerate(images)
+        exhausted = False
+        try:
+            while not exhausted or pending:
+                # keep at most maxPendingImages in flight, so that Submit never blocks here
+                while not exhausted and len(pending) < self._maxPendingImages:
+                    try:
+                        index, (key, data) = next(imageiter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[self.Submit(key, data, timeout=timeout)] = (index, key)
+                if not pending:
+                    break
+                done, notdone = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, key = pending.pop(future)
+                    decoded[index] = (key, future.result())
+                if ordered:
+                    while nextindex in decoded:
+                        yield decoded.pop(nextindex)
+                        nextindex += 1
+                else:
+                    for index in sorted(decoded):
+                        yield decoded.pop(index)
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,426 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Load generator sending a mix of commands from many clients to a vision manager
+
+"""Opens numClients VisionControllerClient instances, each with its own callerid and slaverequestid, and sends a weighted mix of commands from all of them at a target rate, to size vision manager deployments.
+
+Usage: python -m mujinvisioncontrollerclient.loadgen --hostname visioncontroller1 --commandport 7004 --numClients 8 --rate 200 --duration 60 --mix detectedobjects=4,images=1,taskstate=1,publishedstate=1
+
+The operations of the mix are:
+
+- detectedobjects: GetLatestDetectedObjects, as done when polling for results.
+- images: GetLatestDetectionResultImages of the newest result.
+- taskstate: GetTaskStateService.
+- publishedstate: GetPublishedState from the published state thread. Every client subscribes to the status port when the mix has this operation, and the published states received are counted.
+
+Every client sends its share of the rate at fixed intervals, independently of how long the commands take, so a slow vision manager shows as latency rather than as a lower rate as long as the clients keep up. With --rate 0 every client sends its next command as soon as the previous one is done. The report has the throughput, the latency percentiles, and the error and timeout counts, per operation and in total. Pass --fake to run against a FakeVisionManager started in the process.
+"""
+
+# system imports
+import argparse
+import json
+import random
+import threading
+import time
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, List, Optional # noqa: F401 # used in type check
+
+# mujin imports
+from mujinplanningclient import TimeoutError
+from . import zmq, ugettext as _
+from .visioncontrollerclient import VisionControllerClient
+from .visioncontrollerclienterror import VisionControllerClientError, VisionControllerTimeoutError
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+operationNames = ('detectedobjects', 'images', 'taskstate', 'publishedstate')
+
+
+def ParseCommandMix(mix):
+    # type: (str) -> Dict[str, float]
+    """Parses a mix like 'detectedobjects=4,images=1' into {operation name: weight}. An operation given without weight has weight 1.
+
+    Raises:
+        VisionControllerClientError: If an operation is unknown or a weight is not a non-negative number.
+    """
+    weights = {}  # type: Dict[str, float]
+    for item in mix.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _separator, weight = item.partition('=')
+        name = name.strip()
+        if name not in operationNames:
+            raise VisionControllerClientError(_('Unknown operation %(name)r in command mix, expected one of %(names)s') % {'name': name, 'names': ', '.join(operationNames)}, errortype='invalidmix')
+        try:
+            weights[name] = float(weight) if weight else 1.0
+        except ValueError:
+            raise VisionControllerClientError(_('Invalid weight %(weight)r of operation %(name)s in command mix') % {'weight': weight, 'name': name}, errortype='invalidmix')
+        if weights[name] < 0:
+            raise VisionControllerClientError(_('Invalid weight %(weight)r of operation %(name)s in command mix') % {'weight': weight, 'name': name}, errortype='invalidmix')
+    if sum(weights.values()) <= 0:
+        raise VisionControllerClientError(_('Command mix %r has no operation with a positive weight') % mix, errortype='invalidmix')
+    return weights
+
+
+def _Percentile(sortedSamples, percentile):
+    # type: (List[int], float) -> Optional[int]
+    if not sortedSamples:
+        return None
+    return sortedSamples[min(len(sortedSamples) - 1, int(percentile / 100.0 * len(sortedSamples)))]
+
+
+class _OperationResults(object):
+    """Latencies and failures of one operation, collected by one worker so that no lock is needed."""
+
+    __slots__ = ('latenciesUS', 'numErrors', 'numTimeouts', 'errorTypes')
+
+    def __init__(self):
+        # type: () -> None
+        self.latenciesUS = []  # type: List[int] # of the successful commands
+        self.numErrors = 0  # type: int # failures other than timeouts
+        self.numTimeouts = 0  # type: int
+        self.errorTypes = {}  # type: Dict[str, int] # errortype -> count, of the errors and timeouts
+
+    def AddErrorType(self, errortype):
+        # type: (str) -> None
+        self.errorTypes[errortype] = self.errorTypes.get(errortype, 0) + 1
+
+    def Merge(self, other):
+        # type: (_OperationResults) -> None
+        self.latenciesUS.extend(other.latenciesUS)
+        self.numErrors += other.numErrors
+        self.numTimeouts += other.numTimeouts
+        for errortype, count in other.errorTypes.items():
+            self.errorTypes[errortype] = self.errorTypes.get(errortype, 0) + count
+
+    def ToDict(self, duration):
+        # type: (float) -> Dict[str, Any]
+        latenciesUS = sorted(self.latenciesUS)
+        return {
+            'count': len(latenciesUS),
+            'errors': self.numErrors,
+            'timeouts': self.numTimeouts,
+            'errorTypes': dict(self.errorTypes),
+            'throughput': len(latenciesUS) / duration if duration > 0 else None,
+            'meanUS': float(sum(latenciesUS)) / len(latenciesUS) if latenciesUS else None,
+            'p50US': _Percentile(latenciesUS, 50),
+            'p90US': _Percentile(latenciesUS, 90),
+            'p99US': _Percentile(latenciesUS, 99),
+            'maxUS': latenciesUS[-1] if latenciesUS else None,
+        }
+
+
+class _LoadWorker(object):
+    """Sends the commands of one client on its own thread."""
+
+    _client = None  # type: Optional[VisionControllerClient]
+    _random = None  # type: Optional[random.Random]
+    _results = None  # type: Optional[Dict[str, _OperationResults]]
+    _numPublishedStates = 0  # type: int # published states received by the callback
+    _thread = None  # type: Optional[threading.Thread]
+
+    def __init__(self, generator, client, taskId, seed):
+        # type: (LoadGenerator, VisionControllerClient, Optional[str], Optional[int]) -> None
+        self._generator = generator
+        self._client = client
+        self._taskId = taskId
+        self._random = random.Random(seed)
+        self._results = dict((name, _OperationResults()) for name in generator._weights)
+        self._operationfns = {
+            'detectedobjects': self._GetLatestDetectedObjects,
+            'images': self._GetLatestDetectionResultImages,
+            'taskstate': self._GetTaskState,
+            'publishedstate': self._GetPublishedState,
+        }  # type: Dict[str, Callable[[], Any]]
+
+    def _GetLatestDetectedObjects(self):
+        return self._client.GetLatestDetectedObjects(taskId=self._taskId, timeout=self._generator._timeout)
+
+    def _GetLatestDetectionResultImages(self):
+        return self._client.GetLatestDetectionResultImages(taskId=self._taskId, timeout=self._generator._timeout, zerocopy=True)
+
+    def _GetTaskState(self):
+        return self._client.GetTaskStateService(taskId=self._taskId, timeout=self._generator._timeout)
+
+    def _GetPublishedState(self):
+        return self._client.GetPublishedState(timeout=self._generator._timeout)
+
+    def _OnPublishedState(self, state):
+        # type: (Dict[str, Any]) -> None
+        self._numPublishedStates += 1
+
+    def Start(self, starttime, endtime, interval):
+        # type: (float, float, float) -> None
+        if 'publishedstate' in self._results:
+            self._client.AddPublishedStateCallback(self._OnPublishedState)
+        self._thread = threading.Thread(target=self._Run, args=(starttime, endtime, interval), name='loadgen-%s' % self._client.GetSlaveRequestId())
+        self._thread.daemon = True
+        self._thread.start()
+
+    def Join(self):
+        # type: () -> None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _Run(self, starttime, endtime, interval):
+        # type: (float, float, float) -> None
+        names = list(self._results.keys())
+        weights = [self._generator._weights[name] for name in names]
+        stopevent = self._generator._stopevent
+        nexttime = starttime
+        while not stopevent.is_set():
+            if interval > 0:
+                # commands are scheduled at fixed intervals from the start, so that a slow command is followed by the late ones right away
+                delay = nexttime - time.perf_counter()
+                if delay > 0 and stopevent.wait(delay):
+                    break
+                nexttime += interval
+            if time.perf_counter() >= endtime:
+                break
+            name = self._random.choices(names, weights)[0]
+            results = self._results[name]
+            commandstarttime = time.perf_counter()
+            try:
+                self._operationfns[name]()
+            except (VisionControllerTimeoutError, TimeoutError):
+                results.numTimeouts += 1
+                results.AddErrorType('timeout')
+                continue
+            except VisionControllerClientError as e:
+                results.numErrors += 1
+                results.AddErrorType(e._type or 'unknownerror')
+                continue
+            except Exception as e:
+                log.exception('operation %s of %s failed: %s', name, self._client.GetSlaveRequestId(), e)
+                results.numErrors += 1
+                results.AddErrorType(e.__class__.__name__)
+                continue
+            results.latenciesUS.append(int((time.perf_counter() - commandstarttime) * 1000000))
+
+    def GetResults(self):
+        # type: () -> Dict[str, _OperationResults]
+        return self._results
+
+    def GetNumPublishedStates(self):
+        # type: () -> int
+        return self._numPublishedStates
+
+
+class LoadGenerator(object):
+    """Sends a weighted mix of commands to a vision manager from many clients at a target rate and collects the latencies and failures, see the module documentation.
+    """
+
+    _ctx = None  # type: Optional[zmq.Context]
+    _ctxown = None  # type: Optional[zmq.Context]
+    _weights = None  # type: Optional[Dict[str, float]] # operation name -> weight
+    _stopevent = None  # type: Optional[threading.Event]
+
+    def __init__(self, hostname='127.0.0.1', commandport=7004, numClients=1, rate=10.0, duration=10.0, mix='detectedobjects', taskId=None, startTasks=False, callerIdPrefix='loadgen', slaveRequestIdPrefix='loadgen', pipelined=False, codec=None, timeout=2.0, seed=None, ctx=None):
+        # type: (str, int, int, float, float, str, Optional[str], bool, str, str, bool, Optional[str], float, Optional[int], Optional[zmq.Context]) -> None
+        """
+        Args:
+            hostname (str, optional): Host of the vision manager. (Default: 127.0.0.1)
+            commandport (int, optional): Command port of the vision manager. (Default: 7004)
+            numClients (int, optional): Number of clients, each sending from its own thread. (Default: 1)
+            rate (float, optional): Total number of commands per second sent by all the clients. If 0, every client sends as fast as it gets replies. (Default: 10)
+            duration (float, optional): Time in seconds to send commands for. (Default: 10)
+            mix (str, optional): Weighted operations, see ParseCommandMix. (Default: detectedobjects)
+            taskId (str, optional): Task to ask the results and state of. With startTasks, prefix of the task of every client.
+            startTasks (bool, optional): If True, every client starts an object detection task before sending commands and stops it afterwards. (Default: False)
+            callerIdPrefix (str, optional): The callerid of client i is the prefix followed by i. (Default: loadgen)
+            slaveRequestIdPrefix (str, optional): The slaverequestid of client i is the prefix followed by i. (Default: loadgen)
+            pipelined (bool, optional): If True, the clients send through a PipelinedCommandChannel. (Default: False)
+            codec (str, optional): Codec of the clients, see codec.GetCodec.
+            timeout (float, optional): Timeout in seconds of every command. (Default: 2.0)
+            seed (int, optional): Seed of the random choice of the operations.
+            ctx (zmq.Context, optional): The ZMQ context shared by the clients.
+        """
+        self._hostname = hostname
+        self._commandport = commandport
+        self._numClients = numClients
+        self._rate = rate
+        self._duration = duration
+        self._weights = dict((name, weight) for name, weight in ParseCommandMix(mix).items() if weight > 0)
+        self._taskId = taskId
+        self._startTasks = startTasks
+        self._callerIdPrefix = callerIdPrefix
+        self._slaveRequestIdPrefix = slaveRequestIdPrefix
+        self._pipelined = pipelined
+        self._codec = codec
+        self._timeout = timeout
+        self._seed = seed
+        if ctx is None:
+            self._ctxown = zmq.Context()
+            self._ctxown.linger = 100
+            self._ctx = self._ctxown
+        else:
+            self._ctx = ctx
+        self._stopevent = threading.Event()
+
+    def __del__(self):
+        self.Destroy()
+
+    def Destroy(self):
+        # type: () -> None
+        self.Stop()
+        if self._ctxown is not None:
+            try:
+                self._ctxown.destroy()
+            except Exception as e:
+                log.exception('failed to destroy the zmq context: %s', e)
+            self._ctxown = None
+        self._ctx = None
+
+    def Stop(self):
+        # type: () -> None
+        """Makes Run return early, e.g. from another thread."""
+        if self._stopevent is not None:
+            self._stopevent.set()
+
+    def Run(self):
+        # type: () -> Dict[str, Any]
+        """Sends the commands for the duration and returns the report.
+
+        Returns:
+            dict: With the members
+                numClients, targetRate, duration (actual, in seconds)
+                throughput: Successful commands per second of all the operations.
+                numCommands, numErrors, numTimeouts: Totals over all the operations.
+                numPublishedStates, publishedStatesPerClientPerSecond: Published states received by the clients, 0 without the publishedstate operation.
+                operations: Operation name -> count, errors, timeouts, errorTypes, throughput, meanUS, p50US, p90US, p99US and maxUS, the latencies being those of the successful commands.
+        """
+        self._stopevent.clear()
+        clients = []  # type: List[VisionControllerClient]
+        workers = []  # type: List[_LoadWorker]
+        startedTaskIds = {}  # type: Dict[VisionControllerClient, str]
+        try:
+            for index in range(self._numClients):
+                client = VisionControllerClient(hostname=self._hostname, commandport=self._commandport, ctx=self._ctx, callerid='%s%d' % (self._callerIdPrefix, index), slaverequestid='%s%d' % (self._slaveRequestIdPrefix, index), pipelined=self._pipelined, codec=self._codec)
+                clients.append(client)
+                taskId = self._taskId
+                if self._startTasks:
+                    taskId = client.StartObjectDetectionTask(taskId='%s%d' % (self._taskId or 'loadgen', index), timeout=self._timeout)['taskId']
+                    startedTaskIds[client] = taskId
+                workers.append(_LoadWorker(self, client, taskId, None if self._seed is None else self._seed + index))
+
+            interval = self._numClients / float(self._rate) if self._rate > 0 else 0.0
+            starttime = time.perf_counter()
+            endtime = starttime + self._duration
+            for index, worker in enumerate(workers):
+                # spread the clients over the interval, so that they do not all send at once
+                worker.Start(starttime + interval * index / len(workers), endtime, interval)
+            try:
+                self._stopevent.wait(self._duration)
+            except KeyboardInterrupt:
+                log.warning('interrupted, reporting the commands sent so far')
+            self._stopevent.set()
+            for worker in workers:
+                worker.Join()
+            duration = time.perf_counter() - starttime
+        finally:
+            # the workers have to be done with the clients before they are destroyed
+            self._stopevent.set()
+            for worker in workers:
+                worker.Join()
+            for client in clients:
+                taskId = startedTaskIds.get(client)
+                if taskId is not None:
+                    try:
+                        client.StopTask(taskId=taskId, timeout=self._timeout)
+                    except Exception as e:
+                        log.warning('failed to stop task %s: %s', taskId, e)
+                client.Destroy()
+
+        results = dict((name, _OperationResults()) for name in self._weights)
+        numPublishedStates = 0
+        for worker in workers:
+            for name, workerResults in worker.GetResults().items():
+                results[name].Merge(workerResults)
+            numPublishedStates += worker.GetNumPublishedStates()
+        operations = dict((name, operationResults.ToDict(duration)) for name, operationResults in results.items())
+        numCommands = sum(operation['count'] for operation in operations.values())
+        return {
+            'hostname': self._hostname,
+            'commandport': self._commandport,
+            'numClients': self._numClients,
+            'targetRate': self._rate,
+            'duration': duration,
+            'throughput': numCommands / duration if duration > 0 else None,
+            'numCommands': numCommands,
+            'numErrors': sum(operation['errors'] for operation in operations.values()),
+            'numTimeouts': sum(operation['timeouts'] for operation in operations.values()),
+            'numPublishedStates': numPublishedStates,
+            'publishedStatesPerClientPerSecond': numPublishedStates / float(self._numClients) / duration if duration > 0 and self._numClients > 0 else None,
+            'operations': operations,
+        }
+
+
+def _FormatUS(value):
+    # type: (Optional[float]) -> str
+    return '%.1f' % (value / 1000.0) if value is not None else '-'
+
+
+def PrintReport(report):
+    # type: (Dict[str, Any]) -> None
+    print('%d clients, target %.1f commands/s, %.1f s: %.1f commands/s, %d errors, %d timeouts' % (report['numClients'], report['targetRate'], report['duration'], report['throughput'] or 0, report['numErrors'], report['numTimeouts']))
+    if report['numPublishedStates'] > 0:
+        print('%d published states received, %.1f per client per second' % (report['numPublishedStates'], report['publishedStatesPerClientPerSecond']))
+    print('%-16s %8s %10s %8s %8s %10s %10s %10s %10s' % ('operation', 'count', 'ops/s', 'errors', 'timeouts', 'p50 (ms)', 'p90 (ms)', 'p99 (ms)', 'max (ms)'))
+    for name in operationNames:
+        operation = report['operations'].get(name)
+        if operation is None:
+            continue
+        print('%-16s %8d %10.1f %8d %8d %10s %10s %10s %10s' % (name, operation['count'], operation['throughput'] or 0, operation['errors'], operation['timeouts'], _FormatUS(operation['p50US']), _FormatUS(operation['p90US']), _FormatUS(operation['p99US']), _FormatUS(operation['maxUS'])))
+        if operation['errorTypes']:
+            print('%-16s %s' % ('', ', '.join('%s: %d' % item for item in sorted(operation['errorTypes'].items()))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hostname', default='127.0.0.1')
+    parser.add_argument('--commandport', type=int, default=7004)
+    parser.add_argument('--numClients', type=int, default=1)
+    parser.add_argument('--rate', type=float, default=10.0, help='total commands per second, 0 to send as fast as possible (Default: 10)')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds (Default: 10)')
+    parser.add_argument('--mix', default='detectedobjects', help='comma separated operation=weight, operations: %s (Default: detectedobjects)' % ', '.join(operationNames))
+    parser.add_argument('--taskId', default=None)
+    parser.add_argument('--startTasks', action='store_true', help='start an object detection task per client and stop it at the end')
+    parser.add_argument('--callerIdPrefix', default='loadgen')
+    parser.add_argument('--slaveRequestIdPrefix', default='loadgen')
+    parser.add_argument('--pipelined', action='store_true')
+    parser.add_argument('--codec', default=None)
+    parser.add_argument('--timeout', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default=None, help='json file to write the report to')
+    parser.add_argument('--fake', action='store_true', help='run against a FakeVisionManager started in this process, hostname and commandport are ignored')
+    parser.add_argument('--loglevel', default='WARNING')
+    options = parser.parse_args()
+    logging.basicConfig(level=options.loglevel.upper(), format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    server = None
+    if options.fake:
+        from .fakevisionmanager import FakeVisionManager
+        server = FakeVisionManager(codec=options.codec, initialTaskIds=(options.taskId,) if options.taskId and not options.startTasks else (), seed=options.seed)
+        server.Start()
+        options.hostname = '127.0.0.1'
+        options.commandport = server.commandport
+    generator = LoadGenerator(hostname=options.hostname, commandport=options.commandport, numClients=options.numClients, rate=options.rate, duration=options.duration, mix=options.mix, taskId=options.taskId, startTasks=options.startTasks, callerIdPrefix=options.callerIdPrefix, slaveRequestIdPrefix=options.slaveRequestIdPrefix, pipelined=options.pipelined, codec=options.codec, timeout=options.timeout, seed=options.seed)
+    try:
+        report = generator.Run()
+    finally:
+        generator.Destroy()
+        if server is not None:
+            server.Destroy()
+    PrintReport(report)
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# DEALER based command channel allowing several commands in flight on one connection
+
+# system imports
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, List, Optional, Tuple # noqa: F401 # used in type check
+
+# mujin imports
+from . import VisionControllerClientError, VisionControllerTimeoutError
+from . import json
+from . import zmq
+from . import ugettext as _
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+
+class _PendingRequest(object):
+    """A command sent on the channel that is still waiting for its reply."""
+
+    __slots__ = ('requestid', 'commandName', 'future', 'deadline', 'zerocopy')
+
+    def __init__(self, requestid, commandName, future, deadline, zerocopy=False):
+        # type: (bytes, str, Future, Optional[float], bool) -> None
+        self.requestid = requestid
+        self.commandName = commandName
+        self.future = future
+        self.deadline = deadline
+        self.zerocopy = zerocopy # if True, the reply is handed over as memoryviews of the received zmq frames
+
+
+class PipelinedCommandChannel(object):
+    """Command channel on a DEALER socket where replies are matched to commands by a client generated request id, so that many commands can be outstanding on one connection and replies can come back in any order.
+
+    Every command is sent as the frames [b'', requestid, payload], and the server has to reply with [b'', requestid, payload] using the same requestid. A ROUTER socket on the server side sees the DEALER identity as the first frame, as usual.
+
+    The DEALER socket is only touched by an internal I/O thread. Callers hand their frames to it through an inproc socket, and the I/O thread resolves the future of each command when its reply arrives or when its timeout expires.
+
+    The channel exposes the same SendCommand/ReceiveCommand/IsWaitingReply interface as zmqclient.ZmqClient, so it can be used as the command socket of VisionControllerClient.
+    """
+
+    _ctx = None  # type: Optional[zmq.Context]
+    _url = None  # type: Optional[str]
+    _checkpreemptfn = None  # type: Optional[Callable] # called periodically when waiting for a reply
+
+    _pending = None  # type: Optional[Dict[bytes, _PendingRequest]] # requestid -> pending request, guarded by _pendinglock
+    _pendinglock = None  # type: Optional[threading.Lock]
+    _requestids = None  # type: Optional[itertools.count]
+
+    _outboundurl = None  # type: Optional[str] # inproc endpoint for handing frames to the I/O thread
+    _outboundsocket = None  # type: Optional[zmq.Socket] # PUSH side of the inproc pipe, guarded by _outboundlock
+    _outboundlock = None  # type: Optional[threading.Lock]
+    _thread = None  # type: Optional[threading.Thread]
+    _threadtimeout = 5.0  # type: float # how long Destroy waits for the I/O thread to quit
+    _isdestroying = False  # type: bool
+    _isstopped = False  # type: bool # set once the I/O thread exited, commands sent after it would never get a reply
+
+    _waitingfuture = None  # type: Optional[Future] # future of the last command sent with blockwait=False
+
+    def __init__(self, hostname='', port=0, ctx=None, url=None, checkpreemptfn=None):
+        # type: (str, int, zmq.Context, Optional[str], Optional[Callable]) -> None
+        """Connects the DEALER socket and starts the I/O thread.
+
+        Args:
+            hostname (str, optional): hostname of the server, used when url is not given
+            port (int, optional): port of the server, used when url is not given
+            ctx (zmq.Context): The ZMQ context
+            url (str, optional): Full zmq endpoint to connect to, e.g. inproc://visionmanager
+            checkpreemptfn (Callable, optional): Called periodically when waiting for a reply. Should raise an exception if a preempt is desired.
+        """
+        assert ctx is not None
+        self._ctx = ctx
+        self._url = url or 'tcp://%s:%d' % (hostname, port)
+        self._checkpreemptfn = checkpreemptfn
+        self._pending = {}
+        self._pendinglock = threading.Lock()
+        self._requestids = itertools.count(1)
+        self._outboundlock = threading.Lock()
+        self._isdestroying = False
+        self._isstopped = False
+
+        self._outboundurl = 'inproc://mujinvisioncontrollerclient-pipelined-%x' % id(self)
+        outboundpull = self._ctx.socket(zmq.PULL)
+        outboundpull.setsockopt(zmq.LINGER, 0)
+        outboundpull.bind(self._outboundurl)
+        dealer = self._ctx.socket(zmq.DEALER)
+        dealer.setsockopt(zmq.LINGER, 100)
+        dealer.connect(self._url)
+        self._outboundsocket = self._ctx.socket(zmq.PUSH)
+        self._outboundsocket.setsockopt(zmq.LINGER, 0)
+        self._outboundsocket.connect(self._outboundurl)
+
+        # both sockets are handed over to the I/O thread and never touched by this thread again
+        self._thread = threading.Thread(target=self._RunIOThread, args=(dealer, outboundpull), name='PipelinedCommandChannel')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __del__(self):
+        self.Destroy()
+
+    def SetDestroy(self):
+        # type: () -> None
+        """Makes all current and future waits abort."""
+        self._isdestroying = True
+
+    def Destroy(self):
+        # type: () -> None
+        self.SetDestroy()
+        if self._thread is not None:
+            try:
+                with self._outboundlock:
+                    # an empty message tells the I/O thread to quit. never block on it, the thread might already be gone
+                    self._outboundsocket.send(b'', zmq.NOBLOCK)
+            except zmq.Again:
+                log.debug('pipelined command channel thread to %s is not receiving, it has probably stopped', self._url)
+            except Exception as e:
+                log.exception('problem stopping pipelined command channel thread: %s', e)
+            self._thread.join(self._threadtimeout)
+            if self._thread.is_alive():
+                log.warning('pipelined command channel thread to %s did not stop within %.03f seconds', self._url, self._threadtimeout)
+            self._thread = None
+        if self._outboundsocket is not None:
+            self._outboundsocket.close()
+            self._outboundsocket = None
+        self._FailPending(VisionControllerClientError(_('Pipelined command channel to %s was destroyed') % self._url, errortype='unknownerror'))
+
+    def _FailPending(self, error):
+        # type: (Exception) -> None
+        if self._pending is None:
+            return
+        with self._pendinglock:
+            pendings = list(self._pending.values())
+            self._pending.clear()
+        for pending in pendings:
+            self._SetFutureException(pending.future, error)
+
+    @staticmethod
+    def _SetFutureResult(future, result):
+        # type: (Future, Any) -> None
+        try:
+            if not future.done():
+                future.set_result(result)
+        except Exception as e:
+            # the future might get cancelled concurrently by the caller
+            log.debug('failed to set result of command future: %s', e)
+
+    @staticmethod
+    def _SetFutureException(future, error):
+        # type: (Future, Exception) -> None
+        try:
+            if not future.done():
+                future.set_exception(error)
+        except Exception as e:
+            log.debug('failed to set exception of command future: %s', e)
+
+    def _RunIOThread(self, dealer, outboundpull):
+        # type: (zmq.Socket, zmq.Socket) -> None
+        deadlines = []  # type: List[Tuple[float, bytes]] # heap of (deadline, requestid)
+        poller = zmq.Poller()
+        poller.register(dealer, zmq.POLLIN)
+        poller.register(outboundpull, zmq.POLLIN)
+        try:
+            while True:
+                polltimeout = None
+                if deadlines:
+                    polltimeout = max(0, int((deadlines[0][0] - time.monotonic()) * 1000) + 1)
+                events = dict(poller.poll(polltimeout))
+
+                if outboundpull in events:
+                    while True:
+                        try:
+                            frames = outboundpull.recv_multipart(zmq.NOBLOCK)
+                        except zmq.Again:
+                            break
+                        if len(frames) == 1 and len(frames[0]) == 0:
+                            return # asked to quit
+                        dealer.send_multipart([b''] + frames)
+                        with self._pendinglock:
+                            pending = self._pending.get(frames[0])
+                        if pending is not None and pending.deadline is not None:
+                            heapq.heappush(deadlines, (pending.deadline, pending.requestid))
+
+                if dealer in events:
+                    while True:
+                        try:
+                            # frames are not copied out of the zmq messages, replies can be several megabytes of images
+                            frames = dealer.recv_multipart(zmq.NOBLOCK, copy=False)
+                        except zmq.Again:
+                            break
+                        if len(frames) < 3 or len(frames[0]) != 0:
+                            log.warning('dropping malformed reply with %d frames from %s', len(frames), self._url)
+                            continue
+                        requestid = frames[1].bytes
+                        with self._pendinglock:
+                            pending = self._pending.pop(requestid, None)
+                        if pending is None:
+                            # reply to a command that timed out, was cancelled or was sent fireandforget
+                            log.debug('dropping reply for unknown request %r from %s', requestid, self._url)
+                            continue
+                        if pending.zerocopy:
+                            payloads = [frame.buffer for frame in frames[2:]]
+                        else:
+                            payloads = [frame.bytes for frame in frames[2:]]
+                        self._SetFutureResult(pending.future, payloads[0] if len(payloads) == 1 else payloads)
+
+                now = time.monotonic()
+                while deadlines and deadlines[0][0] <= now:
+                    deadline, requestid = heapq.heappop(deadlines)
+                    with self._pendinglock:
+                        pending = self._pending.pop(requestid, None)
+                    if pending is not None:
+                        self._SetFutureException(pending.future, VisionControllerTimeoutError(_('Timed out to get response message %s from %s') % (pending.commandName, self._url), errortype='timeout'))
+        except Exception as e:
+            log.exception('pipelined command channel to %s stopped: %s', self._url, e)
+        finally:
+            dealer.close()
+            outboundpull.close()
+            # no reply can arrive anymore, so fail the waiting commands now instead of letting them wait until their timeout or forever
+            self._isstopped = True
+            self._FailPending(VisionControllerClientError(_('Pipelined command channel to %s stopped') % self._url, errortype='unknownerror'))
+
+    def SendCommandAsync(self, command, timeout=10.0, fireandforget=False, sendjson=True, zerocopy=False):
+        # type: (Any, Optional[float], bool, bool, bool) -> Optional[Future]
+        """Sends the command and returns a future resolved with the raw reply payload.
+
+        Args:
+            command (dict or bytes): The command. Encoded to json unless sendjson is False.
+            timeout (float, optional): Time in seconds after which the future fails with VisionControllerTimeoutError. None means no timeout.
+            fireandforget (bool, optional): If True, the reply is dropped and None is returned.
+            sendjson (bool, optional): If True, command is encoded to json.
+            zerocopy (bool, optional): If True, the reply is a memoryview of the received zmq frame instead of a bytes copy. (Default: False)
+
+        Returns:
+            concurrent.futures.Future: resolved with the reply as bytes (or memoryview), or with a list of them for a multipart reply.
+        """
+        if self._isdestroying or self._isstopped:
+            raise VisionControllerClientError(_('Pipelined command channel to %s is destroyed') % self._url, errortype='unknownerror')
+        commandName = ''
+        if isinstance(command, dict):
+            commandName = command.get('command') or ''
+        payload = command
+        if sendjson:
+            payload = json.dumps(command)
+        if not isinstance(payload, bytes):
+            payload = payload.encode('utf-8')
+        requestid = (u'%x' % next(self._requestids)).encode('ascii')
+
+        future = None
+        if not fireandforget:
+            future = Future()
+            pending = _PendingRequest(requestid, commandName, future, None if timeout is None else time.monotonic() + timeout, zerocopy=zerocopy)
+            with self._pendinglock:
+                self._pending[requestid] = pending
+            if self._isstopped:
+                # the I/O thread exited after the check above and might have failed the pending commands before this one was added
+                self._DiscardPending(requestid)
+                raise VisionControllerClientError(_('Pipelined command channel to %s is destroyed') % self._url, errortype='unknownerror')
+            future.add_done_callback(lambda f: f.cancelled() and self._DiscardPending(requestid))
+        with self._outboundlock:
+            self._outboundsocket.send_multipart([requestid, payload])
+        return future
+
+    def _DiscardPending(self, requestid):
+        # type: (bytes) -> None
+        with self._pendinglock:
+            self._pending.pop(requestid, None)
+
+    def _WaitForFuture(self, future, timeout=None, checkpreempt=True):
+        # type: (Future, Optional[float], bool) -> Any
+        """Waits for the future in slices so that the preempt function and destroy flag get checked."""
+        starttime = time.monotonic()
+        while True:
+            if self._isdestroying:
+                future.cancel()
+                raise VisionControllerClientError(_('Pipelined command channel to %s is destroyed') % self._url, errortype='unknownerror')
+            if checkpreempt and self._checkpreemptfn is not None:
+                try:
+                    self._checkpreemptfn()
+                except Exception:
+                    future.cancel()
+                    raise
+            waittime = 0.05
+            if timeout is not None:
+                waittime = min(waittime, max(0.0, starttime + timeout - time.monotonic()))
+            try:
+                return future.result(timeout=waittime)
+            except VisionControllerClientError:
+                raise
+            except Exception as e:
+                if not future.done():
+                    if timeout is not None and time.monotonic() - starttime >= timeout:
+                        future.cancel()
+                        raise VisionControllerTimeoutError(_('Timed out after %.03f seconds to get response message from %s') % (timeout, self._url), errortype='timeout')
+                    continue
+                raise VisionControllerClientError(_('Problem receiving response from %s: %s') % (self._url, e), errortype='unknownerror')
+
+    def SendCommand(self, command, timeout=10.0, blockwait=True, fireandforget=False, sendjson=True, recvjson=True, checkpreempt=True, zerocopy=False):
+        # type: (Any, Optional[float], bool, bool, bool, bool, bool, bool) -> Any
+        """Sends a command and waits for its reply, with the same semantics as zmqclient.ZmqClient.SendCommand.
+
+        Args:
+            command (dict or bytes): The command.
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed.
+            blockwait (bool, optional): If False, returns immediately and the reply has to be collected with ReceiveCommand.
+            fireandforget (bool, optional): If True, returns immediately after sending the command and the reply is dropped.
+            sendjson (bool, optional): If True, command is encoded to json.
+            recvjson (bool, optional): If True, the reply is decoded from json.
+            checkpreempt (bool, optional): If the preempt function should be checked while waiting.
+            zerocopy (bool, optional): If True and recvjson is False, the reply is a memoryview of the received zmq frame. (Default: False)
+        """
+        future = self.SendCommandAsync(command, timeout=timeout, fireandforget=fireandforget, sendjson=sendjson, zerocopy=zerocopy and not recvjson)
+        if fireandforget:
+            return None
+        if not blockwait:
+            self._waitingfuture = future
+            return None
+        response = self._WaitForFuture(future, timeout=timeout, checkpreempt=checkpreempt)
+        if recvjson:
+            return json.loads(response)
+        return response
+
+    def ReceiveCommand(self, timeout=10.0, recvjson=True, checkpreempt=True):
+        # type: (Optional[float], bool, bool) -> Any
+        """Receives the reply of the last command sent with blockwait=False."""
+        future = self._waitingfuture
+        if future is None:
+            raise VisionControllerClientError(_('No command is waiting for a reply on %s') % self._url, errortype='invalidwait')
+        try:
+            response = self._WaitForFuture(future, timeout=timeout, checkpreempt=checkpreempt)
+        finally:
+            if future.done():
+                self._waitingfuture = None
+        if recvjson:
+            return json.loads(response)
+        return response
+
+    def IsWaitingReply(self):
+        # type: () -> bool
+        return self._waitingfuture is not None
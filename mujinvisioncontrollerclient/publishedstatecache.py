@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Background subscriber keeping the latest published state of the vision manager
+
+# system imports
+import collections
+import threading
+import time
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Callable, Deque, Optional, Tuple # noqa: F401 # used in type check
+
+# mujin imports
+from . import json
+from . import zmq
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+
+class PublishedStateQueue(object):
+    """Bounded queue of published states handed from the subscriber thread to a consumer. When full, the oldest state is dropped."""
+
+    _condition = None  # type: Optional[threading.Condition]
+    _states = None  # type: Optional[Deque[Any]]
+    _numdropped = 0  # type: int # number of states dropped because the consumer was too slow
+
+    def __init__(self, maxQueueSize=16):
+        # type: (int) -> None
+        self._condition = threading.Condition()
+        self._states = collections.deque(maxlen=maxQueueSize)
+
+    def Put(self, state):
+        # type: (Any) -> None
+        with self._condition:
+            if len(self._states) == self._states.maxlen:
+                self._numdropped += 1
+            self._states.append(state)
+            self._condition.notify()
+
+    def Get(self, timeout=None):
+        # type: (Optional[float]) -> Tuple[bool, Any]
+        """Waits for the next state. Returns (True, state), or (False, None) if nothing came within timeout."""
+        with self._condition:
+            if not self._states:
+                self._condition.wait(timeout)
+            if not self._states:
+                return False, None
+            return True, self._states.popleft()
+
+    def GetNumDropped(self):
+        # type: () -> int
+        return self._numdropped
+
+
+class PublishedStateIterator(object):
+    """Iterator over the states received by a PublishedStateCache, created by PublishedStateCache.IterStates. Stops listening when closed or exhausted, so close it (or use it in a with statement) when breaking out of the iteration."""
+
+    _cache = None  # type: Optional[PublishedStateCache]
+    _queue = None  # type: Optional[PublishedStateQueue]
+    _timeout = None  # type: Optional[float]
+    _convertfn = None  # type: Optional[Callable[[Any], Any]]
+
+    def __init__(self, cache, maxQueueSize=16, timeout=None, convertfn=None):
+        # type: (PublishedStateCache, int, Optional[float], Optional[Callable[[Any], Any]]) -> None
+        self._queue = PublishedStateQueue(maxQueueSize=maxQueueSize)
+        self._timeout = timeout
+        self._convertfn = convertfn
+        self._cache = cache
+        cache.AddListener(self._Listener)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exctype, excvalue, traceback):
+        self.close()
+
+    def _Listener(self, state):
+        # type: (Any) -> None
+        if self._convertfn is not None:
+            state = self._convertfn(state)
+        if state is not None:
+            self._queue.Put(state)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        # type: () -> Any
+        deadline = None if self._timeout is None else time.monotonic() + self._timeout
+        while self._cache is not None and not self._cache.IsStopping():
+            # wait in slices so that the iteration ends when the cache is destroyed
+            waittime = 0.1
+            if deadline is not None:
+                waittime = min(waittime, max(0.0, deadline - time.monotonic()))
+            hasState, state = self._queue.Get(timeout=waittime)
+            if hasState:
+                return state
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        self.close()
+        raise StopIteration()
+
+    next = __next__ # python2
+
+    def close(self):
+        # type: () -> None
+        if self._cache is not None:
+            self._cache.RemoveListener(self._Listener)
+            if self._queue.GetNumDropped() > 0:
+                log.debug('dropped %d published states because the consumer was too slow', self._queue.GetNumDropped())
+            self._cache = None
+
+
+class PublishedStateCache(object):
+    """Subscribes to the status port of the vision manager on a background thread and keeps the most recent decoded state in memory, so that reading it does not block.
+
+    Only the latest message is kept by the socket (zmq.CONFLATE), so a slow decoder never queues up old states.
+    """
+
+    _ctx = None  # type: Optional[zmq.Context]
+    _url = None  # type: Optional[str]
+    _decodefn = None  # type: Optional[Callable[[bytes], Any]] # decodes the raw published message
+
+    _condition = None  # type: Optional[threading.Condition] # guards the state below, notified on every new state
+    _state = None  # type: Any # most recent decoded state
+    _receivetime = None  # type: Optional[float] # time.time() when _state was received
+    _receivemonotonic = None  # type: Optional[float] # time.monotonic() when _state was received, used for ages
+    _numreceived = 0  # type: int # number of states received so far
+
+    _listeners = ()  # type: Tuple[Callable[[Any], None], ...] # called on the subscriber thread with every new state, replaced as a whole when changed
+
+    _thread = None  # type: Optional[threading.Thread]
+    _isstopping = False  # type: bool
+
+    def __init__(self, url, ctx, decodefn=None):
+        # type: (str, zmq.Context, Optional[Callable[[bytes], Any]]) -> None
+        """Starts the subscriber thread.
+
+        Args:
+            url (str): zmq endpoint of the status port, e.g. tcp://visioncontroller1:7005
+            ctx (zmq.Context): The ZMQ context
+            decodefn (Callable, optional): Decodes the raw published message. (Default: json.loads)
+        """
+        self._url = url
+        self._ctx = ctx
+        self._decodefn = decodefn or json.loads
+        self._condition = threading.Condition()
+        self._isstopping = False
+        self._thread = threading.Thread(target=self._RunThread, name='PublishedStateCache')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __del__(self):
+        self.Destroy()
+
+    def Destroy(self):
+        # type: () -> None
+        self._isstopping = True
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._condition:
+            self._condition.notify_all()
+
+    def _RunThread(self):
+        # type: () -> None
+        socket = self._ctx.socket(zmq.SUB)
+        try:
+            socket.setsockopt(zmq.LINGER, 0)
+            socket.setsockopt(zmq.CONFLATE, 1)
+            socket.setsockopt(zmq.SUBSCRIBE, b'')
+            socket.connect(self._url)
+            while not self._isstopping:
+                if not socket.poll(100, zmq.POLLIN):
+                    continue
+                rawState = socket.recv()
+                try:
+                    state = self._decodefn(rawState)
+                except Exception as e:
+                    log.warning('failed to decode published state from %s: %s', self._url, e)
+                    continue
+                self._SetState(state)
+                for listener in self._listeners:
+                    try:
+                        listener(state)
+                    except Exception as e:
+                        log.exception('published state listener failed: %s', e)
+        except Exception as e:
+            log.exception('published state subscriber of %s stopped: %s', self._url, e)
+        finally:
+            socket.close()
+
+    def _SetState(self, state):
+        # type: (Any) -> None
+        with self._condition:
+            self._state = state
+            self._receivetime = time.time()
+            self._receivemonotonic = time.monotonic()
+            self._numreceived += 1
+            self._condition.notify_all()
+
+    def AddListener(self, listener):
+        # type: (Callable[[Any], None]) -> None
+        """Calls listener with every new state, on the subscriber thread. The listener should return quickly, states published while it runs are conflated to the latest one."""
+        with self._condition:
+            self._listeners = self._listeners + (listener,)
+
+    def RemoveListener(self, listener):
+        # type: (Callable[[Any], None]) -> None
+        with self._condition:
+            self._listeners = tuple(registeredListener for registeredListener in self._listeners if registeredListener != listener)
+
+    def IterStates(self, maxQueueSize=16, timeout=None, convertfn=None):
+        # type: (int, Optional[float], Optional[Callable[[Any], Any]]) -> PublishedStateIterator
+        """Returns an iterator yielding every new state as it arrives, starting from the states received after this call.
+
+        Args:
+            maxQueueSize (int, optional): Number of states kept when the consumer is slower than the publisher. The oldest ones are dropped first. (Default: 16)
+            timeout (float, optional): The iteration ends if no new state arrives within this many seconds. None means wait forever.
+            convertfn (Callable, optional): Applied to every state on the subscriber thread. States converted to None are skipped.
+        """
+        return PublishedStateIterator(self, maxQueueSize=maxQueueSize, timeout=timeout, convertfn=convertfn)
+
+    def IsStopping(self):
+        # type: () -> bool
+        return self._isstopping
+
+    def GetLatestState(self):
+        # type: () -> Tuple[Any, Optional[float]]
+        """Returns the most recent state and the time.time() it was received at, without waiting. (None, None) if nothing was received yet."""
+        with self._condition:
+            return self._state, self._receivetime
+
+    def GetState(self, maxAge=None, timeout=2.0):
+        # type: (Optional[float], Optional[float]) -> Any
+        """Returns the most recent state.
+
+        Args:
+            maxAge (float, optional): If the cached state is older than this many seconds, waits for a new one. If not specified, any cached state is returned right away.
+            timeout (float, optional): Time in seconds to wait when there is no cached state, or it is too old. None means wait forever.
+
+        Returns:
+            The decoded state, or None if no suitable state was received within timeout.
+        """
+        starttime = time.monotonic()
+        with self._condition:
+            while True:
+                if self._state is not None and (maxAge is None or time.monotonic() - self._receivemonotonic <= maxAge):
+                    return self._state
+                waittime = None
+                if timeout is not None:
+                    waittime = starttime + timeout - time.monotonic()
+                    if waittime <= 0:
+                        return None
+                if self._isstopping:
+                    return None
+                self._condition.wait(waittime)
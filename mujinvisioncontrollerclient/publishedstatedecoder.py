@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Decoding only the parts of the published server state that a slave client needs
+
+# system imports
+import re
+import json as _stdjson # raw_decode and scanstring are only provided by the standard json module
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterable, Optional, Tuple, Union # noqa: F401 # used in type check
+
+# mujin imports
+from . import json
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+_decoder = _stdjson.JSONDecoder()
+_scanstring = _stdjson.decoder.scanstring
+_whitespace = ' \t\n\r'
+_stringpattern = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL) # a whole json string, including escaped quotes
+_nonbrackets = bytes(bytearray(c for c in range(256) if c not in b'{}[]')) # deleted with bytes.translate, much faster than a regular expression
+
+
+def _SkipWhitespace(s, index):
+    # type: (str, int) -> int
+    while index < len(s) and s[index] in _whitespace:
+        index += 1
+    return index
+
+
+def _GetDepthChange(s, start, end):
+    # type: (str, int, int) -> Optional[Tuple[int, int]]
+    """Returns (change, lowest) of the depth of nested objects and arrays over s[start:end], lowest being the lowest depth reached relative to start, or None if end is inside a string. start has to be outside a string. Strings are removed first, so braces and brackets inside them are not counted."""
+    segment = s[start:end]
+    if '\\"' in segment:
+        # some quotes might be escaped, so the strings have to be matched one by one
+        segment = _stringpattern.sub('', segment)
+        if '"' in segment:
+            return None
+    else:
+        # every quote starts or ends a string, splitting is several times faster than matching the strings
+        parts = segment.split('"')
+        if len(parts) % 2 == 0:
+            return None
+        segment = ''.join(parts[0::2])
+    brackets = segment.encode('utf-8').translate(None, _nonbrackets)
+    # removing the pairs opened and closed in the segment leaves the unmatched closing ones first, then the unmatched opening ones
+    while True:
+        unmatched = brackets.replace(b'{}', b'').replace(b'[]', b'')
+        if len(unmatched) == len(brackets):
+            break
+        brackets = unmatched
+    numClosing = len(brackets) - len(brackets.lstrip(b'}]'))
+    return len(brackets) - 2 * numClosing, -numClosing
+
+
+def _GetKeyNeedles(key):
+    # type: (str) -> Iterable[str]
+    """Returns the ways key can be written as a json string, e.g. ujson escapes forward slashes and some encoders do not escape non-ascii characters."""
+    needles = set([_stdjson.dumps(key), _stdjson.dumps(key, ensure_ascii=False)])
+    return needles | set(needle.replace('/', '\\/') for needle in needles)
+
+
+def _FindKey(s, key, objectindex):
+    # type: (str, str, int) -> int
+    """Returns the index of the value of the member named key of the json object whose opening brace is at objectindex, or -1 if the object has no such member.
+
+    Candidates are found by searching the text for the key, then confirmed in order by checking that they are directly inside the object and not inside a string or a nested value, so a key of a nested object, of an object after this one, or text inside a string never matches. The depth is carried from one candidate to the next, so the text is scanned once.
+    """
+    candidates = []
+    for needle in _GetKeyNeedles(key):
+        index = s.find(needle, objectindex + 1)
+        while index >= 0:
+            candidates.append((index, len(needle)))
+            index = s.find(needle, index + 1)
+    candidates.sort()
+    depth = 1 # inside the object
+    scannedindex = objectindex + 1 # outside of any string, depth is the depth there
+    for index, needlelength in candidates:
+        colonindex = _SkipWhitespace(s, index + needlelength)
+        if colonindex >= len(s) or s[colonindex] != ':':
+            continue
+        depthchange = _GetDepthChange(s, scannedindex, index)
+        if depthchange is None:
+            continue # inside a string, the next candidates are checked from the same place
+        change, lowest = depthchange
+        if depth + lowest <= 0:
+            return -1 # the object ends before this candidate
+        depth += change
+        scannedindex = index
+        if depth == 1:
+            return _SkipWhitespace(s, colonindex + 1)
+    return -1
+
+
+def _ToText(rawServerState):
+    # type: (Union[bytes, bytearray, memoryview, str]) -> str
+    if isinstance(rawServerState, (bytes, bytearray, memoryview)):
+        return bytes(rawServerState).decode('utf-8')
+    return rawServerState
+
+
+def DecodeSlaveState(rawServerState, slaverequestid):
+    # type: (Union[bytes, str], Optional[str]) -> Optional[Dict[str, Any]]
+    """Decodes only the state of one slave from a raw published server state, without building the states of the other slaves.
+
+    The members of the top-level object and of slavestates are scanned for the keys without decoding their values, and only the value of the slave entry is decoded, so no objects are built for the other slaves. If the text cannot be scanned, the whole server state is decoded instead. Equivalent to json.loads(rawServerState)['slavestates'].get('slaverequestid-<slaverequestid>').
+
+    Args:
+        rawServerState (bytes or str): Message received on the status port.
+        slaverequestid (str): The slave request id of the client.
+
+    Returns:
+        dict: The slave state, or None if the server state has no state for this slave.
+    """
+    s = _ToText(rawServerState)
+    try:
+        index = _SkipWhitespace(s, 0)
+        if index >= len(s) or s[index] != '{':
+            raise ValueError('published server state is not a json object')
+        slavestatesindex = _FindKey(s, 'slavestates', index)
+        if slavestatesindex < 0 or slavestatesindex >= len(s) or s[slavestatesindex] != '{':
+            return None
+        valueindex = _FindKey(s, 'slaverequestid-%s' % slaverequestid, slavestatesindex)
+        if valueindex < 0:
+            return None
+        slaveState, endindex = _decoder.raw_decode(s, valueindex)
+    except ValueError as e:
+        log.warning('failed to decode state of slave %s selectively, decoding whole server state: %s', slaverequestid, e)
+        serverState = json.loads(s)
+        return serverState.get('slavestates', {}).get('slaverequestid-%s' % slaverequestid)
+    return slaveState
+
+
+def DecodePartialServerState(rawServerState, slaverequestid, topLevelKeys=('tasks', 'timestamp')):
+    # type: (Union[bytes, str], Optional[str], Iterable[str]) -> Dict[str, Any]
+    """Decodes a raw published server state keeping only the state of one slave and some top-level members.
+
+    The top-level members are walked in order and only the requested ones are kept. Finding where the other members and the other slave states end still goes through the C decoder, so this costs close to a full decode and only saves memory. When only the slave state is needed, use DecodeSlaveState instead.
+
+    Args:
+        rawServerState (bytes or str): Message received on the status port.
+        slaverequestid (str): The slave request id of the client.
+        topLevelKeys (list[str], optional): Names of the top-level members to keep. (Default: ('tasks', 'timestamp'))
+
+    Returns:
+        dict: A server state with the same structure as the published one, where slavestates only has the entry of this slave.
+    """
+    s = _ToText(rawServerState)
+    index = _SkipWhitespace(s, 0)
+    if index >= len(s) or s[index] != '{':
+        raise ValueError('published server state is not a json object')
+    keys = frozenset(topLevelKeys)
+    slavekeys = frozenset(['slaverequestid-%s' % slaverequestid])
+    serverState, index = _DecodeMembers(s, index, lambda key: key in keys, lambda key: slavekeys if key == 'slavestates' else None)
+    return serverState
+
+
+def _DecodeMembers(s, index, keepfn, nestedkeysfn=None):
+    # type: (str, int, Any, Any) -> Tuple[Dict[str, Any], int]
+    """Decodes the members of the json object starting at index for which keepfn returns True, and skips the others.
+
+    Args:
+        s (str): json text
+        index (int): index of the opening brace
+        keepfn (Callable): called with each key, returns True if the member should be decoded
+        nestedkeysfn (Callable, optional): called with each key, returns the keys to keep if the member is an object that should be walked the same way, or None
+
+    Returns:
+        tuple: (dict of the decoded members, index right after the closing brace)
+    """
+    members = {}  # type: Dict[str, Any]
+    index += 1
+    while True:
+        index = _SkipWhitespace(s, index)
+        if s[index] == '}':
+            return members, index + 1
+        if s[index] == ',':
+            index = _SkipWhitespace(s, index + 1)
+        key, index = _scanstring(s, index + 1)
+        index = _SkipWhitespace(s, _SkipWhitespace(s, index) + 1) # skip colon
+        nestedkeys = nestedkeysfn(key) if nestedkeysfn is not None else None
+        if nestedkeys is not None and s[index] == '{':
+            members[key], index = _DecodeMembers(s, index, lambda nestedkey: nestedkey in nestedkeys)
+        elif keepfn(key):
+            members[key], index = _decoder.raw_decode(s, index)
+        else:
+            # the C decoder is the fastest way to find where the value ends
+            index = _decoder.raw_decode(s, index)[1]
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import asyncio
+import json
+import unittest
+
+import zmq
+import zmq.asyncio
+
+from mujinvisioncontrollerclient import VisionControllerClientError, VisionControllerTimeoutError
+from mujinvisioncontrollerclient.asyncvisioncontrollerclient import AsyncVisionControllerClient
+
+
+class TestAsyncVisionControllerClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.ctx = zmq.asyncio.Context()
+        self.server = self.ctx.socket(zmq.REP)
+        self.port = self.server.bind_to_random_port('tcp://127.0.0.1')
+        self.client = AsyncVisionControllerClient(hostname='127.0.0.1', commandport=self.port, ctx=self.ctx, callerid='tester', slaverequestid='slave0')
+
+    async def asyncTearDown(self):
+        self.client.Destroy()
+        self.server.close(linger=0)
+        self.ctx.destroy(linger=0)
+
+    async def _Serve(self, handler):
+        request = json.loads(await self.server.recv())
+        await self.server.send(handler(request))
+        return request
+
+    async def test_command(self):
+        server = asyncio.ensure_future(self._Serve(lambda request: json.dumps({'detectionResults': []}).encode('utf-8')))
+        response = await self.client.GetLatestDetectedObjects(taskId='task0')
+        request = await server
+        self.assertEqual(response, {'detectionResults': []})
+        self.assertEqual(request['command'], 'GetLatestDetectedObjects')
+        self.assertEqual(request['taskId'], 'task0')
+        self.assertEqual(request['callerid'], 'tester')
+        self.assertEqual(request['slaverequestid'], 'slave0')
+
+    async def test_error(self):
+        server = asyncio.ensure_future(self._Serve(lambda request: json.dumps({'error': {'type': 'sometype', 'desc': 'somedesc'}}).encode('utf-8')))
+        with self.assertRaises(VisionControllerClientError) as cm:
+            await self.client.GetTaskStateService(taskId='task0')
+        await server
+        self.assertEqual(cm.exception, VisionControllerClientError('somedesc', errortype='sometype'))
+
+    async def test_rawerror(self):
+        server = asyncio.ensure_future(self._Serve(lambda request: json.dumps({'error': {'type': 'sometype', 'desc': 'somedesc'}}).encode('utf-8')))
+        with self.assertRaises(VisionControllerClientError):
+            await self.client.GetLatestDetectionResultImages(taskId='task0')
+        await server
+
+    async def test_rawresponse(self):
+        server = asyncio.ensure_future(self._Serve(lambda request: b'\x00\x01binary'))
+        response = await self.client.GetLatestDetectionResultImages(taskId='task0')
+        await server
+        self.assertEqual(response, b'\x00\x01binary')
+
+    async def test_zerocopy(self):
+        server = asyncio.ensure_future(self._Serve(lambda request: b'\x00\x01binary'))
+        response = await self.client.GetLatestDetectionResultImages(taskId='task0', zerocopy=True)
+        await server
+        self.assertIsInstance(response, memoryview)
+        self.assertEqual(response, b'\x00\x01binary')
+
+    async def test_zerocopyrawerror(self):
+        server = asyncio.ensure_future(self._Serve(lambda request: json.dumps({'error': {'type': 'sometype', 'desc': 'somedesc'}}).encode('utf-8')))
+        with self.assertRaises(VisionControllerClientError):
+            await self.client.GetDetectionHistory(1, zerocopy=True)
+        await server
+
+    async def test_timeout(self):
+        with self.assertRaises(VisionControllerTimeoutError):
+            await self.client.Ping(timeout=0.05)
+        # socket that timed out is discarded, so the next command can still go through
+        await self.server.recv()
+        await self.server.send(b'{}')
+        server = asyncio.ensure_future(self._Serve(lambda request: b'{}'))
+        self.assertEqual(await self.client.Ping(timeout=1.0), {})
+        await server
+
+    async def test_concurrent(self):
+        async def _ServeMany(count):
+            for index in range(count):
+                await self._Serve(lambda request: json.dumps({'taskId': request['taskId']}).encode('utf-8'))
+        server = asyncio.ensure_future(_ServeMany(3))
+        responses = await asyncio.gather(*[self.client.GetTaskStateService(taskId='task%d' % index) for index in range(3)])
+        await server
+        self.assertEqual(sorted(response['taskId'] for response in responses), ['task0', 'task1', 'task2'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import threading
+import unittest
+
+from mujinvisioncontrollerclient import VisionControllerClientError, VisionControllerTimeoutError
+from mujinvisioncontrollerclient.checkoutzmqclient import CheckoutZmqClient
+
+
+class _FakeZmqClient(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.waiting = None
+        self.isdestroyed = False
+        self.release = None
+
+    def SendCommand(self, command, blockwait=True, timeout=None, **kwargs):
+        # a ZmqClient must never be used by two threads at once
+        assert self.lock.acquire(blocking=False)
+        try:
+            if self.release is not None:
+                self.release.wait()
+            if not blockwait:
+                self.waiting = command
+                return None
+            return command
+        finally:
+            self.lock.release()
+
+    def ReceiveCommand(self, **kwargs):
+        command, self.waiting = self.waiting, None
+        return command
+
+    def IsWaitingReply(self):
+        return self.waiting is not None
+
+    def SetDestroy(self):
+        pass
+
+    def Destroy(self):
+        self.isdestroyed = True
+
+
+class TestCheckoutZmqClient(unittest.TestCase):
+    def setUp(self):
+        self.clients = []
+        self.release = None
+        self.socket = CheckoutZmqClient(self._Create, maxClients=2)
+
+    def tearDown(self):
+        self.socket.Destroy()
+
+    def _Create(self):
+        client = _FakeZmqClient()
+        client.release = self.release
+        self.clients.append(client)
+        return client
+
+    def _RunOnThread(self, fn):
+        thread = threading.Thread(target=fn)
+        thread.start()
+        thread.join()
+
+    def test_maxclients(self):
+        self.assertEqual(self.socket.SendCommand(b'main'), b'main')
+        self.assertEqual(self.socket.GetNumClients(), 1)
+        results = []
+        errors = []
+
+        def _Send(index):
+            try:
+                for iteration in range(20):
+                    results.append(self.socket.SendCommand(b'%d' % index, timeout=5.0))
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=_Send, args=(index,)) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), 160)
+        # eight threads shared at most two clients
+        self.assertLessEqual(len(self.clients), 2)
+        self.assertEqual(self.socket.GetNumClients(), len(self.clients))
+
+    def test_timeout(self):
+        self.release = threading.Event()
+        threads = [threading.Thread(target=self.socket.SendCommand, args=(b'slow',)) for index in range(2)]
+        for thread in threads:
+            thread.start()
+        try:
+            # both clients are checked out
+            with self.assertRaises(VisionControllerTimeoutError):
+                self.socket.SendCommand(b'main', timeout=0.1)
+        finally:
+            self.release.set()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(self.socket.SendCommand(b'main', timeout=0.1), b'main')
+
+    def test_blockwait(self):
+        self.assertFalse(self.socket.IsWaitingReply())
+        self.socket.SendCommand(b'images', blockwait=False)
+        self.assertTrue(self.socket.IsWaitingReply())
+        # the reply is waited for by the thread that sent the command only, and its client stays checked out
+        self._RunOnThread(lambda: self.assertFalse(self.socket.IsWaitingReply()))
+        self._RunOnThread(lambda: self.socket.SendCommand(b'worker'))
+        self.assertEqual(self.socket.GetNumClients(), 2)
+        self.assertEqual(self.socket.ReceiveCommand(), b'images')
+        self.assertFalse(self.socket.IsWaitingReply())
+        with self.assertRaises(VisionControllerClientError):
+            self.socket.ReceiveCommand()
+
+    def test_prune(self):
+        self._RunOnThread(lambda: self.socket.SendCommand(b'worker1', blockwait=False))
+        self._RunOnThread(lambda: self.socket.SendCommand(b'worker2', blockwait=False))
+        self.assertEqual(self.socket.GetNumClients(), 2)
+        # the clients of threads that exited while waiting for a reply are destroyed to make room
+        self.assertEqual(self.socket.SendCommand(b'main', timeout=0.1), b'main')
+        self.assertEqual(self.socket.GetNumClients(), 1)
+        self.assertTrue(self.clients[0].isdestroyed)
+        self.assertTrue(self.clients[1].isdestroyed)
+
+    def test_destroy(self):
+        self.socket.SendCommand(b'main')
+        self.socket.Destroy()
+        self.assertTrue(all(client.isdestroyed for client in self.clients))
+        self.assertEqual(self.socket.GetNumClients(), 0)
+        with self.assertRaises(VisionControllerClientError):
+            self.socket.SendCommand(b'main')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import unittest
+
+from mujinvisioncontrollerclient import VisionControllerClientError
+from mujinvisioncontrollerclient.codec import Codec, DecodeResponse, GetAvailableCodecNames, GetCodec, StdJsonCodec
+
+
+class TestCodec(unittest.TestCase):
+    obj = {'command': 'GetLatestDetectedObjects', 'objects': [{'name': u'ワーク', 'translation_': [1.5, -2, 3], 'quat_': [1, 0, 0, 0]}], 'isFinal': True, 'extra': None}
+
+    def test_roundtrip(self):
+        names = GetAvailableCodecNames()
+        self.assertIn('json', names)
+        for name in names:
+            codec = GetCodec(name)
+            data = codec.Encode(self.obj)
+            self.assertIsInstance(data, bytes)
+            for raw in (data, bytearray(data), memoryview(data), data.decode('utf-8')):
+                self.assertEqual(codec.Decode(raw), self.obj, '%s failed to decode %s' % (name, type(raw)))
+            # every codec reads what the others wrote
+            self.assertEqual(GetCodec('json').Decode(data), self.obj)
+
+    def test_getcodec(self):
+        self.assertIs(GetCodec('json'), GetCodec('json'))
+        codec = StdJsonCodec()
+        self.assertIs(GetCodec(codec), codec)
+        self.assertIsInstance(GetCodec(), Codec)
+        with self.assertRaises(ValueError):
+            GetCodec('xml')
+
+    def test_decoderesponse(self):
+        codec = GetCodec('json')
+        self.assertEqual(DecodeResponse(codec, b'{"timestamp": 1}'), {'timestamp': 1})
+        self.assertEqual(DecodeResponse(codec, {'timestamp': 1}), {'timestamp': 1})
+        self.assertEqual(DecodeResponse(codec, b'{}'), {})
+        self.assertEqual(DecodeResponse(codec, b'\x00blob', recvjson=False), b'\x00blob')
+        view = DecodeResponse(codec, b'\x00blob', recvjson=False, zerocopy=True)
+        self.assertIsInstance(view, memoryview)
+        self.assertEqual(DecodeResponse(codec, memoryview(b'{"a": 1}'), recvjson=False), {'a': 1})
+        # errors are raised the same way for json and raw replies
+        for recvjson in (True, False):
+            with self.assertRaises(VisionControllerClientError) as context:
+                DecodeResponse(codec, b'{"error": {"type": "invalidtask", "desc": "no task"}}', recvjson=recvjson)
+            self.assertEqual((context.exception._type, context.exception._desc), ('invalidtask', 'no task'))
+            with self.assertRaises(VisionControllerClientError) as context:
+                DecodeResponse(codec, b'{"error": "failed"}', recvjson=recvjson)
+            self.assertEqual(context.exception._type, 'unknownerror')
+        with self.assertRaises(VisionControllerClientError) as context:
+            DecodeResponse(codec, b'', recvjson=False, command={'command': 'GetDetectionHistory'})
+        self.assertEqual(context.exception._type, 'emptyresponseerror')
+
+
+if __name__ == "__main__":
+    unittest.main()
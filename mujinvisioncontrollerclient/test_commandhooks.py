@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import unittest
+
+from mujinvisioncontrollerclient.commandhooks import CallAfterReceive, CallBeforeSend, CallOnError, CommandEvent, CommandHook
+
+
+class _RecordingHook(CommandHook):
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+
+    def OnBeforeSend(self, event):
+        self.calls.append(('before', self.name))
+        return 'span-%s' % self.name
+
+    def OnAfterReceive(self, event, context):
+        self.calls.append(('after', self.name, context))
+
+    def OnError(self, event, error, context):
+        self.calls.append(('error', self.name, context, str(error)))
+
+
+class _FailingHook(CommandHook):
+    def OnBeforeSend(self, event):
+        raise RuntimeError('hook failure')
+
+
+class TestCommandHooks(unittest.TestCase):
+    def test_event(self):
+        event = CommandEvent([], 'StartObjectDetectionTask', 'command', command={'command': 'StartObjectDetectionTask', 'callerid': 'robot1', 'slaverequestid': 'slave1', 'cycleIndex': 'cycle1'})
+        self.assertEqual((event.callerid, event.slaverequestid, event.cycleIndex), ('robot1', 'slave1', 'cycle1'))
+        self.assertIsNone(event.waitUS)
+
+    def test_contexts(self):
+        calls = []
+        event = CommandEvent([_RecordingHook('a', calls), _FailingHook(), _RecordingHook('b', calls)], 'Ping', 'command')
+        # a failing hook neither stops the command nor the other hooks
+        CallBeforeSend(event)
+        CallAfterReceive(event)
+        CallOnError(event, ValueError('bad reply'))
+        self.assertEqual(calls, [
+            ('before', 'a'), ('before', 'b'),
+            ('after', 'a', 'span-a'), ('after', 'b', 'span-b'),
+            ('error', 'a', 'span-a', 'bad reply'), ('error', 'b', 'span-b', 'bad reply'),
+        ])
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import zmq
+
+from mujinvisioncontrollerclient import VisionControllerClientError
+from mujinvisioncontrollerclient.commandhooks import CallAfterReceive, CallBeforeSend, CallOnError, CommandEvent
+from mujinvisioncontrollerclient.commandrecorder import CommandRecorder, CommandRecording, GetBlobFilename, ReplayCommands
+from mujinvisioncontrollerclient.fakevisionmanager import FakeVisionManager
+try:
+    from mujinvisioncontrollerclient.visioncontrollerclient import VisionControllerClient
+except ImportError:
+    VisionControllerClient = None
+
+
+def _Record(recorder, command, response=None, error=None, waitUS=None, recvjson=None):
+    event = CommandEvent((recorder,), command['command'], 'command', command)
+    CallBeforeSend(event)
+    event.waitUS = waitUS
+    event.response = response
+    event.recvjson = recvjson
+    if error is not None:
+        CallOnError(event, error)
+    else:
+        CallAfterReceive(event)
+
+
+class TestCommandRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'recording')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_recording(self):
+        recorder = CommandRecorder(self.filename, blobThreshold=16, metadata={'slaverequestid': 'slave1'})
+        _Record(recorder, {'command': 'Ping'}, response=b'{"timestamp":1}', waitUS=100)
+        _Record(recorder, {'command': 'GetDetectionHistory'}, response=memoryview(b'\x00\xff' * 10))
+        _Record(recorder, {'command': 'GetLatestDetectedObjects'}, response=b'{"detectionResults":[]}')
+        _Record(recorder, {'command': 'GetTaskState'}, error=VisionControllerClientError('timed out', errortype='timeout'))
+        _Record(recorder, {'command': 'cancel'})
+        recorder.RecordPublishedState({'slavestates': {}})
+        recorder.Close()
+        self.assertEqual(recorder.GetNumRecords(), 7)
+        self.assertEqual(os.path.getsize(GetBlobFilename(self.filename)), 20 + 23)
+
+        with CommandRecording(self.filename) as recording:
+            records = list(recording.IterRecords())
+            self.assertEqual([record['type'] for record in records], ['session', 'command', 'command', 'command', 'command', 'command', 'publishedstate'])
+            self.assertEqual(records[0]['metadata'], {'slaverequestid': 'slave1'})
+            self.assertEqual(records[1]['response'], '{"timestamp":1}')
+            self.assertEqual(records[1]['waitUS'], 100)
+            # binary and large responses go to the sidecar
+            self.assertEqual(records[2]['blob'], [0, 20])
+            self.assertEqual(recording.GetResponse(records[2]), b'\x00\xff' * 10)
+            self.assertEqual(recording.GetResponse(records[3]), b'{"detectionResults":[]}')
+            self.assertEqual(records[4]['error'], {'type': 'timeout', 'desc': 'timed out'})
+            self.assertIsNone(recording.GetResponse(records[4]))
+            self.assertTrue(records[5]['fireandforget'])
+            self.assertFalse(records[1]['fireandforget'])
+            self.assertEqual(json.loads(recording.GetPublishedState(records[6])), {'slavestates': {}})
+
+    def test_rawresponses(self):
+        recorder = CommandRecorder(self.filename)
+        # raw data that happens to be valid utf-8 is not stored inline
+        _Record(recorder, {'command': 'GetDetectionHistory'}, response=bytes(100), recvjson=False)
+        _Record(recorder, {'command': 'GetDetectionHistory'}, response=b'{"error":{"type":"notfound"}}', recvjson=False)
+        _Record(recorder, {'command': 'Ping'}, response=b'{}', recvjson=True)
+        recorder.Close()
+        self.assertEqual(os.path.getsize(GetBlobFilename(self.filename)), 100)
+        with CommandRecording(self.filename) as recording:
+            records = recording.GetRecords(types=('command',))
+            self.assertEqual(records[0]['blob'], [0, 100])
+            self.assertFalse(records[0]['recvjson'])
+            self.assertEqual(recording.GetResponse(records[0]), bytes(100))
+            self.assertEqual(records[1]['response'], '{"error":{"type":"notfound"}}')
+            self.assertEqual(records[2]['response'], '{}')
+            self.assertTrue(records[2]['recvjson'])
+
+    @unittest.skipIf(VisionControllerClient is None, 'mujinplanningclient is not installed')
+    def test_replay(self):
+        ctx = zmq.Context()
+        try:
+            with FakeVisionManager(ctx=ctx, initialTaskIds=('task1',), historySize=100) as server:
+                client = VisionControllerClient(commandport=server.commandport, ctx=ctx, slaverequestid='slave1')
+                try:
+                    client.StartRecording(self.filename)
+                    client.Ping()
+                    client.GetLatestDetectedObjects(taskId='task1')
+                    client.GetDetectionHistory(1)
+                    # both reply {}
+                    client.StopTask(taskId='task1')
+                    client.ResumeTask(taskId='task1')
+                    client.StopRecording()
+                    with CommandRecording(self.filename) as recording:
+                        result = ReplayCommands(client, recording, speed=None)
+                finally:
+                    client.Destroy()
+            self.assertEqual(result['numCommands'], 5)
+            self.assertEqual(result['numRecordedErrors'], 0)
+            self.assertEqual((result['numErrors'], result['errorTypes']), (0, {}))
+        finally:
+            ctx.destroy(linger=0)
+
+    def test_append(self):
+        for index in range(2):
+            recorder = CommandRecorder(self.filename, blobThreshold=0)
+            _Record(recorder, {'command': 'Ping'}, response=b'{"index":%d}' % index)
+            recorder.Close()
+        # a record cut by a crash is skipped
+        with open(self.filename, 'ab') as f:
+            f.write(b'{"type":"comm')
+        with CommandRecording(self.filename) as recording:
+            records = recording.GetRecords(types=('command',))
+            self.assertEqual([recording.GetResponse(record) for record in records], [b'{"index":0}', b'{"index":1}'])
+            self.assertEqual(len(recording.GetRecords(types=('session',))), 2)
+
+    def test_fakevisionmanager(self):
+        recorder = CommandRecorder(self.filename)
+        _Record(recorder, {'command': 'GetLatestDetectedObjects'}, response=b'{"index":0}', waitUS=1000)
+        _Record(recorder, {'command': 'GetLatestDetectedObjects'}, response=b'{"index":1}', waitUS=1000)
+        recorder.RecordPublishedState({'recorded': True})
+        recorder.Close()
+        ctx = zmq.Context()
+        try:
+            with CommandRecording(self.filename) as recording:
+                server = FakeVisionManager(ctx=ctx, transport='inproc')
+                server.LoadRecording(recording, speed=10.0)
+            with server:
+                req = ctx.socket(zmq.REQ)
+                req.connect(server.GetEndpoint('command'))
+                replies = []
+                for command in ('GetLatestDetectedObjects', 'GetLatestDetectedObjects', 'GetLatestDetectedObjects', 'Ping'):
+                    req.send(json.dumps({'command': command}).encode('utf-8'))
+                    self.assertTrue(req.poll(2000))
+                    replies.append(json.loads(req.recv()))
+                req.close(linger=0)
+                # recorded replies are sent in order and start over, other commands get synthetic replies
+                self.assertEqual(replies[:3], [{'index': 0}, {'index': 1}, {'index': 0}])
+                self.assertIn('timestamp', replies[3])
+                subscriber = ctx.socket(zmq.SUB)
+                subscriber.setsockopt(zmq.SUBSCRIBE, b'')
+                subscriber.connect(server.GetEndpoint('status'))
+                self.assertTrue(subscriber.poll(2000))
+                self.assertEqual(json.loads(subscriber.recv()), {'recorded': True})
+                subscriber.close(linger=0)
+        finally:
+            ctx.term()
+
+
+if __name__ == '__main__':
+    unittest.main()
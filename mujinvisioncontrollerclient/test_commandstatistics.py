@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import unittest
+
+from mujinvisioncontrollerclient.commandhooks import CommandEvent
+from mujinvisioncontrollerclient.commandstatistics import CommandStatistics, Log2Histogram
+
+
+class TestCommandStatistics(unittest.TestCase):
+    def test_histogram(self):
+        histogram = Log2Histogram()
+        self.assertIsNone(histogram.GetPercentile(50))
+        for value in [0, 1, 3, 100, 100, 100, 100, 100, 100, 5000]:
+            histogram.Add(value)
+        statistics = histogram.ToDict()
+        self.assertEqual((statistics['count'], statistics['sum'], statistics['min'], statistics['max']), (10, 5604, 0, 5000))
+        # 100 is in the bucket [64, 127]
+        self.assertEqual(statistics['p50'], 127)
+        self.assertEqual(statistics['p99'], 5000)
+        self.assertEqual(statistics['buckets'], [[0, 1], [1, 1], [3, 1], [127, 6], [8191, 1]])
+
+    def _MakeEvent(self, statistics, commandName, **kwargs):
+        event = CommandEvent([statistics], commandName, 'command', command={'command': commandName})
+        for key, value in kwargs.items():
+            setattr(event, key, value)
+        return event
+
+    def test_statistics(self):
+        statistics = CommandStatistics()
+        statistics.OnAfterReceive(self._MakeEvent(statistics, 'Ping', waitUS=1500, requestBytes=20), None)
+        statistics.OnAfterReceive(self._MakeEvent(statistics, 'Ping', waitUS=500), None)
+        statistics.OnAfterReceive(self._MakeEvent(statistics, 'GetLatestDetectedObjects', encodeUS=12, waitUS=3000, responseBytes=2048), None)
+        result = statistics.GetStatistics()
+        self.assertEqual(sorted(result), ['GetLatestDetectedObjects', 'Ping'])
+        # only the members of the events that were set are recorded
+        self.assertEqual(sorted(result['Ping']), ['requestBytes', 'waitUS'])
+        self.assertEqual(sorted(result['GetLatestDetectedObjects']), ['encodeUS', 'responseBytes', 'waitUS'])
+        self.assertEqual((result['Ping']['waitUS']['count'], result['Ping']['waitUS']['sum']), (2, 2000))
+        self.assertEqual(result['Ping']['requestBytes']['count'], 1)
+        statistics.Reset()
+        self.assertEqual(statistics.GetStatistics(), {})
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import math
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from mujinvisioncontrollerclient import VisionControllerClientError
+from mujinvisioncontrollerclient.detectedobjectarrays import ExtractDetectedObjectArrays, GetInRegionMask, GetRegionParametersMask, GetValidIntervalsMask, InvertPose, TransformPoses
+
+
+_response = {'detectionResults': [
+    {'detectedObjects': [
+        {'name': 'box1', 'quat_': [1, 0, 0, 0], 'translation_': [100, 0, 0], 'confidence': 0.9, 'extents': [10, 20, 30]},
+        {'name': 'box2', 'translation_': [0, 300, 0], 'confidence': 0.2},
+    ]},
+    {'detectedObjects': [
+        {'name': 'box3', 'quat_': [1, 0, 0, 0], 'translation_': [50, 50, 0]},
+    ]},
+]}
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestDetectedObjectArrays(unittest.TestCase):
+    def test_extract(self):
+        arrays = ExtractDetectedObjectArrays(_response, attributeKeys=['confidence', 'extents'], attributeSizes=[1, 3])
+        self.assertEqual(arrays.poses.shape, (3, 7))
+        self.assertEqual(arrays.attributes.shape, (3, 4))
+        self.assertEqual(arrays.attributes[0].tolist(), [0.9, 10, 20, 30])
+        self.assertTrue(numpy.isnan(arrays.attributes[2]).all())
+        self.assertEqual(arrays.resultIndices.tolist(), [0, 0, 1])
+        self.assertEqual(arrays.objectIndices.tolist(), [0, 1, 0])
+        selected = arrays.Select(arrays.attributes[:, 0] > 0.5)
+        self.assertEqual([detectedObject['name'] for detectedObject in selected.GetDetectedObjects(_response)], ['box1'])
+
+    def test_invalid(self):
+        with self.assertRaises(VisionControllerClientError):
+            ExtractDetectedObjectArrays({'detectionResults': [{'detectedObjects': [{'translation_': [1, 2]}]}]})
+
+    def test_transform(self):
+        # rotation of 90 degrees around z, then translation
+        transform = numpy.array([math.cos(math.pi / 4), 0, 0, math.sin(math.pi / 4), 1, 2, 3])
+        poses = ExtractDetectedObjectArrays(_response).poses
+        transformed = TransformPoses(transform, poses)
+        numpy.testing.assert_allclose(transformed[0], [math.cos(math.pi / 4), 0, 0, math.sin(math.pi / 4), 1, 102, 3], atol=1e-9)
+        numpy.testing.assert_allclose(TransformPoses(InvertPose(transform), transformed)[[0, 2]], poses[[0, 2]], atol=1e-9)
+        # missing quaternion stays missing
+        self.assertTrue(numpy.isnan(transformed[1, 0:4]).all())
+
+    def test_filters(self):
+        poses = ExtractDetectedObjectArrays(_response).poses
+        self.assertEqual(GetValidIntervalsMask(poses[:, 4], [[-10, 10], [40, 60]]).tolist(), [False, True, True])
+        self.assertEqual(GetValidIntervalsMask(poses[:, 4], []).tolist(), [True, True, True])
+        regionPose = [1, 0, 0, 0, 50, 0, 0]
+        self.assertEqual(GetInRegionMask(poses, regionPose, [200, 200, 10]).tolist(), [True, False, True])
+        self.assertEqual(GetRegionParametersMask(poses, {'validIntervalsY': [[0, 100]], 'innerPose': regionPose, 'innerExtents': [100, 200, 10]}).tolist(), [True, False, True])
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import threading
+import time
+import unittest
+
+from mujinvisioncontrollerclient import VisionControllerTimeoutError
+from mujinvisioncontrollerclient.detectedobjectscache import DetectedObjectsCache
+
+
+class TestDetectedObjectsCache(unittest.TestCase):
+    def setUp(self):
+        self.fetched = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def _Fetch(self, key, timeout):
+        self.fetched.append(key)
+        self.release.wait()
+        return {'detectionResults': [], 'key': key}
+
+    def test_cache(self):
+        cache = DetectedObjectsCache(self._Fetch)
+        response = cache.Get(('task1', None, None))
+        self.assertIs(cache.Get(('task1', None, None)), response)
+        cache.Get(('task2', None, None))
+        self.assertEqual(len(self.fetched), 2)
+        cache.Invalidate()
+        self.assertIsNot(cache.Get(('task1', None, None)), response)
+        self.assertEqual(cache.GetStatistics(), {'hits': 1, 'misses': 3, 'invalidations': 1, 'numEntries': 1})
+
+    def test_concurrentcallers(self):
+        cache = DetectedObjectsCache(self._Fetch)
+        self.release.clear()
+        responses = []
+        threads = [threading.Thread(target=lambda: responses.append(cache.Get('task1', timeout=5.0))) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.fetched), 1)
+        self.assertEqual(len(responses), 4)
+        for response in responses:
+            self.assertIs(response, responses[0])
+
+    def test_waittimeout(self):
+        cache = DetectedObjectsCache(self._Fetch)
+        self.release.clear()
+        thread = threading.Thread(target=cache.Get, args=('task1',))
+        thread.start()
+        try:
+            time.sleep(0.05)
+            with self.assertRaises(VisionControllerTimeoutError):
+                cache.Get('task1', timeout=0.05)
+        finally:
+            self.release.set()
+            thread.join()
+
+    def test_errornotcached(self):
+        calls = []
+
+        def _Fetch(key, timeout):
+            calls.append(key)
+            if len(calls) == 1:
+                raise VisionControllerTimeoutError('timed out', errortype='timeout')
+            return {'detectionResults': []}
+        cache = DetectedObjectsCache(_Fetch)
+        with self.assertRaises(VisionControllerTimeoutError):
+            cache.Get('task1')
+        self.assertEqual(cache.Get('task1'), {'detectionResults': []})
+        self.assertEqual(len(calls), 2)
+
+    def test_maxage(self):
+        cache = DetectedObjectsCache(self._Fetch, maxAge=0.05)
+        cache.Get('task1')
+        cache.Get('task1')
+        time.sleep(0.1)
+        cache.Get('task1')
+        self.assertEqual(len(self.fetched), 2)
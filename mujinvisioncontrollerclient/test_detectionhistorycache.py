@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from mujinvisioncontrollerclient.detectionhistorycache import DetectionHistoryCache
+
+
+class TestDetectionHistoryCache(unittest.TestCase):
+    def setUp(self):
+        self.spillDirectory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.spillDirectory)
+
+    def test_lru(self):
+        cache = DetectionHistoryCache(maxBytes=20)
+        self.assertIsNone(cache.Get(1))
+        cache.Put(1, b'a' * 10)
+        cache.Put(2, b'b' * 10)
+        self.assertEqual(cache.Get(1), b'a' * 10)
+        # 2 is the least recently used
+        cache.Put(3, memoryview(b'c' * 10))
+        self.assertIsNone(cache.Get(2))
+        self.assertEqual(bytes(cache.Get(3)), b'c' * 10)
+        # too large to be kept at all
+        cache.Put(4, b'd' * 30)
+        self.assertIsNone(cache.Get(4))
+        self.assertEqual(cache.GetStatistics(), {
+            'hits': 2, 'spillHits': 0, 'misses': 3, 'evictions': 2,
+            'numEntries': 2, 'numBytes': 20, 'numSpilledEntries': 0, 'numSpilledBytes': 0,
+        })
+
+    def test_spill(self):
+        cache = DetectionHistoryCache(maxBytes=20, spillDirectory=self.spillDirectory, maxSpillBytes=25)
+        for timestamp in range(4):
+            cache.Put(timestamp, bytes([timestamp]) * 10)
+        # 0 and 1 were spilled
+        self.assertEqual(len(os.listdir(self.spillDirectory)), 2)
+        spilled = cache.Get(0)
+        self.assertIsInstance(spilled, memoryview)
+        self.assertEqual(spilled, b'\x00' * 10)
+        del spilled
+        # spilling 2 evicts 1, the least recently used of the spill tier
+        cache.Put(4, b'\x04' * 10)
+        self.assertIsNone(cache.Get(1))
+        self.assertEqual(cache.Get(2), b'\x02' * 10)
+        statistics = cache.GetStatistics()
+        self.assertEqual((statistics['spillHits'], statistics['evictions'], statistics['numSpilledEntries']), (2, 1, 2))
+        cache.Destroy()
+        self.assertEqual(os.listdir(self.spillDirectory), [])
+
+    def test_spillrace(self):
+        class _RacingCache(DetectionHistoryCache):
+            racefn = None
+
+            def _WriteSpilledEntry(self, timestamp, data):
+                racefn, self.racefn = self.racefn, None
+                if racefn is not None:
+                    racefn()
+                return DetectionHistoryCache._WriteSpilledEntry(self, timestamp, data)
+
+        cache = _RacingCache(maxBytes=10, spillDirectory=self.spillDirectory)
+        cache.Put(1, b'\x01' * 10)
+        views = []
+
+        def _PutConcurrently():
+            # 1 is neither in memory nor spilled while its file is written, so another Put of 1 goes to memory, and spills it again
+            cache.Put(1, b'\x01' * 10)
+            cache.Put(3, b'\x03' * 10)
+            views.append(cache.Get(1))
+        cache.racefn = _PutConcurrently
+        cache.Put(2, b'\x02' * 10)
+        spilled, = views
+        self.assertIsInstance(spilled, memoryview)
+        # the file written last is not kept, and did not overwrite the one mapped by the view
+        self.assertEqual(spilled, b'\x01' * 10)
+        self.assertEqual(bytes(cache.Get(1)), b'\x01' * 10)
+        statistics = cache.GetStatistics()
+        self.assertEqual(statistics['numSpilledEntries'], 2)
+        self.assertEqual(statistics['numSpilledBytes'], 20)
+        self.assertEqual(len(os.listdir(self.spillDirectory)), 2)
+        del spilled
+        cache.Destroy()
+        self.assertEqual(os.listdir(self.spillDirectory), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
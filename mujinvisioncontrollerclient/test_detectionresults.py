@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import math
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from mujinvisioncontrollerclient import VisionControllerClientError
+from mujinvisioncontrollerclient.detectionresults import ParseDetectionResults
+
+
+def _MakeResponse():
+    return {'detectionResults': [{
+        'taskId': 'task1',
+        'cycleIndex': 'cycle1',
+        'resultTimestampUS': 1700000000000000,
+        'sensorSelectionInfos': [{'sensorName': 'camera1', 'sensorLinkName': 'camera1_link'}],
+        'detectedObjects': [
+            {'name': 'box1', 'object_uri': 'mujin:/box.mujin.dae', 'quat_': [1, 0, 0, 0], 'translation_': [10.0, 20.0, 30.0], 'confidence': 0.9},
+            {'name': 'box2', 'translation_': [1.0, 2.0, 3.0]},
+        ],
+    }]}
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestDetectionResults(unittest.TestCase):
+    def test_parse(self):
+        response = _MakeResponse()
+        results = ParseDetectionResults(response)
+        self.assertEqual(len(results), 1)
+        result = results[0]
+        self.assertEqual((result.taskId, result.cycleIndex, result.resultTimestampUS), ('task1', 'cycle1', 1700000000000000))
+        self.assertEqual(len(result), 2)
+        poses = result.GetPoses()
+        self.assertEqual(poses.shape, (2, 7))
+        self.assertFalse(poses.flags.writeable)
+        self.assertEqual(poses[0].tolist(), [1, 0, 0, 0, 10, 20, 30])
+        self.assertTrue(numpy.isnan(poses[1, 0:4]).all())
+        box1, box2 = result
+        self.assertEqual((box1.name, box1.objectUri), ('box1', 'mujin:/box.mujin.dae'))
+        self.assertEqual(box1.GetTranslation().tolist(), [10, 20, 30])
+        self.assertEqual(box1.GetConfidence(), 0.9)
+        self.assertTrue(math.isnan(box2.GetConfidence()))
+        # the decoded response is left as is, and the result only keeps the packed objects
+        self.assertEqual(response, _MakeResponse())
+        self.assertNotIn('detectedObjects', result.info)
+        self.assertEqual(result.info['taskId'], 'task1')
+        self.assertIsNone(result._rawDetectedObjects)
+        self.assertEqual(len(result), 2)
+
+    def test_confidencedict(self):
+        response = _MakeResponse()
+        detectedObjects = response['detectionResults'][0]['detectedObjects']
+        detectedObjects[0]['confidence'] = {'global_confidence': 0.75, 'confidence': 0.5}
+        detectedObjects[1]['confidence'] = {'confidence': 0.5}
+        result = ParseDetectionResults(response)[0]
+        confidences = result.GetConfidences()
+        self.assertEqual(confidences[0], 0.75)
+        self.assertTrue(numpy.isnan(confidences[1]))
+        self.assertEqual(result.GetDetectedObjects()[0].GetConfidence(), 0.75)
+
+        detectedObjects[1]['confidence'] = 'high'
+        with self.assertRaises(VisionControllerClientError) as context:
+            ParseDetectionResults(response)[0].GetConfidences()
+        self.assertEqual(context.exception._type, 'invaliddetectionresult')
+
+    def test_invalidpose(self):
+        response = _MakeResponse()
+        response['detectionResults'][0]['detectedObjects'][1]['translation_'] = [1.0, 2.0]
+        with self.assertRaises(VisionControllerClientError):
+            ParseDetectionResults(response)[0].GetPoses()
+
+    def test_empty(self):
+        self.assertEqual(ParseDetectionResults({}), [])
+        result = ParseDetectionResults({'detectionResults': [{'taskId': 'task1'}]})[0]
+        self.assertEqual(result.GetPoses().shape, (0, 7))
+        self.assertEqual(result.GetDetectedObjects(), [])
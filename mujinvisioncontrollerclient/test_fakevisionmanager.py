@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import json
+import time
+import unittest
+from unittest import mock
+
+import zmq
+
+from mujinvisioncontrollerclient.fakevisionmanager import FakeVisionManager, ParseFakeResultImages
+
+
+class TestFakeVisionManager(unittest.TestCase):
+    def setUp(self):
+        self.ctx = zmq.Context()
+        self.sockets = []
+
+    def tearDown(self):
+        for socket in self.sockets:
+            socket.close(linger=0)
+        self.ctx.term()
+
+    def _Connect(self, server, socketType, name='command'):
+        socket = self.ctx.socket(socketType)
+        socket.connect(server.GetEndpoint(name))
+        self.sockets.append(socket)
+        return socket
+
+    def _Call(self, socket, command):
+        socket.send(json.dumps(command).encode('utf-8'))
+        self.assertTrue(socket.poll(2000))
+        return socket.recv()
+
+    def test_commands(self):
+        with FakeVisionManager(ctx=self.ctx, numDetectedObjects=3, detectionInterval=0.01, numImages=2, imageSize=16) as server:
+            req = self._Connect(server, zmq.REQ)
+            self.assertEqual(json.loads(self._Call(req, {'command': 'StartObjectDetectionTask', 'taskId': 'task1', 'slaverequestid': 'slave1'})), {'taskId': 'task1'})
+            self.assertEqual(json.loads(self._Call(req, {'command': 'GetTaskState', 'taskId': 'task1'}))['taskStatus'], 'Active')
+            header, images = ParseFakeResultImages(self._Call(req, {'command': 'GetLatestDetectionResultImages', 'taskId': 'task1'}))
+            self.assertEqual([(info['sensorName'], len(data)) for info, data in images], [('camera0', 16), ('camera1', 16)])
+            detectionResults = json.loads(self._Call(req, {'command': 'GetLatestDetectedObjects', 'taskId': 'task1'}))['detectionResults']
+            self.assertEqual(len(detectionResults[0]['detectedObjects']), 3)
+            self.assertGreaterEqual(detectionResults[0]['resultTimestampUS'], header['resultTimestampUS'])
+            self.assertIn('error', json.loads(self._Call(req, {'command': 'NoSuchCommand'})))
+            configuration = self._Connect(server, zmq.REQ, 'configuration')
+            self.assertEqual(json.loads(self._Call(configuration, {'command': 'cancel'})), {})
+            self.assertEqual(server.GetCommandCounts()['GetLatestDetectedObjects'], 1)
+
+    def test_invalidcommands(self):
+        with FakeVisionManager(ctx=self.ctx) as server:
+            req = self._Connect(server, zmq.REQ)
+            req.send(b'{"command":')
+            self.assertTrue(req.poll(2000))
+            self.assertEqual(json.loads(req.recv())['error']['type'], 'invalidcommand')
+            for command in ([1, 2], 'Ping', {'command': ['Ping']}):
+                self.assertEqual(json.loads(self._Call(req, command))['error']['type'], 'invalidcommand')
+            # a handler raising gets an error reply and the server keeps serving
+            with mock.patch.dict(server._handlers, {'GetTaskState': mock.Mock(side_effect=RuntimeError('failed'))}):
+                error = json.loads(self._Call(req, {'command': 'GetTaskState', 'taskId': 'task1'}))['error']
+            self.assertEqual(error['type'], 'unknownerror')
+            self.assertIn('failed', error['desc'])
+            self.assertIn('timestamp', json.loads(self._Call(req, {'command': 'Ping'})))
+
+    def test_pipelined(self):
+        # the slow command is sent first and replied last
+        with FakeVisionManager(ctx=self.ctx, transport='inproc', commandLatencies={'GetDetectionHistory': 0.2}, historySize=100) as server:
+            dealer = self._Connect(server, zmq.DEALER)
+            dealer.send_multipart([b'', b'1', json.dumps({'command': 'GetDetectionHistory', 'timestamp': 1}).encode('utf-8')])
+            dealer.send_multipart([b'', b'2', json.dumps({'command': 'Ping'}).encode('utf-8')])
+            replies = []
+            for index in range(2):
+                self.assertTrue(dealer.poll(2000))
+                replies.append(dealer.recv_multipart())
+            self.assertEqual([reply[1] for reply in replies], [b'2', b'1'])
+            self.assertEqual(len(replies[1][2]), 100)
+
+    def test_errorinjection(self):
+        with FakeVisionManager(ctx=self.ctx, transport='ipc', commandErrorRates={'Ping': 1.0}) as server:
+            req = self._Connect(server, zmq.REQ)
+            self.assertEqual(json.loads(self._Call(req, {'command': 'Ping'}))['error']['type'], 'injectederror')
+            self.assertNotIn('error', json.loads(self._Call(req, {'command': 'GetLatestDetectedObjects'})))
+
+    def test_publishedstate(self):
+        with FakeVisionManager(ctx=self.ctx, initialTaskIds=('task1',), detectionInterval=0.01, publishInterval=0.01, numExtraSlaves=2) as server:
+            req = self._Connect(server, zmq.REQ)
+            self._Call(req, {'command': 'Ping', 'slaverequestid': 'slave1'})
+            subscriber = self._Connect(server, zmq.SUB, 'status')
+            subscriber.setsockopt(zmq.SUBSCRIBE, b'')
+            deadline = time.monotonic() + 2.0
+            while time.monotonic() < deadline:
+                self.assertTrue(subscriber.poll(2000))
+                state = json.loads(subscriber.recv())
+                slaveState = state['slavestates'].get('slaverequestid-slave1')
+                if slaveState is not None and slaveState['latestResultTimestampUS'] > 0:
+                    break
+            self.assertEqual(slaveState['runningTaskIds'], ['task1'])
+            self.assertEqual(len(state['slavestates']), 3)
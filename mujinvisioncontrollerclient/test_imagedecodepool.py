@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import threading
+import unittest
+
+import numpy
+
+from mujinvisioncontrollerclient import VisionControllerTimeoutError
+from mujinvisioncontrollerclient.imagedecodepool import ImageDecodePool
+
+
+def _Decode(key, data):
+    return numpy.frombuffer(data, dtype=numpy.uint16).sum()
+
+
+class TestImageDecodePool(unittest.TestCase):
+    def setUp(self):
+        self.arrays = [numpy.full((4, 4), index, dtype=numpy.uint16) for index in range(8)]
+        # the images are slices of one response, as they would be split by the caller
+        response = memoryview(b''.join(array.tobytes() for array in self.arrays))
+        self.images = [('camera%d' % index, response[index * 32:(index + 1) * 32]) for index in range(8)]
+
+    def test_submit(self):
+        with ImageDecodePool(maxWorkers=2) as pool:
+            futures = pool.SubmitImages(({'dtype': 'uint16', 'shape': [4, 4]}, data) for key, data in self.images)
+            for array, future in zip(self.arrays, futures):
+                decoded = future.result(timeout=2.0)
+                numpy.testing.assert_array_equal(decoded, array)
+                # a copy, not a read-only view of the response
+                self.assertTrue(decoded.flags.writeable)
+            # without a dtype the image is taken as encoded, and returned as bytes without opencv
+            self.assertIsInstance(pool.Submit('camera0', self.images[0][1]).result(timeout=2.0), (bytes, numpy.ndarray))
+
+    def test_iterordered(self):
+        with ImageDecodePool(decodefn=_Decode, maxWorkers=3, maxPendingImages=2) as pool:
+            results = list(pool.IterDecodedImages(iter(self.images), ordered=True))
+        self.assertEqual(results, [('camera%d' % index, index * 16) for index in range(8)])
+
+    def test_processes(self):
+        with ImageDecodePool(decodefn=_Decode, maxWorkers=2, useProcesses=True) as pool:
+            results = sorted(decoded for key, decoded in pool.IterDecodedImages(self.images))
+        self.assertEqual(results, [index * 16 for index in range(8)])
+
+    def test_backpressure(self):
+        event = threading.Event()
+
+        def _Block(key, data):
+            event.wait(2.0)
+        with ImageDecodePool(decodefn=_Block, maxWorkers=1, maxPendingImages=2) as pool:
+            futures = pool.SubmitImages(self.images[:2])
+            with self.assertRaises(VisionControllerTimeoutError):
+                pool.Submit(*self.images[2], timeout=0.05)
+            event.set()
+            for future in futures:
+                future.result(timeout=2.0)
+            pool.Submit(*self.images[2], timeout=2.0).result(timeout=2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
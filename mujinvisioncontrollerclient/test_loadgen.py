@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import unittest
+
+import zmq
+
+from mujinvisioncontrollerclient import VisionControllerClientError
+from mujinvisioncontrollerclient.fakevisionmanager import FakeVisionManager
+try:
+    from mujinvisioncontrollerclient.loadgen import LoadGenerator, ParseCommandMix
+except ImportError:
+    LoadGenerator = None
+
+
+@unittest.skipIf(LoadGenerator is None, 'mujinplanningclient is not installed')
+class TestLoadGenerator(unittest.TestCase):
+    def setUp(self):
+        self.ctx = zmq.Context()
+
+    def tearDown(self):
+        self.ctx.destroy(linger=0)
+
+    def test_parsecommandmix(self):
+        self.assertEqual(ParseCommandMix('detectedobjects=4, images=0.5,taskstate,'), {'detectedobjects': 4.0, 'images': 0.5, 'taskstate': 1.0})
+        for mix in ('detectedobjects=1,nosuchoperation=1', 'images=x', 'images=-1', 'images=0,taskstate=0', ''):
+            with self.assertRaises(VisionControllerClientError) as context:
+                ParseCommandMix(mix)
+            self.assertEqual(context.exception._type, 'invalidmix')
+
+    def test_run(self):
+        with FakeVisionManager(ctx=self.ctx, detectionInterval=0.02, imageSize=16, commandErrorRates={'GetTaskState': 1.0}, seed=1) as server:
+            generator = LoadGenerator(commandport=server.commandport, numClients=2, rate=200.0, duration=0.5, mix='detectedobjects=2,images=1,taskstate=1,publishedstate=1', startTasks=True, seed=1, ctx=self.ctx)
+            try:
+                report = generator.Run()
+            finally:
+                generator.Destroy()
+            self.assertEqual(report['numClients'], 2)
+            self.assertEqual(report['targetRate'], 200.0)
+            self.assertGreaterEqual(report['duration'], 0.5)
+            self.assertEqual(sorted(report['operations']), ['detectedobjects', 'images', 'publishedstate', 'taskstate'])
+            operations = report['operations']
+            self.assertEqual(report['numCommands'], sum(operation['count'] for operation in operations.values()))
+            self.assertEqual(report['numErrors'], operations['taskstate']['errors'])
+            self.assertEqual(report['numTimeouts'], 0)
+            # every GetTaskState fails, the errors are counted by type and left out of the latencies
+            self.assertGreater(operations['taskstate']['errors'], 0)
+            self.assertEqual(operations['taskstate']['errorTypes'], {'injectederror': operations['taskstate']['errors']})
+            self.assertEqual(operations['taskstate']['count'], 0)
+            self.assertIsNone(operations['taskstate']['p50US'])
+            for name in ('detectedobjects', 'images', 'publishedstate'):
+                self.assertGreater(operations[name]['count'], 0)
+                self.assertEqual(operations[name]['errors'], 0)
+                self.assertLessEqual(operations[name]['p50US'], operations[name]['p99US'])
+                self.assertLessEqual(operations[name]['p99US'], operations[name]['maxUS'])
+            self.assertGreater(operations['detectedobjects']['count'], operations['images']['count'])
+            self.assertGreater(report['numPublishedStates'], 0)
+            self.assertEqual(server.GetCommandCounts()['StartObjectDetectionTask'], 2)
+            self.assertEqual(server.GetCommandCounts()['StopTask'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import json
+import threading
+import time
+import unittest
+
+import zmq
+
+from mujinvisioncontrollerclient import VisionControllerClientError, VisionControllerTimeoutError
+from mujinvisioncontrollerclient.pipelinedcommandchannel import PipelinedCommandChannel
+
+
+class TestPipelinedCommandChannel(unittest.TestCase):
+    def setUp(self):
+        self.ctx = zmq.Context()
+        self.router = self.ctx.socket(zmq.ROUTER)
+        self.router.setsockopt(zmq.LINGER, 0)
+        self.router.bind('inproc://visionmanager')
+        self.channel = PipelinedCommandChannel(ctx=self.ctx, url='inproc://visionmanager')
+
+    def tearDown(self):
+        self.channel.Destroy()
+        self.router.close()
+        self.ctx.term()
+
+    def _ReceiveRequests(self, count):
+        requests = []
+        for index in range(count):
+            self.assertTrue(self.router.poll(2000))
+            identity, delimiter, requestid, payload = self.router.recv_multipart()
+            self.assertEqual(delimiter, b'')
+            requests.append((identity, requestid, json.loads(payload)))
+        return requests
+
+    def _Reply(self, request, response):
+        identity, requestid, command = request
+        self.router.send_multipart([identity, b'', requestid, json.dumps(response).encode('utf-8')])
+
+    def test_outoforder(self):
+        futures = [self.channel.SendCommandAsync({'command': 'GetTaskState', 'taskId': 'task%d' % index}, timeout=2.0) for index in range(3)]
+        requests = self._ReceiveRequests(3)
+        self.assertEqual(len(set(request[1] for request in requests)), 3)
+        for request in reversed(requests):
+            self._Reply(request, {'taskId': request[2]['taskId']})
+        for index, future in enumerate(futures):
+            self.assertEqual(json.loads(future.result(timeout=2.0)), {'taskId': 'task%d' % index})
+
+    def test_sendcommand(self):
+        results = {}
+
+        def _Send(name):
+            results[name] = self.channel.SendCommand({'command': name}, timeout=2.0)
+        threads = [threading.Thread(target=_Send, args=(name,)) for name in ('GetLatestDetectionResultImages', 'StopTask')]
+        for thread in threads:
+            thread.start()
+        requests = self._ReceiveRequests(2)
+        # the quick command is answered first even though it might have been sent last
+        requests.sort(key=lambda request: request[2]['command'] != 'StopTask')
+        for request in requests:
+            self._Reply(request, {'name': request[2]['command']})
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {'GetLatestDetectionResultImages': {'name': 'GetLatestDetectionResultImages'}, 'StopTask': {'name': 'StopTask'}})
+
+    def test_blockwait(self):
+        self.assertFalse(self.channel.IsWaitingReply())
+        self.channel.SendCommand({'command': 'GetLatestDetectionResultImages'}, blockwait=False, timeout=2.0)
+        self.assertTrue(self.channel.IsWaitingReply())
+        request, = self._ReceiveRequests(1)
+        self.router.send_multipart([request[0], b'', request[1], b'rawimages'])
+        self.assertEqual(self.channel.ReceiveCommand(timeout=2.0, recvjson=False), b'rawimages')
+        self.assertFalse(self.channel.IsWaitingReply())
+
+    def test_zerocopy(self):
+        future = self.channel.SendCommandAsync({'command': 'GetLatestDetectionResultImages'}, timeout=2.0, zerocopy=True)
+        request, = self._ReceiveRequests(1)
+        self.router.send_multipart([request[0], b'', request[1], b'rawimages'])
+        response = future.result(timeout=2.0)
+        self.assertIsInstance(response, memoryview)
+        self.assertEqual(response, b'rawimages')
+
+    def test_timeout(self):
+        slowfuture = self.channel.SendCommandAsync({'command': 'GetLatestDetectionResultImages'}, timeout=0.1)
+        with self.assertRaises(VisionControllerTimeoutError):
+            slowfuture.result(timeout=2.0)
+        # a late reply is dropped and does not disturb the following commands
+        slowrequest, = self._ReceiveRequests(1)
+        self._Reply(slowrequest, {'late': True})
+        future = self.channel.SendCommandAsync({'command': 'Ping'}, timeout=2.0)
+        request, = self._ReceiveRequests(1)
+        self._Reply(request, {})
+        self.assertEqual(json.loads(future.result(timeout=2.0)), {})
+
+    def test_sendcommandtimeout(self):
+        with self.assertRaises(VisionControllerTimeoutError):
+            self.channel.SendCommand({'command': 'Ping'}, timeout=0.1)
+
+    def test_cancel(self):
+        future = self.channel.SendCommandAsync({'command': 'Ping'}, timeout=2.0)
+        self.assertTrue(future.cancel())
+        request, = self._ReceiveRequests(1)
+        self._Reply(request, {})
+        self.assertTrue(future.cancelled())
+
+    def test_destroy(self):
+        future = self.channel.SendCommandAsync({'command': 'Ping'}, timeout=None)
+        self.channel.Destroy()
+        with self.assertRaises(VisionControllerClientError):
+            future.result(timeout=2.0)
+
+    def test_threadstopped(self):
+        future = self.channel.SendCommandAsync({'command': 'Ping'}, timeout=None)
+        # make the I/O thread quit on its own, as if it had died
+        with self.channel._outboundlock:
+            self.channel._outboundsocket.send(b'')
+        with self.assertRaises(VisionControllerClientError):
+            future.result(timeout=2.0)
+        with self.assertRaises(VisionControllerClientError):
+            self.channel.SendCommandAsync({'command': 'Ping'}, timeout=None)
+        # nothing receives the quit message anymore, Destroy must still return right away
+        self.channel._threadtimeout = 1.0
+        starttime = time.monotonic()
+        self.channel.Destroy()
+        self.assertLess(time.monotonic() - starttime, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import json
+import time
+import unittest
+
+import zmq
+
+from mujinvisioncontrollerclient.publishedstatecache import PublishedStateCache, PublishedStateQueue
+
+
+class TestPublishedStateCache(unittest.TestCase):
+    def setUp(self):
+        self.ctx = zmq.Context()
+        self.publisher = self.ctx.socket(zmq.PUB)
+        self.publisher.setsockopt(zmq.LINGER, 0)
+        self.publisher.bind('inproc://status')
+        self.cache = PublishedStateCache('inproc://status', ctx=self.ctx)
+
+    def tearDown(self):
+        self.cache.Destroy()
+        self.publisher.close()
+        self.ctx.term()
+
+    def _PublishUntilReceived(self, state):
+        # subscription takes a moment to be established, so keep publishing
+        for index in range(200):
+            self.publisher.send(json.dumps(state).encode('utf-8'))
+            if self.cache.GetLatestState()[0] == state:
+                return
+            time.sleep(0.01)
+        self.fail('state was never received')
+
+    def test_nostate(self):
+        self.assertEqual(self.cache.GetLatestState(), (None, None))
+        self.assertIsNone(self.cache.GetState(timeout=0.01))
+
+    def test_cachedstate(self):
+        self._PublishUntilReceived({'timestamp': 1})
+        state, receivetime = self.cache.GetLatestState()
+        self.assertLessEqual(receivetime, time.time())
+        starttime = time.monotonic()
+        self.assertEqual(self.cache.GetState(timeout=1.0), {'timestamp': 1})
+        self.assertLess(time.monotonic() - starttime, 0.5)
+
+    def test_maxage(self):
+        self._PublishUntilReceived({'timestamp': 1})
+        time.sleep(0.05)
+        self.assertIsNone(self.cache.GetState(maxAge=0.01, timeout=0.01))
+        self.publisher.send(json.dumps({'timestamp': 2}).encode('utf-8'))
+        self.assertEqual(self.cache.GetState(maxAge=0.01, timeout=1.0), {'timestamp': 2})
+
+    def test_listener(self):
+        states = []
+        self.cache.AddListener(states.append)
+        self._PublishUntilReceived({'timestamp': 1})
+        time.sleep(0.05)
+        self.assertIn({'timestamp': 1}, states)
+        self.cache.RemoveListener(states.append)
+        self.assertEqual(self.cache._listeners, ())
+
+    def test_iterstates(self):
+        self._PublishUntilReceived({'timestamp': 0})
+        iterator = self.cache.IterStates(timeout=1.0, convertfn=lambda state: state if state['timestamp'] % 2 == 1 else None)
+        self.publisher.send(json.dumps({'timestamp': 1}).encode('utf-8'))
+        self.assertEqual(next(iterator), {'timestamp': 1})
+        for timestamp in (2, 3):
+            time.sleep(0.05)
+            self.publisher.send(json.dumps({'timestamp': timestamp}).encode('utf-8'))
+        self.assertEqual(next(iterator), {'timestamp': 3})
+        iterator.close()
+        self.assertEqual(self.cache._listeners, ())
+
+    def test_iterstatestimeout(self):
+        self.assertEqual(list(self.cache.IterStates(timeout=0.05)), [])
+
+
+class TestPublishedStateQueue(unittest.TestCase):
+    def test_dropoldest(self):
+        queue = PublishedStateQueue(maxQueueSize=2)
+        for index in range(3):
+            queue.Put(index)
+        self.assertEqual(queue.Get(timeout=0), (True, 1))
+        self.assertEqual(queue.Get(timeout=0), (True, 2))
+        self.assertEqual(queue.Get(timeout=0), (False, None))
+        self.assertEqual(queue.GetNumDropped(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
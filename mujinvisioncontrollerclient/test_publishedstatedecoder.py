@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import json
+import unittest
+
+from mujinvisioncontrollerclient.publishedstatedecoder import DecodePartialServerState, DecodeSlaveState
+
+
+class TestPublishedStateDecoder(unittest.TestCase):
+    serverState = {
+        'timestamp': 5,
+        'version': '1',
+        'slavestates': {
+            'slaverequestid-a': {'x': 'slaverequestid-b'},
+            'slaverequestid-b': {'tasks': [1, {'y': '}'}]},
+        },
+        'tasks': [{'taskId': 't'}],
+    }
+
+    def test_decodeslavestate(self):
+        for indent in (None, 2):
+            rawServerState = json.dumps(self.serverState, indent=indent).encode('utf-8')
+            self.assertEqual(DecodeSlaveState(rawServerState, 'a'), {'x': 'slaverequestid-b'})
+            self.assertEqual(DecodeSlaveState(rawServerState, 'b'), {'tasks': [1, {'y': '}'}]})
+            self.assertIsNone(DecodeSlaveState(rawServerState, 'c'))
+        self.assertIsNone(DecodeSlaveState(b'{"tasks": []}', 'a'))
+
+    def test_decodeslavestatenesting(self):
+        # keys of nested objects and text inside strings are not members of slavestates
+        rawServerState = json.dumps({
+            'tasks': [{'slavestates': {'slaverequestid-a': 'task'}}],
+            'log': '"slavestates": {"slaverequestid-a": "log"}',
+            'slavestates': {
+                'slaverequestid-b': {'slaverequestid-a': 'nested', 'text': '\\"slaverequestid-a\\": "escaped"'},
+                'slaverequestid-a': {'x': 1},
+            },
+        })
+        self.assertEqual(DecodeSlaveState(rawServerState, 'a'), {'x': 1})
+        self.assertIsNone(DecodeSlaveState(json.dumps({'tasks': {'slavestates': {'slaverequestid-a': 1}}, 'slavestates': {}}), 'a'))
+
+    def test_decodeslavestatesibling(self):
+        # a key of an object after slavestates is at the same depth, but not a member of slavestates
+        serverState = {'slavestates': {'slaverequestid-a': {'x': 1}}, 'other': {'slaverequestid-b': {'WRONG': 1}}}
+        for indent in (None, 2):
+            rawServerState = json.dumps(serverState, indent=indent)
+            self.assertIsNone(DecodeSlaveState(rawServerState, 'b'))
+            self.assertEqual(DecodeSlaveState(rawServerState, 'a'), {'x': 1})
+        self.assertIsNone(DecodeSlaveState(json.dumps({'slavestates': {}, 'other': {'slavestates': {'slaverequestid-a': 1}}}), 'a'))
+        rawServerState = json.dumps({'slavestates': {'slaverequestid-a': [{'t': '"slaverequestid-b": '}]}, 'other': [{'slaverequestid-b': 2}]})
+        self.assertIsNone(DecodeSlaveState(rawServerState, 'b'))
+
+    def test_decodeslavestateescaped(self):
+        # ujson escapes forward slashes
+        rawServerState = b'{"slavestates": {"slaverequestid-cell\\/1": {"x": "a\\/b"}}}'
+        self.assertEqual(DecodeSlaveState(rawServerState, 'cell/1'), {'x': 'a/b'})
+
+    def test_decodeslavestatefallback(self):
+        # a slave state that cannot be decoded selectively is decoded with the whole server state, which raises for invalid json
+        with self.assertRaises(ValueError):
+            DecodeSlaveState(b'{"slavestates": {"slaverequestid-a": {"x": }}}', 'a')
+
+    def test_decodepartialserverstate(self):
+        rawServerState = json.dumps(self.serverState)
+        self.assertEqual(DecodePartialServerState(rawServerState, 'b'), {
+            'timestamp': 5,
+            'slavestates': {'slaverequestid-b': {'tasks': [1, {'y': '}'}]}},
+            'tasks': [{'taskId': 't'}],
+        })
+        self.assertEqual(DecodePartialServerState(rawServerState, 'c', topLevelKeys=['version']), {'version': '1', 'slavestates': {}})
+
+
+if __name__ == "__main__":
+    unittest.main()
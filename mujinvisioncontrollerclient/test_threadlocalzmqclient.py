@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import threading
+import unittest
+
+from mujinvisioncontrollerclient import VisionControllerClientError
+from mujinvisioncontrollerclient.threadlocalzmqclient import ThreadLocalZmqClient
+
+
+class _FakeZmqClient(object):
+    def __init__(self):
+        self.thread = threading.current_thread()
+        self.waiting = None
+        self.isdestroyed = False
+
+    def SendCommand(self, command, blockwait=True, **kwargs):
+        assert threading.current_thread() is self.thread
+        if not blockwait:
+            self.waiting = command
+            return None
+        return command
+
+    def ReceiveCommand(self, **kwargs):
+        assert threading.current_thread() is self.thread
+        command, self.waiting = self.waiting, None
+        return command
+
+    def IsWaitingReply(self):
+        return self.waiting is not None
+
+    def SetDestroy(self):
+        pass
+
+    def Destroy(self):
+        self.isdestroyed = True
+
+
+class TestThreadLocalZmqClient(unittest.TestCase):
+    def setUp(self):
+        self.clients = []
+        self.socket = ThreadLocalZmqClient(self._Create)
+
+    def tearDown(self):
+        self.socket.Destroy()
+
+    def _Create(self):
+        client = _FakeZmqClient()
+        self.clients.append(client)
+        return client
+
+    def _RunOnThread(self, fn):
+        thread = threading.Thread(target=fn)
+        thread.start()
+        thread.join()
+
+    def test_perthread(self):
+        self.assertEqual(self.socket.SendCommand(b'main'), b'main')
+        self.assertEqual(self.socket.SendCommand(b'main'), b'main')
+        self.assertEqual(len(self.clients), 1)
+        barrier = threading.Barrier(3)
+
+        def _Send():
+            barrier.wait()
+            self.socket.SendCommand(b'worker')
+            barrier.wait()
+        threads = [threading.Thread(target=_Send) for index in range(2)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        barrier.wait()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(client.thread for client in self.clients)), 3)
+
+    def test_blockwait(self):
+        self.assertFalse(self.socket.IsWaitingReply())
+        self.socket.SendCommand(b'images', blockwait=False)
+        self.assertTrue(self.socket.IsWaitingReply())
+        # the reply is waited for by the thread that sent the command only
+        self._RunOnThread(lambda: self.assertFalse(self.socket.IsWaitingReply()))
+        self.assertEqual(self.socket.ReceiveCommand(), b'images')
+        self.assertFalse(self.socket.IsWaitingReply())
+
+    def test_receivewithoutsend(self):
+        errors = []
+
+        def _Receive():
+            try:
+                self.socket.ReceiveCommand()
+            except VisionControllerClientError as e:
+                errors.append(e)
+        self._RunOnThread(_Receive)
+        self.assertEqual(len(errors), 1)
+
+    def test_prune(self):
+        self._RunOnThread(lambda: self.socket.SendCommand(b'worker'))
+        self.assertEqual(self.socket.GetNumClients(), 1)
+        # the client of the exited thread is destroyed when the next thread gets its own
+        self.socket.SendCommand(b'main')
+        self.assertEqual(self.socket.GetNumClients(), 1)
+        self.assertTrue(self.clients[0].isdestroyed)
+        self.assertFalse(self.clients[1].isdestroyed)
+
+    def test_destroy(self):
+        self.socket.SendCommand(b'main')
+        self._RunOnThread(lambda: self.socket.SendCommand(b'worker'))
+        self.socket.Destroy()
+        self.assertTrue(all(client.isdestroyed for client in self.clients))
+        self.assertEqual(self.socket.GetNumClients(), 0)
+        errors = []
+
+        def _Send():
+            try:
+                self.socket.SendCommand(b'worker')
+            except VisionControllerClientError as e:
+                errors.append(e)
+        self._RunOnThread(_Send)
+        self.assertEqual(len(errors), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
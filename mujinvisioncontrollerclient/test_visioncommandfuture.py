@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import unittest
+from concurrent.futures import CancelledError, Future
+
+from mujinvisioncontrollerclient import VisionControllerClientError, VisionControllerTimeoutError
+from mujinvisioncontrollerclient.visioncommandfuture import VisionCommandFuture
+
+
+class TestVisionCommandFuture(unittest.TestCase):
+    def test_result(self):
+        calls = []
+
+        def _Process(response):
+            calls.append(response)
+            return response.upper()
+        future = Future()
+        commandfuture = VisionCommandFuture(future, _Process, command={'command': 'Ping'})
+        self.assertFalse(commandfuture.done())
+        future.set_result('pong')
+        self.assertTrue(commandfuture.done())
+        self.assertEqual(commandfuture.result(), 'PONG')
+        self.assertEqual(commandfuture.result(), 'PONG')
+        self.assertEqual(calls, ['pong'])
+
+    def test_error(self):
+        def _Process(response):
+            raise VisionControllerClientError('somedesc', errortype='sometype')
+        future = Future()
+        commandfuture = VisionCommandFuture(future, _Process)
+        future.set_result({'error': {}})
+        with self.assertRaises(VisionControllerClientError):
+            commandfuture.result()
+        self.assertEqual(commandfuture.exception(), VisionControllerClientError('somedesc', errortype='sometype'))
+
+    def test_timeout(self):
+        commandfuture = VisionCommandFuture(Future(), command={'command': 'GetLatestDetectedObjects'})
+        with self.assertRaises(VisionControllerTimeoutError):
+            commandfuture.result(timeout=0.01)
+
+    def test_cancel(self):
+        commandfuture = VisionCommandFuture(Future())
+        callbacks = []
+        commandfuture.add_done_callback(callbacks.append)
+        self.assertTrue(commandfuture.cancel())
+        self.assertTrue(commandfuture.cancelled())
+        self.assertEqual(callbacks, [commandfuture])
+        with self.assertRaises(CancelledError):
+            commandfuture.result()
+
+
+if __name__ == "__main__":
+    unittest.main()
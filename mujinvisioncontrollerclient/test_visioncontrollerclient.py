@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import zmq
+
+from mujinvisioncontrollerclient import VisionControllerClientError, VisionControllerTimeoutError
+from mujinvisioncontrollerclient.detectionhistorycache import DetectionHistoryCache
+from mujinvisioncontrollerclient.fakevisionmanager import FakeVisionManager, ParseFakeResultImages
+from mujinvisioncontrollerclient.imagedecodepool import ImageDecodePool
+from mujinvisioncontrollerclient.visioncommandfuture import VisionCommandFuture
+try:
+    from mujinvisioncontrollerclient.visioncontrollerclient import VisionControllerClient, _WriteResponseToFile
+except ImportError:
+    VisionControllerClient = None
+
+
+@unittest.skipIf(VisionControllerClient is None, 'mujinplanningclient is not installed')
+class TestVisionControllerClient(unittest.TestCase):
+    pipelined = False
+
+    def setUp(self):
+        self.ctx = zmq.Context()
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.Destroy()
+        self.ctx.destroy(linger=0)
+
+    def _CreateClient(self, server, **kwargs):
+        client = VisionControllerClient(commandport=server.commandport, ctx=self.ctx, slaverequestid='slave1', pipelined=self.pipelined, **kwargs)
+        self.clients.append(client)
+        return client
+
+    def _WaitForCommandCount(self, server, commandName, count, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while server.GetCommandCounts().get(commandName, 0) < count and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return server.GetCommandCounts().get(commandName, 0)
+
+    def test_returnfuture(self):
+        with FakeVisionManager(ctx=self.ctx, initialTaskIds=('task1',), commandLatencies={'GetTaskState': 0.1}) as server:
+            client = self._CreateClient(server)
+            futures = [client.GetTaskStateService(taskId='task1', returnfuture=True) for index in range(3)]
+            futures += [client.Ping(returnfuture=True) for index in range(6)]
+            futures.append(client._SendConfiguration({'command': 'cancel'}, returnfuture=True))
+            results = [future.result(timeout=5.0) for future in futures]
+            self.assertEqual([result['taskStatus'] for result in results[:3]], ['Active'] * 3)
+            self.assertTrue(all('timestamp' in result for result in results[3:9]))
+            self.assertEqual(results[9], {})
+            # the blocking commands of the calling thread still work next to the futures
+            self.assertIn('timestamp', client.Ping())
+
+    def test_returnfuturetimeout(self):
+        with FakeVisionManager(ctx=self.ctx, commandLatencies={'Ping': 1.0}) as server:
+            client = self._CreateClient(server)
+            future = client.Ping(timeout=0.1, returnfuture=True)
+            with self.assertRaises(VisionControllerTimeoutError):
+                future.result(timeout=5.0)
+            self.assertIsInstance(future.exception(timeout=5.0), VisionControllerTimeoutError)
+
+    def test_streamdetectionresultimages(self):
+        with FakeVisionManager(ctx=self.ctx, initialTaskIds=('task1',), detectionInterval=0.02, imageSize=16) as server:
+            client = self._CreateClient(server)
+            # the result timestamps come from the published state
+            stream = client.StreamDetectionResultImages(taskId='task1', timeout=5.0)
+            resultTimestampUSs = []
+            for rawImages in stream:
+                self.assertIsInstance(rawImages, memoryview)
+                resultTimestampUSs.append(ParseFakeResultImages(rawImages)[0]['resultTimestampUS'])
+                # the request for the next result is sent before this one is handed out
+                self.assertEqual(self._WaitForCommandCount(server, 'GetLatestDetectionResultImages', len(resultTimestampUSs) + 1), len(resultTimestampUSs) + 1)
+                if len(resultTimestampUSs) == 5:
+                    break
+            self.assertEqual(resultTimestampUSs, sorted(set(resultTimestampUSs)))
+            # closing the stream cancels the request in flight
+            with mock.patch.object(VisionCommandFuture, 'cancel', autospec=True, side_effect=VisionCommandFuture.cancel) as cancel:
+                stream.close()
+            self.assertEqual(cancel.call_count, 1)
+            self.assertGreaterEqual(cancel.call_args[0][0].GetCommand()['newerThanResultTimestampUS'], resultTimestampUSs[-1])
+            self.assertIn('timestamp', client.Ping())
+
+    def test_streamdetectionresultimagestimestampfn(self):
+        with FakeVisionManager(ctx=self.ctx, initialTaskIds=('task1',), detectionInterval=0.02, imageSize=16) as server:
+            client = self._CreateClient(server)
+            timestampfn = mock.Mock(side_effect=lambda rawImages: ParseFakeResultImages(rawImages)[0]['resultTimestampUS'])
+            stream = client.StreamDetectionResultImages(taskId='task1', timeout=5.0, timestampfn=timestampfn, parsefn=bytes)
+            rawImages = [next(stream) for index in range(3)]
+            stream.close()
+            self.assertEqual(timestampfn.call_count, 3)
+            self.assertTrue(all(isinstance(images, bytes) for images in rawImages))
+            self.assertEqual(len(set(rawImages)), 3)
+            # without a result timestamp the stream ends instead of asking for the same images again
+            stream = client.StreamDetectionResultImages(taskId='task1', timeout=5.0, timestampfn=lambda rawImages: None)
+            self.assertEqual(len(list(stream)), 1)
+            self.assertIsNone(client._publishedstatecache)
+
+    def test_streamdetectionresultimagesdecodepool(self):
+        with FakeVisionManager(ctx=self.ctx, initialTaskIds=('task1',), detectionInterval=0.02, numImages=2, imageSize=16) as server:
+            client = self._CreateClient(server)
+            with self.assertRaises(VisionControllerClientError) as context:
+                client.StreamDetectionResultImages(taskId='task1', decodePool=mock.Mock())
+            self.assertEqual(context.exception._type, 'invalidargument')
+            with ImageDecodePool(decodefn=lambda key, data: len(data), maxWorkers=2) as pool:
+                stream = client.StreamDetectionResultImages(taskId='task1', timeout=5.0, parsefn=lambda rawImages: [(info['sensorName'], data) for info, data in ParseFakeResultImages(rawImages)[1]], decodePool=pool)
+                images, futures = next(stream)
+                stream.close()
+            self.assertEqual([key for key, data in images], ['camera0', 'camera1'])
+            self.assertEqual([future.result(timeout=2.0) for future in futures], [16, 16])
+
+    def test_getdetectionhistories(self):
+        consumed = []
+
+        def _Timestamps():
+            for timestamp in range(100, 110):
+                consumed.append(timestamp)
+                yield timestamp
+        with FakeVisionManager(ctx=self.ctx, historySize=1000, commandLatencies={'GetDetectionHistory': 0.02}, latencyJitter=0.02) as server:
+            client = self._CreateClient(server)
+            histories = client.GetDetectionHistories(_Timestamps(), timeout=5.0, maxInFlight=3)
+            timestamp, blob = next(histories)
+            # only the requests of the window were sent, the rest of the timestamps is consumed as the window moves
+            self.assertEqual((timestamp, len(blob)), (100, 1000))
+            self.assertEqual(consumed, [100, 101, 102])
+            self.assertLessEqual(server.GetCommandCounts()['GetDetectionHistory'], 3)
+            results = list(histories)
+            self.assertEqual([timestamp for timestamp, blob in results], list(range(101, 110)))
+            self.assertTrue(all(isinstance(blob, bytes) and len(blob) == 1000 for timestamp, blob in results))
+            self.assertEqual(server.GetCommandCounts()['GetDetectionHistory'], 10)
+
+    def test_getdetectionhistoriescache(self):
+        cache = DetectionHistoryCache()
+        with FakeVisionManager(ctx=self.ctx, historySize=100) as server:
+            client = self._CreateClient(server, detectionHistoryCache=cache)
+            self.assertEqual(len(list(client.GetDetectionHistories([1, 2, 3]))), 3)
+            self.assertEqual(cache.GetStatistics()['numEntries'], 3)
+            # cached timestamps are not requested again
+            results = list(client.GetDetectionHistories([2, 4, 1, 3], zerocopy=True))
+            self.assertEqual([timestamp for timestamp, blob in results], [2, 4, 1, 3])
+            self.assertTrue(all(isinstance(blob, memoryview) and blob.nbytes == 100 for timestamp, blob in results))
+            self.assertEqual(server.GetCommandCounts()['GetDetectionHistory'], 4)
+            self.assertEqual(cache.GetStatistics()['numEntries'], 4)
+
+    def test_getdetectionhistorieserror(self):
+        with FakeVisionManager(ctx=self.ctx, historySize=100, commandErrorRates={'GetDetectionHistory': 1.0}) as server:
+            client = self._CreateClient(server)
+            histories = client.GetDetectionHistories(range(10), maxInFlight=2)
+            with self.assertRaises(VisionControllerClientError) as context:
+                next(histories)
+            self.assertEqual(context.exception._type, 'injectederror')
+            # the error ends the iteration and no more requests are sent
+            self.assertEqual(list(histories), [])
+            self.assertLessEqual(server.GetCommandCounts()['GetDetectionHistory'], 2)
+        with FakeVisionManager(ctx=self.ctx, historySize=100, commandLatencies={'GetDetectionHistory': 1.0}) as server:
+            client = self._CreateClient(server)
+            with self.assertRaises(VisionControllerTimeoutError):
+                list(client.GetDetectionHistories(range(10), timeout=0.1, maxInFlight=2))
+
+    def test_getdetectionhistorytostream(self):
+        stream = io.BytesIO()
+        with FakeVisionManager(ctx=self.ctx, initialTaskIds=('task1',), detectionInterval=0.02, imageSize=16, historySize=100) as server:
+            client = self._CreateClient(server)
+            with mock.patch.object(stream, 'write', wraps=stream.write) as write:
+                self.assertEqual(client.GetDetectionHistoryToStream(1, stream, chunkSize=30), 100)
+            self.assertEqual([len(call[0][0]) for call in write.call_args_list], [30, 30, 30, 10])
+            self.assertEqual(stream.getvalue(), client.GetDetectionHistory(1))
+
+            stream = io.BytesIO()
+            numBytes = client.GetLatestDetectionResultImagesToStream(stream, taskId='task1', timeout=5.0, chunkSize=7)
+            self.assertEqual(numBytes, len(stream.getvalue()))
+            self.assertGreater(ParseFakeResultImages(stream.getvalue())[0]['resultTimestampUS'], 0)
+
+    def test_getdetectionhistorytofile(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        filename = os.path.join(directory, 'history.bin')
+        with FakeVisionManager(ctx=self.ctx, initialTaskIds=('task1',), detectionInterval=0.02, imageSize=16, historySize=100) as server:
+            client = self._CreateClient(server)
+            self.assertEqual(client.GetDetectionHistoryToFile(1, filename, chunkSize=30), 100)
+            with open(filename, 'rb') as f:
+                self.assertEqual(f.read(), client.GetDetectionHistory(1))
+            self.assertEqual(os.listdir(directory), ['history.bin'])
+
+            imagesfilename = os.path.join(directory, 'images.bin')
+            numBytes = client.GetLatestDetectionResultImagesToFile(imagesfilename, taskId='task1', timeout=5.0)
+            self.assertEqual(os.path.getsize(imagesfilename), numBytes)
+            self.assertEqual(sorted(os.listdir(directory)), ['history.bin', 'images.bin'])
+
+        with FakeVisionManager(ctx=self.ctx, historySize=100, commandErrorRates={'GetDetectionHistory': 1.0}) as server:
+            client = self._CreateClient(server)
+            with self.assertRaises(VisionControllerClientError):
+                client.GetDetectionHistoryToFile(1, os.path.join(directory, 'failed.bin'))
+            self.assertEqual(sorted(os.listdir(directory)), ['history.bin', 'images.bin'])
+
+        # a response failing halfway leaves neither the temporary file nor a partial file behind, and keeps the previous file
+        with self.assertRaises(TypeError):
+            _WriteResponseToFile([b'partial', None], filename)
+        with open(filename, 'rb') as f:
+            self.assertEqual(len(f.read()), 100)
+        self.assertEqual(sorted(os.listdir(directory)), ['history.bin', 'images.bin'])
+
+        # threads writing the same file at once never interleave their data
+        responses = [bytes([index]) * 100000 for index in range(8)]
+        errors = []
+        def _Write(response):
+            try:
+                _WriteResponseToFile(response, filename, chunkSize=1000)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=_Write, args=(response,)) for response in responses]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        with open(filename, 'rb') as f:
+            self.assertIn(f.read(), responses)
+        self.assertEqual(sorted(os.listdir(directory)), ['history.bin', 'images.bin'])
+
+    def test_waitfornewdetectedobjects(self):
+        with FakeVisionManager(ctx=self.ctx, initialTaskIds=('task1',), detectionInterval=0.2, publishInterval=10.0) as server:
+            client = self._CreateClient(server)
+            resultTimestampUS = client.WaitForNewDetectedObjects(taskId='task1', timeout=5.0)['detectionResults'][0]['resultTimestampUS']
+            # woken up by the state published with the next result, without polling
+            numCommands = server.GetCommandCounts()['GetLatestDetectedObjects']
+            response = client.WaitForNewDetectedObjects(taskId='task1', newerThanResultTimestampUS=resultTimestampUS, timeout=5.0, pollInterval=None)
+            self.assertGreater(response['detectionResults'][0]['resultTimestampUS'], resultTimestampUS)
+            self.assertLessEqual(server.GetCommandCounts()['GetLatestDetectedObjects'] - numCommands, 3)
+
+            # polled when the published state of the slave does not change
+            resultTimestampUS = response['detectionResults'][0]['resultTimestampUS']
+            numCommands = server.GetCommandCounts()['GetLatestDetectedObjects']
+            with mock.patch.object(client, '_GetSlaveState', return_value=None):
+                response = client.WaitForNewDetectedObjects(taskId='task1', newerThanResultTimestampUS=resultTimestampUS, timeout=5.0, pollInterval=0.02)
+            self.assertGreater(response['detectionResults'][0]['resultTimestampUS'], resultTimestampUS)
+            self.assertGreater(server.GetCommandCounts()['GetLatestDetectedObjects'] - numCommands, 3)
+
+    def test_waitfornewdetectedobjectstimeout(self):
+        with FakeVisionManager(ctx=self.ctx, detectionInterval=0.02) as server:
+            client = self._CreateClient(server)
+            starttime = time.monotonic()
+            with self.assertRaises(VisionControllerTimeoutError):
+                client.WaitForNewDetectedObjects(timeout=0.2, pollInterval=0.05)
+            self.assertLess(time.monotonic() - starttime, 1.0)
+            self.assertGreater(server.GetCommandCounts()['GetLatestDetectedObjects'], 1)
+        # a slow query is cut at the deadline rather than after commandTimeout
+        with FakeVisionManager(ctx=self.ctx, commandLatencies={'GetLatestDetectedObjects': 5.0}) as server:
+            client = self._CreateClient(server)
+            starttime = time.monotonic()
+            with self.assertRaises(VisionControllerTimeoutError):
+                client.WaitForNewDetectedObjects(timeout=0.2, commandTimeout=2.0)
+            self.assertLess(time.monotonic() - starttime, 1.0)
+
+    def _EnableDetectedObjectsCache(self, client):
+        # the slave state appears once the server saw a command of the slave, wait for it so that it does not invalidate the cache
+        client.Ping()
+        client.StartPublishedStateThread()
+        deadline = time.monotonic() + 2.0
+        while client._GetSlaveState(client._publishedstatecache.GetLatestState()[0]) is None and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return client.EnableDetectedObjectsCache()
+
+    def test_detectedobjectscache(self):
+        with FakeVisionManager(ctx=self.ctx, initialTaskIds=('task1',), detectionInterval=60.0, commandLatencies={'GetLatestDetectedObjects': 0.1}) as server:
+            client = self._CreateClient(server)
+            cache = self._EnableDetectedObjectsCache(client)
+            # concurrent callers share one request and one response
+            responses = []
+            threads = [threading.Thread(target=lambda: responses.append(client.GetLatestDetectedObjects(taskId='task1', timeout=5.0))) for index in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(len(responses), 8)
+            self.assertTrue(all(response is responses[0] for response in responses))
+            self.assertEqual(server.GetCommandCounts()['GetLatestDetectedObjects'], 1)
+            self.assertEqual(cache.GetStatistics()['misses'], 1)
+            self.assertIs(client.GetLatestDetectedObjects(taskId='task1'), responses[0])
+
+            # other tasks and other slaves are different requests
+            client.GetLatestDetectedObjects(taskId='task2')
+            client.GetLatestDetectedObjects(taskId='task1', slaverequestid='slave2')
+            client.GetLatestDetectedObjects(taskId='task1', slaverequestid='slave2')
+            self.assertEqual(server.GetCommandCounts()['GetLatestDetectedObjects'], 3)
+
+            # usecache=False and a disabled cache always ask the vision manager
+            self.assertIsNot(client.GetLatestDetectedObjects(taskId='task1', usecache=False), responses[0])
+            self.assertEqual(server.GetCommandCounts()['GetLatestDetectedObjects'], 4)
+            client.DisableDetectedObjectsCache()
+            client.GetLatestDetectedObjects(taskId='task1')
+            client.GetLatestDetectedObjects(taskId='task1')
+            self.assertEqual(server.GetCommandCounts()['GetLatestDetectedObjects'], 6)
+
+    def test_detectedobjectscacheinvalidate(self):
+        with FakeVisionManager(ctx=self.ctx, initialTaskIds=('task1',), detectionInterval=0.3) as server:
+            client = self._CreateClient(server)
+            cache = self._EnableDetectedObjectsCache(client)
+            client.WaitForNewDetectedObjects(taskId='task1', timeout=5.0)
+            response = client.GetLatestDetectedObjects(taskId='task1')
+            self.assertIs(client.GetLatestDetectedObjects(taskId='task1'), response)
+            numCommands = server.GetCommandCounts()['GetLatestDetectedObjects']
+            # the state published with a newer result empties the cache
+            newResponse = response
+            deadline = time.monotonic() + 5.0
+            while newResponse is response and time.monotonic() < deadline:
+                time.sleep(0.01)
+                newResponse = client.GetLatestDetectedObjects(taskId='task1')
+            self.assertIsNot(newResponse, response)
+            self.assertGreater(newResponse['detectionResults'][0]['resultTimestampUS'], response['detectionResults'][0]['resultTimestampUS'])
+            self.assertEqual(server.GetCommandCounts()['GetLatestDetectedObjects'], numCommands + 1)
+            self.assertGreater(cache.GetStatistics()['invalidations'], 0)
+
+
+class TestPipelinedVisionControllerClient(TestVisionControllerClient):
+    pipelined = True
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc.
+
+import threading
+import unittest
+
+import zmq
+
+from mujinvisioncontrollerclient import VisionControllerTimeoutError
+from mujinvisioncontrollerclient.fakevisionmanager import FakeVisionManager
+try:
+    from mujinvisioncontrollerclient.visioncontrollerclientpool import VisionControllerClientPool
+except ImportError:
+    VisionControllerClientPool = None
+
+
+@unittest.skipIf(VisionControllerClientPool is None, 'mujinplanningclient is not installed')
+class TestVisionControllerClientPool(unittest.TestCase):
+    pipelined = False
+
+    def setUp(self):
+        self.ctx = zmq.Context()
+        self.pool = VisionControllerClientPool(ctx=self.ctx, pipelined=self.pipelined, maxWorkers=8)
+
+    def tearDown(self):
+        self.pool.Destroy()
+        self.ctx.destroy(linger=0)
+
+    def test_concurrentfutures(self):
+        with FakeVisionManager(ctx=self.ctx, initialTaskIds=('task1',), latency=0.01, latencyJitter=0.01) as server:
+            clients = [self.pool.GetClient(commandport=server.commandport, slaverequestid='slave%d' % index) for index in range(4)]
+            results = {}
+            errors = []
+
+            def _Run(index, client):
+                try:
+                    futures = []
+                    for iteration in range(10):
+                        futures.append(client.Ping(returnfuture=True))
+                        futures.append(client.GetTaskStateService(taskId='task1', returnfuture=True))
+                    results[index] = [future.result(timeout=5.0) for future in futures]
+                except Exception as e:
+                    errors.append(e)
+            # several threads issue futures on clients sharing the sockets of one vision manager
+            threads = [threading.Thread(target=_Run, args=(index, client)) for index, client in enumerate(clients)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            for index in range(4):
+                self.assertEqual(len(results[index]), 20)
+                self.assertTrue(all('timestamp' in result for result in results[index][0::2]))
+                self.assertEqual([result['taskStatus'] for result in results[index][1::2]], ['Active'] * 10)
+            self.assertEqual(server.GetCommandCounts()['Ping'], 40)
+
+    def test_sharedsockets(self):
+        self.pool.Destroy()
+        self.pool = VisionControllerClientPool(ctx=self.ctx, pipelined=self.pipelined, maxWorkers=8, maxZmqClients=2)
+        with FakeVisionManager(ctx=self.ctx, initialTaskIds=('task1',), latency=0.01, publishInterval=0.02) as server:
+            clients = [self.pool.GetClient(commandport=server.commandport, slaverequestid='slave%d' % index) for index in range(4)]
+            futures = []
+            for client in clients:
+                for iteration in range(4):
+                    futures.append(client.Ping(returnfuture=True))
+                    futures.append(client._SendConfiguration({'command': 'cancel'}, returnfuture=True))
+            for future in futures:
+                future.result(timeout=5.0)
+            # eight executor threads sent the commands, but the number of REQ clients is capped per port
+            endpoint = self.pool._endpoints[('127.0.0.1', server.commandport)]
+            self.assertLessEqual(endpoint.configurationsocket.GetNumClients(), 2)
+            if not self.pipelined:
+                self.assertLessEqual(endpoint.commandsocket.GetNumClients(), 2)
+
+            # all the clients read the published state from one cache
+            self.assertTrue(all(client._publishedstatecache is endpoint.publishedstatecache for client in clients))
+            for index, client in enumerate(clients):
+                self.assertIsNotNone(client.GetPublishedState(timeout=5.0, maxAge=1.0), 'slave%d' % index)
+            # a client stopping the published state thread or removed from the pool leaves the cache running for the others
+            clients[0].StopPublishedStateThread()
+            self.pool.RemoveClient(commandport=server.commandport, slaverequestid='slave1')
+            self.assertFalse(endpoint.publishedstatecache.IsStopping())
+            self.assertIsNotNone(clients[2].GetPublishedState(timeout=5.0, maxAge=0.5))
+
+    def test_fanout(self):
+        with FakeVisionManager(ctx=self.ctx, commandLatencies={'Ping': 1.0}) as slowserver, FakeVisionManager(ctx=self.ctx) as server:
+            for index in range(3):
+                self.pool.GetClient(commandport=server.commandport, slaverequestid='slave%d' % index)
+            self.pool.GetClient(commandport=slowserver.commandport, slaverequestid='slave0')
+            results, errors = self.pool.Ping(timeout=0.2)
+            self.assertEqual(sorted(results), [('127.0.0.1', server.commandport, 'slave%d' % index) for index in range(3)])
+            self.assertEqual(list(errors), [('127.0.0.1', slowserver.commandport, 'slave0')])
+            self.assertIsInstance(errors[('127.0.0.1', slowserver.commandport, 'slave0')], VisionControllerTimeoutError)
+
+
+class TestPipelinedVisionControllerClientPool(TestVisionControllerClientPool):
+    pipelined = True
+
+
+if __name__ == '__main__':
+    unittest.main()
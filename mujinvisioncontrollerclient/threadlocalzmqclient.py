@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# REQ command socket giving every calling thread its own zmqclient.ZmqClient
+
+# system imports
+import threading
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, Optional # noqa: F401 # used in type check
+
+# mujin imports
+from . import VisionControllerClientError
+from . import ugettext as _
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+
+class ThreadLocalZmqClient(object):
+    """Command socket that hands every thread its own zmqclient.ZmqClient.
+
+    ZmqClient is not thread safe: its REQ sockets and the reply it is waiting for belong to the thread using it. Commands issued with returnfuture=True run on the worker threads of an executor, and a VisionControllerClientPool shares the sockets of an endpoint between all its clients, so the same socket object is used from several threads at once. This class keeps one ZmqClient per thread, created by createfn the first time the thread sends a command, and exposes the same SendCommand/ReceiveCommand/IsWaitingReply interface, so it can be used as the command or configuration socket of VisionControllerClient.
+
+    A reply awaited with blockwait=False has to be received by the thread that sent the command, which is how VisionControllerClient uses it anyway.
+    """
+
+    _createfn = None  # type: Optional[Callable[[], Any]] # creates the ZmqClient of a thread
+    _local = None  # type: Optional[threading.local] # holds the ZmqClient of the current thread
+    _clients = None  # type: Optional[Dict[threading.Thread, Any]] # thread -> its ZmqClient, guarded by _lock, so that all of them can be destroyed
+    _lock = None  # type: Optional[threading.Lock]
+    _isdestroying = False  # type: bool
+
+    def __init__(self, createfn):
+        # type: (Callable[[], Any]) -> None
+        """
+        Args:
+            createfn (Callable): Returns a new zmqclient.ZmqClient connected to the endpoint, called once for every thread sending commands.
+        """
+        self._createfn = createfn
+        self._local = threading.local()
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._isdestroying = False
+
+    def _GetClient(self, create=True):
+        # type: (bool) -> Any
+        client = getattr(self._local, 'client', None)
+        if client is not None or not create:
+            return client
+        if self._isdestroying:
+            raise VisionControllerClientError(_('Command socket is destroyed'), errortype='unknownerror')
+        client = self._createfn()
+        with self._lock:
+            # the clients of threads that exited are not used anymore, e.g. after the executor of a VisionControllerClient was shut down
+            for thread in [thread for thread in self._clients if not thread.is_alive()]:
+                self._DestroyClient(self._clients.pop(thread))
+            self._clients[threading.current_thread()] = client
+        self._local.client = client
+        return client
+
+    @staticmethod
+    def _DestroyClient(client):
+        # type: (Any) -> None
+        try:
+            client.Destroy()
+        except Exception as e:
+            log.exception('problem destroying zmq client: %s', e)
+
+    def GetNumClients(self):
+        # type: () -> int
+        """Returns the number of ZmqClients currently held, one per thread that sent a command."""
+        with self._lock:
+            return len(self._clients)
+
+    def SendCommand(self, command, **kwargs):
+        # type: (Any, **Any) -> Any
+        """Sends the command on the ZmqClient of the current thread, see zmqclient.ZmqClient.SendCommand."""
+        return self._GetClient().SendCommand(command, **kwargs)
+
+    def ReceiveCommand(self, **kwargs):
+        # type: (**Any) -> Any
+        """Receives the reply of the last command the current thread sent with blockwait=False, see zmqclient.ZmqClient.ReceiveCommand."""
+        client = self._GetClient(create=False)
+        if client is None:
+            raise VisionControllerClientError(_('No command is waiting for a reply on this thread'), errortype='invalidwait')
+        return client.ReceiveCommand(**kwargs)
+
+    def IsWaitingReply(self):
+        # type: () -> bool
+        """Returns whether the current thread sent a command with blockwait=False and did not receive its reply yet."""
+        client = self._GetClient(create=False)
+        return client is not None and client.IsWaitingReply()
+
+    def SetDestroy(self):
+        # type: () -> None
+        """Makes all current and future waits of all threads abort."""
+        self._isdestroying = True
+        with self._lock:
+            clients = list(self._clients.values())
+        for client in clients:
+            client.SetDestroy()
+
+    def Destroy(self):
+        # type: () -> None
+        self.SetDestroy()
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            self._DestroyClient(client)
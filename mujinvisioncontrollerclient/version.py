@@ -1,3 +1,3 @@
-__version__ = '0.15.1'
+__version__ = '0.16.0'
 
 # Do not forget to update CHANGELOG.md
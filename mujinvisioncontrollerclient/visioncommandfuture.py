@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Handle on a vision command whose reply is collected later
+
+# system imports
+import threading
+from concurrent.futures import CancelledError
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from concurrent.futures import Future # noqa: F401 # used in type check
+    from typing import Any, Callable, Dict, Optional # noqa: F401 # used in type check
+
+# mujin imports
+from . import VisionControllerTimeoutError
+from . import ugettext as _
+
+
+class VisionCommandFuture(object):
+    """Handle on a command that was sent without waiting for its reply.
+
+    Wraps the concurrent.futures.Future of the raw reply and processes the reply (decoding, raising the vision manager error) on the thread that asks for the result, at most once. Method names follow concurrent.futures.Future so that the handle can be used where a future is expected.
+    """
+
+    _future = None  # type: Optional[Future] # resolved with the raw reply
+    _processfn = None  # type: Optional[Callable[[Any], Any]] # converts the raw reply to the result, may raise
+    _command = None  # type: Optional[Dict] # the command that was sent
+    _lock = None  # type: Optional[threading.Lock]
+    _processed = False  # type: bool
+    _result = None  # type: Any
+    _exception = None  # type: Optional[BaseException]
+
+    def __init__(self, future, processfn=None, command=None):
+        # type: (Future, Optional[Callable[[Any], Any]], Optional[Dict]) -> None
+        self._future = future
+        self._processfn = processfn
+        self._command = command
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        # type: () -> str
+        commandName = ''
+        if self._command is not None:
+            commandName = self._command.get('command') or ''
+        return '<%s(%r, done=%r)>' % (self.__class__.__name__, commandName, self.done())
+
+    def GetCommand(self):
+        # type: () -> Optional[Dict]
+        return self._command
+
+    def done(self):
+        # type: () -> bool
+        """Returns True if the reply was received, the command failed or it was cancelled."""
+        return self._future.done()
+
+    def cancel(self):
+        # type: () -> bool
+        """Attempts to cancel the command. Returns False if the reply is already there or the command cannot be cancelled anymore. A command that was already sent is not cancelled on the vision manager, its reply is just dropped."""
+        return self._future.cancel()
+
+    def cancelled(self):
+        # type: () -> bool
+        return self._future.cancelled()
+
+    def result(self, timeout=None):
+        # type: (Optional[float]) -> Any
+        """Waits for the reply and returns the processed result.
+
+        Args:
+            timeout (float, optional): Time in seconds to wait. None means wait until the command itself times out.
+
+        Raises:
+            VisionControllerTimeoutError: if the reply did not come within timeout
+            VisionControllerClientError: if the vision manager returned an error
+            concurrent.futures.CancelledError: if the command was cancelled
+        """
+        try:
+            rawresponse = self._future.result(timeout=timeout)
+        except Exception:
+            if not self._future.done():
+                commandName = ''
+                if self._command is not None:
+                    commandName = self._command.get('command') or ''
+                raise VisionControllerTimeoutError(_('Timed out after %.03f seconds waiting for the result of %s') % (timeout, commandName), errortype='timeout')
+            raise
+        with self._lock:
+            if not self._processed:
+                try:
+                    if self._processfn is not None:
+                        self._result = self._processfn(rawresponse)
+                    else:
+                        self._result = rawresponse
+                except Exception as e:
+                    self._exception = e
+                self._processed = True
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self, timeout=None):
+        # type: (Optional[float]) -> Optional[BaseException]
+        """Waits for the command and returns the error it raised, or None if it succeeded."""
+        try:
+            self.result(timeout=timeout)
+        except CancelledError:
+            raise
+        except VisionControllerTimeoutError as e:
+            if not self._future.done():
+                raise
+            return e
+        except Exception as e:
+            return e
+        return None
+
+    def add_done_callback(self, fn):
+        # type: (Callable[[VisionCommandFuture], None]) -> None
+        """Calls fn with this handle once the command finished. fn is called on the thread that completes the command, so it should only do little work."""
+        self._future.add_done_callback(lambda future: fn(self))
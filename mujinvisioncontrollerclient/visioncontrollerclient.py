@@ -3,22 +3,106 @@
 # Mujin vision controller client for bin picking task
 
 # system imports
+import collections
+import itertools
+import os
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from typing import Any, Callable, Dict, List, Optional, Tuple, Union # noqa: F401 # used in type check
+    from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union # noqa: F401 # used in type check
     import mujinvisiontypes as types
+    from .checkoutzmqclient import CheckoutZmqClient # noqa: F401 # used in type check
+    from .codec import Codec # noqa: F401 # used in type check
+    from .commandhooks import CommandHook # noqa: F401 # used in type check
+    from .detectionhistorycache import DetectionHistoryCache # noqa: F401 # used in type check
 
 # mujin imports
 from mujinplanningclient import zmqclient, zmqsubscriber, TimeoutError
 from . import VisionControllerClientError, VisionControllerTimeoutError
-from . import json
 from . import zmq
 from . import ugettext as _
+from .codec import DecodeResponse, GetCodec
+from .commandhooks import CommandEvent, CallAfterReceive, CallBeforeSend, CallOnError
+from .commandrecorder import CommandRecorder
+from .commandstatistics import CommandStatistics
+from .detectedobjectscache import DetectedObjectsCache
+from .pipelinedcommandchannel import PipelinedCommandChannel
+from .publishedstatecache import PublishedStateCache, PublishedStateQueue
+from .publishedstatedecoder import DecodePartialServerState, DecodeSlaveState
+from .threadlocalzmqclient import ThreadLocalZmqClient
+from .visioncommandfuture import VisionCommandFuture
 
 # logging
 import logging
 log = logging.getLogger(__name__)
 
+def _GetCommandName(command):
+    # type: (Optional[Dict]) -> str
+    if isinstance(command, dict):
+        return command.get('command') or ''
+    return ''
+
+def _GetResponseSize(response):
+    # type: (Any) -> Optional[int]
+    """Returns the size in bytes of a raw response, or of the frames of a multipart response. None if the response is already decoded."""
+    if isinstance(response, list):
+        return sum(len(part) for part in response)
+    if isinstance(response, (bytes, bytearray, str)):
+        return len(response)
+    if isinstance(response, memoryview):
+        return response.nbytes
+    return None
+
+def _GetElapsedUS(starttime):
+    # type: (float) -> int
+    return int((time.perf_counter() - starttime) * 1000000)
+
+def _OnSubmittedCommandDone(future, event, starttime):
+    # type: (Future, CommandEvent, float) -> None
+    """Done callback of the futures of commands sent with returnfuture=True while hooks are registered. Errors of the reply itself are reported by _ProcessResponse when the result is read."""
+    event.waitUS = _GetElapsedUS(starttime)
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        CallOnError(event, error)
+
+def _GetNewestResultTimestampUS(response):
+    # type: (Dict[str, Any]) -> int
+    """Returns the newest resultTimestampUS of the detection results of a GetLatestDetectedObjects response, 0 if there are none."""
+    resultTimestampUS = 0
+    for detectionResult in response.get('detectionResults') or []:
+        resultTimestampUS = max(resultTimestampUS, detectionResult.get('resultTimestampUS') or 0)
+    return resultTimestampUS
+
+def _WriteResponse(response, stream, chunkSize=1024 * 1024):
+    # type: (Any, Any, int) -> int
+    """Writes a raw response, or the frames of a multipart response, to stream in chunks of memoryview slices, so that nothing is copied on the way. Returns the number of bytes written."""
+    numBytes = 0
+    for part in (response if isinstance(response, list) else [response]):
+        view = memoryview(part).cast('B')
+        for offset in range(0, len(view), chunkSize):
+            stream.write(view[offset:offset + chunkSize])
+        numBytes += len(view)
+    return numBytes
+
+def _WriteResponseToFile(response, filename, chunkSize=1024 * 1024):
+    # type: (Any, str, int) -> int
+    """Writes a raw response to a temporary file next to filename, then renames it, so that filename never holds a partial response."""
+    # a unique temporary name, since several threads or processes may write the same filename at once
+    fd, tempfilename = tempfile.mkstemp(prefix=os.path.basename(filename) + '.', suffix='.tmp', dir=os.path.dirname(filename) or '.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            numBytes = _WriteResponse(response, f, chunkSize=chunkSize)
+        os.replace(tempfilename, filename)
+    except Exception:
+        if os.path.exists(tempfilename):
+            os.remove(tempfilename)
+        raise
+    return numBytes
+
 class VisionControllerClient(object):
     """Mujin Vision Controller client for binpicking tasks."""
 
@@ -30,18 +114,33 @@ class VisionControllerClient(object):
     configurationport = None  # type: Optional[int] # configuration port of vision controller, usually command port + 2
     statusport = None  # type: Optional[int] # status publishing port of vision manager, usually command port + 3
 
-    _commandsocket = None  # type: Optional[zmqclient.ZmqClient]
-    _configurationsocket = None  # type: Optional[zmqclient.ZmqClient]
+    _commandsocket = None  # type: Optional[Union[ThreadLocalZmqClient, CheckoutZmqClient, PipelinedCommandChannel]]
+    _configurationsocket = None  # type: Optional[Union[ThreadLocalZmqClient, CheckoutZmqClient]]
+    _ownsockets = True  # type: bool # if False, the command and configuration sockets are shared with other clients and not destroyed by this client
     
     _callerid = None # the callerid to send to vision
     _checkpreemptfn = None # called periodically when in a loop
     
     _subscriber = None # an instance of ZmqSubscriber, used for subscribing to the state
+    _publishedstatecache = None  # type: Optional[PublishedStateCache] # set when the published state is received in the background
+    _sharedpublishedstatecache = None  # type: Optional[PublishedStateCache] # if set, the published state cache shared with other clients, not destroyed by this client
+    _publishedstatecallbacks = None  # type: Optional[Dict[Callable, Callable]] # user callback -> listener registered on _publishedstatecache
     _slaverequestid = None # slave request id used when calling vision manager master to route to the correct vision manager slave
     _deprecated = None # used to mark arguments as deprecated (set argument default value to this)
+    _executor = None  # type: Optional[ThreadPoolExecutor] # runs the commands issued with returnfuture=True on REQ sockets, created lazily
+    _executorown = None  # type: Optional[ThreadPoolExecutor] # set if the executor was created by this client and has to be shut down
+    _codec = None  # type: Optional[Codec] # encodes commands and decodes responses and published states
+    _detectionhistorycache = None  # type: Optional[DetectionHistoryCache] # serves repeated GetDetectionHistory calls, if set
+    _detectedobjectscache = None  # type: Optional[DetectedObjectsCache] # serves repeated GetLatestDetectedObjects calls, set by EnableDetectedObjectsCache
+    _detectedobjectscachelistener = None  # type: Optional[Callable] # listener registered on _publishedstatecache invalidating _detectedobjectscache
+    _commandhooks = ()  # type: Tuple[CommandHook, ...] # replaced and never modified, so that a command uses the hooks registered when it was sent
+    _statistics = None  # type: Optional[CommandStatistics] # command hook set when created with collectStatistics=True
+    _recorder = None  # type: Optional[CommandRecorder] # command hook set by StartRecording
+    _waitingcommand = None  # type: Optional[Dict] # last command sent with blockwait=False, used to name it in _WaitForResponse
+    _waitingevent = None  # type: Optional[CommandEvent] # event of _waitingcommand, if hooks were registered when it was sent
         
-    def __init__(self, hostname='127.0.0.1', commandport=7004, ctx=None, checkpreemptfn=None, reconnectionTimeout=40, callerid=None, slaverequestid=None):
-        # type: (str, int, Optional[zmq.Context], Optional[Callable], float, Optional[str], Optional[str]) -> None
+    def __init__(self, hostname='127.0.0.1', commandport=7004, ctx=None, checkpreemptfn=None, reconnectionTimeout=40, callerid=None, slaverequestid=None, pipelined=False, commandsocket=None, configurationsocket=None, executor=None, codec=None, detectionHistoryCache=None, collectStatistics=False, publishedstatecache=None):
+        # type: (str, int, Optional[zmq.Context], Optional[Callable], float, Optional[str], Optional[str], bool, Optional[Union[ThreadLocalZmqClient, CheckoutZmqClient, PipelinedCommandChannel]], Optional[Union[ThreadLocalZmqClient, CheckoutZmqClient]], Optional[ThreadPoolExecutor], Optional[Union[str, Codec]], Optional[DetectionHistoryCache], bool, Optional[PublishedStateCache]) -> None
         """Connects to vision server, initializes vision server, and sets up parameters
         Args:
             hostname (str, optional): e.g. visioncontroller1
@@ -51,6 +150,14 @@ class VisionControllerClient(object):
             reconnectionTimeout (float, optional): Sets the "timeout" parameter of the ZmqSocketPool instance
             callerid (str, optional): The callerid to send to vision.
             slaverequestid (str, optional): slave request id used when calling vision manager master to route to the correct vision manager slave
+            pipelined (bool, optional): If True, commands are sent through a PipelinedCommandChannel, so that several commands can be outstanding on the command port and replies are matched by request id. The vision manager has to support the request id framing. (Default: False)
+            commandsocket (ThreadLocalZmqClient, CheckoutZmqClient or PipelinedCommandChannel, optional): Command socket shared with other clients connected to the same vision manager. Has to be given together with configurationsocket. Shared sockets are not destroyed by the client, and have to be safe to use from several threads, so a plain zmqclient.ZmqClient cannot be shared.
+            configurationsocket (ThreadLocalZmqClient or CheckoutZmqClient, optional): Configuration socket shared with other clients connected to the same vision manager.
+            executor (ThreadPoolExecutor, optional): Thread pool running the commands issued with returnfuture=True on REQ sockets. If not given, the client creates its own when first needed.
+            codec (str or Codec, optional): Codec of the commands, responses and published states, e.g. 'orjson'. Commands are encoded to bytes by the client and responses are decoded from the received bytes, so the sockets never see python objects. See codec.GetCodec. (Default: the json module picked by the package)
+            detectionHistoryCache (DetectionHistoryCache, optional): If given, GetDetectionHistory returns the blobs found in it without asking the vision manager, and adds the received blobs to it. The cache is not destroyed by the client.
+            collectStatistics (bool, optional): If True, timings and sizes of the commands are collected, see GetStatistics. (Default: False)
+            publishedstatecache (PublishedStateCache, optional): Published state cache shared with other clients connected to the same vision manager. The published state is then always read from it, as if StartPublishedStateThread had been called, and the client never opens its own subscriber. The cache is not destroyed by the client.
         """
         self.hostname = hostname
         self.commandport = commandport
@@ -59,6 +166,11 @@ class VisionControllerClient(object):
         self._callerid = callerid
         self._checkpreemptfn = checkpreemptfn
         self._slaverequestid = slaverequestid
+        self._codec = GetCodec(codec)
+        self._detectionhistorycache = detectionHistoryCache
+        if collectStatistics:
+            self._statistics = CommandStatistics()
+            self.AddCommandHook(self._statistics)
         
         if ctx is None:
             self._ctxown = zmq.Context()
@@ -67,8 +179,22 @@ class VisionControllerClient(object):
         else:
             self._ctx = ctx
 
-        self._commandsocket = zmqclient.ZmqClient(self.hostname, commandport, ctx=self._ctx, limit=3, checkpreemptfn=checkpreemptfn, reusetimeout=reconnectionTimeout)
-        self._configurationsocket = zmqclient.ZmqClient(self.hostname, self.configurationport, ctx=self._ctx, limit=3, checkpreemptfn=checkpreemptfn, reusetimeout=reconnectionTimeout)
+        self._executor = executor
+        self._sharedpublishedstatecache = publishedstatecache
+        self._publishedstatecache = publishedstatecache
+
+        if commandsocket is not None:
+            assert configurationsocket is not None
+            self._ownsockets = False
+            self._commandsocket = commandsocket
+            self._configurationsocket = configurationsocket
+        else:
+            if pipelined:
+                self._commandsocket = PipelinedCommandChannel(self.hostname, commandport, ctx=self._ctx, checkpreemptfn=checkpreemptfn)
+            else:
+                # commands sent with returnfuture=True run on the executor threads, and ZmqClient must not be used by several threads at once
+                self._commandsocket = ThreadLocalZmqClient(lambda: zmqclient.ZmqClient(self.hostname, commandport, ctx=self._ctx, limit=3, checkpreemptfn=checkpreemptfn, reusetimeout=reconnectionTimeout))
+            self._configurationsocket = ThreadLocalZmqClient(lambda: zmqclient.ZmqClient(self.hostname, self.configurationport, ctx=self._ctx, limit=3, checkpreemptfn=checkpreemptfn, reusetimeout=reconnectionTimeout))
 
     def __del__(self):
         self.Destroy()
@@ -77,6 +203,15 @@ class VisionControllerClient(object):
         # type: () -> None
         self.SetDestroy()
 
+        if self._executorown is not None:
+            self._executorown.shutdown(wait=False)
+            self._executorown = None
+        self._executor = None
+
+        if not self._ownsockets:
+            self._commandsocket = None
+            self._configurationsocket = None
+
         if self._commandsocket is not None:
             try:
                 self._commandsocket.Destroy()
@@ -94,6 +229,11 @@ class VisionControllerClient(object):
         if self._subscriber is not None:
             self._subscriber.Destroy()
             self._subscriber = None
+
+        self.StopRecording()
+        self.StopPublishedStateThread()
+        self._publishedstatecache = None
+        self._sharedpublishedstatecache = None
         
         if self._ctxown is not None:
             try:
@@ -106,6 +246,8 @@ class VisionControllerClient(object):
 
     def SetDestroy(self):
         # type: () -> None
+        if not self._ownsockets:
+            return
         if self._commandsocket is not None:
             self._commandsocket.SetDestroy()
         if self._configurationsocket is not None:
@@ -113,8 +255,91 @@ class VisionControllerClient(object):
     
     def GetSlaveRequestId(self):
         return self._slaverequestid
-    
-    def _ExecuteCommand(self, command, fireandforget=False, timeout=2.0, recvjson=True, checkpreempt=True, blockwait=True, slaverequestid=None):
+
+    def AddCommandHook(self, hook):
+        # type: (CommandHook) -> None
+        """Registers a hook called around every command, configuration command and GetPublishedServerState, e.g. to trace them. See commandhooks.CommandHook.
+
+        When no hook is registered, commands are not timed at all.
+        """
+        if hook not in self._commandhooks:
+            self._commandhooks = self._commandhooks + (hook,)
+
+    def RemoveCommandHook(self, hook):
+        # type: (CommandHook) -> None
+        """Unregisters a hook registered with AddCommandHook. Commands already sent still call it."""
+        self._commandhooks = tuple(registeredHook for registeredHook in self._commandhooks if registeredHook is not hook)
+
+    def _StartCommandEvent(self, command, channel, commandName=None):
+        # type: (Optional[Dict], str, Optional[str]) -> Optional[CommandEvent]
+        """Returns the event passed to the hooks, or None if there are none."""
+        hooks = self._commandhooks
+        if not hooks:
+            return None
+        return CommandEvent(hooks, commandName or _GetCommandName(command), channel, command=command)
+
+    def GetStatistics(self):
+        # type: () -> Dict[str, Dict[str, Dict[str, Any]]]
+        """Returns histograms of the timings and message sizes of the commands sent since the client was created or ResetStatistics was called, per command name. Empty unless the client was created with collectStatistics=True.
+
+        Timings are in microseconds:
+
+        - encodeUS: encoding the command.
+        - sendUS: sending the command, for fireandforget commands and commands sent with blockwait=False.
+        - waitUS: waiting for the reply. For blocking commands it includes sending the command, which the sockets do in the same call. For commands sent with returnfuture=True it is measured from submitting the command.
+        - decodeUS: decoding the reply and checking it for errors.
+
+        Sizes are in bytes: requestBytes and responseBytes.
+
+        Returns:
+            dict: {command name: {key: histogram}}, each histogram being a dict with count, sum, min, max, mean, p50, p90, p99 and buckets. See commandstatistics.Log2Histogram.
+        """
+        if self._statistics is None:
+            return {}
+        return self._statistics.GetStatistics()
+
+    def ResetStatistics(self):
+        # type: () -> None
+        if self._statistics is not None:
+            self._statistics.Reset()
+
+    def StartRecording(self, filename, blobThreshold=64 * 1024):
+        # type: (str, int) -> CommandRecorder
+        """Appends every command sent from now on, with its response and timings, to the recording filename, as well as the published states received by the published state thread. See commandrecorder.
+
+        Args:
+            filename (str): The recording. Raw data responses and replies larger than blobThreshold go to the sidecar file commandrecorder.GetBlobFilename(filename).
+            blobThreshold (int, optional): Size in bytes above which replies go to the sidecar. (Default: 64 KiB)
+
+        Returns:
+            CommandRecorder: The recorder, e.g. to flush it.
+        """
+        self.StopRecording()
+        recorder = CommandRecorder(filename, codec=self._codec, blobThreshold=blobThreshold, metadata={
+            'hostname': self.hostname,
+            'commandport': self.commandport,
+            'callerid': self._callerid,
+            'slaverequestid': self._slaverequestid,
+        })
+        self._recorder = recorder
+        self.AddCommandHook(recorder)
+        if self._publishedstatecache is not None:
+            self._publishedstatecache.AddListener(recorder.RecordPublishedState)
+        return recorder
+
+    def StopRecording(self):
+        # type: () -> None
+        """Stops the recording started by StartRecording and closes its files. Commands still waiting for their replies are not recorded."""
+        recorder = self._recorder
+        if recorder is None:
+            return
+        self._recorder = None
+        self.RemoveCommandHook(recorder)
+        if self._publishedstatecache is not None:
+            self._publishedstatecache.RemoveListener(recorder.RecordPublishedState)
+        recorder.Close()
+
+    def _ExecuteCommand(self, command, fireandforget=False, timeout=2.0, recvjson=True, checkpreempt=True, blockwait=True, slaverequestid=None, returnfuture=False, zerocopy=False):
         """Executes given command.
 
         Args:
@@ -124,6 +349,8 @@ class VisionControllerClient(object):
             recvjson (bool, optional): If True, a json is received.
             checkpreempt (bool, optional): If a preempt function should be checked during execution.
             blockwait (bool, optional): If True, will block and wait until function is done. Otherwise user will have to call _ProcessResponse on their own. (Default: True)
+            returnfuture (bool, optional): If True, returns a VisionCommandFuture right away. Takes precedence over blockwait. (Default: False)
+            zerocopy (bool, optional): Only used when recvjson is False. If True, the raw response is returned as a memoryview. On a pipelined command socket it is a view of the received zmq frame, so the response is never copied. (Default: False)
         """
         assert self._commandsocket is not None
         if self._callerid:
@@ -132,61 +359,141 @@ class VisionControllerClient(object):
             slaverequestid = self._slaverequestid
         if slaverequestid is not None:
             command['slaverequestid'] = slaverequestid
-        response = self._commandsocket.SendCommand(command, fireandforget=fireandforget, timeout=timeout, recvjson=recvjson, checkpreempt=checkpreempt, blockwait=blockwait)
+        event = self._StartCommandEvent(command, 'command')
+        payload = self._EncodeCommand(command, event)
+        if returnfuture and not fireandforget:
+            return self._SubmitCommand(self._commandsocket, command, payload, timeout=timeout, recvjson=recvjson, checkpreempt=checkpreempt, zerocopy=zerocopy, event=event)
+        if event is not None:
+            starttime = time.perf_counter()
+        try:
+            if zerocopy and isinstance(self._commandsocket, PipelinedCommandChannel):
+                response = self._commandsocket.SendCommand(payload, fireandforget=fireandforget, timeout=timeout, sendjson=False, recvjson=False, checkpreempt=checkpreempt, blockwait=blockwait, zerocopy=True)
+            else:
+                response = self._commandsocket.SendCommand(payload, fireandforget=fireandforget, timeout=timeout, sendjson=False, recvjson=False, checkpreempt=checkpreempt, blockwait=blockwait)
+        except Exception as e:
+            if event is not None:
+                CallOnError(event, e)
+            raise
         if blockwait and not fireandforget:
-            return self._ProcessResponse(response, command=command, recvjson=recvjson)
+            if event is not None:
+                # the socket sends and waits in one call, so sending is part of waitUS
+                event.waitUS = _GetElapsedUS(starttime)
+            return self._ProcessResponse(response, command=command, recvjson=recvjson, zerocopy=zerocopy, event=event)
+        if event is not None:
+            event.sendUS = _GetElapsedUS(starttime)
+            if fireandforget:
+                CallAfterReceive(event)
+        if not fireandforget:
+            self._waitingcommand = command
+            self._waitingevent = event
         return response
 
-    def _ProcessResponse(self, response, command=None, recvjson=True):
-        # type: (Any, Optional[Dict], bool) -> Any
-
-        def _HandleError(response):
-            # type: (Dict) -> None
-            if isinstance(response['error'], dict):  # until vision manager error handling is resolved
-                raise VisionControllerClientError(response['error'].get('desc', ''), errortype=response['error'].get('type', ''))
-            else:
-                raise VisionControllerClientError(_('Got unknown error from vision manager: %r') % response['error'], errortype='unknownerror')
-        if recvjson:
-            if 'error' in response:
-                _HandleError(response)
+    def _EncodeCommand(self, command, event=None):
+        # type: (Dict, Optional[CommandEvent]) -> bytes
+        if event is None:
+            return self._codec.Encode(command)
+        starttime = time.perf_counter()
+        payload = self._codec.Encode(command)
+        event.encodeUS = _GetElapsedUS(starttime)
+        event.requestBytes = len(payload)
+        CallBeforeSend(event)
+        return payload
+
+    def _SubmitCommand(self, socket, command, payload, timeout=2.0, recvjson=True, checkpreempt=True, zerocopy=False, event=None):
+        # type: (Union[ThreadLocalZmqClient, PipelinedCommandChannel], Dict, bytes, Optional[float], bool, bool, bool, Optional[CommandEvent]) -> VisionCommandFuture
+        """Sends the encoded command without waiting for its reply.
+
+        On a PipelinedCommandChannel the command is sent right away. On REQ sockets it is run by a small thread pool, every worker thread sending on its own ZmqClient, so it might wait for a free worker before being sent, and it can only be cancelled until then.
+        """
+        def processfn(response):
+            return self._ProcessResponse(response, command=command, recvjson=recvjson, zerocopy=zerocopy, event=event)
+        if event is not None:
+            starttime = time.perf_counter()
+        if isinstance(socket, PipelinedCommandChannel):
+            future = socket.SendCommandAsync(payload, timeout=timeout, sendjson=False, zerocopy=zerocopy and not recvjson)
         else:
-            if len(response) > 0 and response[0] == '{' and response[-1] == '}':
-                response = json.loads(response)
-                if 'error' in response:
-                    _HandleError(response)
-            if len(response) == 0:
-                raise VisionControllerClientError(_('Vision command %(command)s failed with empty response %(response)r') % {'command': command, 'response': response}, errortype='emptyresponseerror')
+            if self._executor is None:
+                self._executorown = ThreadPoolExecutor(max_workers=3, thread_name_prefix='VisionControllerClient')
+                self._executor = self._executorown
+            future = self._executor.submit(self._SendSubmittedCommand, socket, command, payload, timeout=timeout, checkpreempt=checkpreempt)
+        if event is not None:
+            # waitUS covers the time from submitting until the reply is received, including the time spent queued
+            future.add_done_callback(lambda future: _OnSubmittedCommandDone(future, event, starttime))
+        return VisionCommandFuture(future, processfn, command=command)
+
+    def _SendSubmittedCommand(self, socket, command, payload, timeout=2.0, checkpreempt=True):
+        # type: (ThreadLocalZmqClient, Dict, bytes, Optional[float], bool) -> Any
+        """Sends a command submitted with returnfuture=True and waits for its raw reply, on a thread of the executor. The timeout of the REQ socket is converted like in _WaitForResponse, so that the future raises VisionControllerTimeoutError."""
+        try:
+            return socket.SendCommand(payload, timeout=timeout, sendjson=False, recvjson=False, checkpreempt=checkpreempt)
+        except TimeoutError as e:
+            port = self.configurationport if socket is self._configurationsocket else self.commandport
+            raise VisionControllerTimeoutError(_('Timed out after %.03f seconds to get response message %s from %s:%d: %s') % (timeout, _GetCommandName(command), self.hostname, port, e), errortype='timeout')
+
+    def _ProcessResponse(self, response, command=None, recvjson=True, zerocopy=False, event=None):
+        # type: (Any, Optional[Dict], bool, bool, Optional[CommandEvent]) -> Any
+        if event is None:
+            return DecodeResponse(self._codec, response, command=command, recvjson=recvjson, zerocopy=zerocopy)
+        starttime = time.perf_counter()
+        event.response = response
+        event.responseBytes = _GetResponseSize(response)
+        event.recvjson = recvjson
+        try:
+            response = DecodeResponse(self._codec, response, command=command, recvjson=recvjson, zerocopy=zerocopy)
+        except Exception as e:
+            event.decodeUS = _GetElapsedUS(starttime)
+            CallOnError(event, e)
+            raise
+        event.decodeUS = _GetElapsedUS(starttime)
+        CallAfterReceive(event)
         return response
 
-    def _WaitForResponse(self, recvjson=True, timeout=None, command=None):
-        # type: (bool, Optional[float], Optional[Dict]) -> Dict
+    def _WaitForResponse(self, recvjson=True, timeout=None, command=None, zerocopy=False):
+        # type: (bool, Optional[float], Optional[Dict], bool) -> Dict
         """Waits for a response for a command sent on the RPC socket.
 
         Args:
             recvjson (bool, optional): If the response is json, should be the same value with `recvjson` of `SendAndReceive`. (Default: True)
             timeout (float, optional): (Default: None)
             command (dict, optional): Command sent to sensorbridge (Default: None)
+            zerocopy (bool, optional): If True, a raw response is returned as a memoryview. (Default: False)
 
         Raises:
             VisionControllerClientError
         """
         assert self._commandsocket is not None
-        commandName = ''
-        if command is not None and isinstance(command, dict):
-            commandName = command.get('command') or ''
+        event = None
+        if command is None or command is self._waitingcommand:
+            command = self._waitingcommand
+            event = self._waitingevent
+        commandName = _GetCommandName(command)
 
         if not self._commandsocket.IsWaitingReply():
             raise VisionControllerClientError(_('Waiting on command "%(commandName)s" when wait signal is not on') % {
                 'commandName': commandName,
             }, errortype='invalidwait')
 
+        if event is not None:
+            starttime = time.perf_counter()
         try:
-            response = self._commandsocket.ReceiveCommand(timeout=timeout, recvjson=recvjson)
-        except TimeoutError as e:
-            raise VisionControllerTimeoutError(_('Timed out after %.03f seconds to get response message %s from %s:%d: %s') % (timeout, commandName, self.hostname, self.commandport, e), errortype='timeout')
-        except Exception as e:
-            raise VisionControllerClientError(_('Problem receiving response from the last vision manager async call %s: %s') % (commandName, e), errortype='unknownerror')
-        return self._ProcessResponse(response, command=command, recvjson=recvjson)
+            try:
+                response = self._commandsocket.ReceiveCommand(timeout=timeout, recvjson=False)
+            except VisionControllerClientError:
+                raise
+            except TimeoutError as e:
+                raise VisionControllerTimeoutError(_('Timed out after %.03f seconds to get response message %s from %s:%d: %s') % (timeout, commandName, self.hostname, self.commandport, e), errortype='timeout')
+            except Exception as e:
+                raise VisionControllerClientError(_('Problem receiving response from the last vision manager async call %s: %s') % (commandName, e), errortype='unknownerror')
+        except VisionControllerClientError as e:
+            if event is not None:
+                event.waitUS = _GetElapsedUS(starttime)
+                CallOnError(event, e)
+            raise
+        if event is not None:
+            event.waitUS = _GetElapsedUS(starttime)
+        self._waitingcommand = None
+        self._waitingevent = None
+        return self._ProcessResponse(response, command=command, recvjson=recvjson, zerocopy=zerocopy, event=event)
 
     def IsWaitingResponse(self):
         # type: () -> bool
@@ -195,17 +502,18 @@ class VisionControllerClient(object):
         assert self._commandsocket is not None
         return self._commandsocket.IsWaitingReply()
 
-    def WaitForGetLatestDetectionResultImages(self, timeout=2.0):
-        # type: (float) -> Dict
+    def WaitForGetLatestDetectionResultImages(self, timeout=2.0, zerocopy=False):
+        # type: (float, bool) -> Any
         """Waits for response to GetLatestDetectionResultImages command
 
         Args:
             timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            zerocopy (bool, optional): Should be the same value as given to GetLatestDetectionResultImages. (Default: False)
         """
-        return self._WaitForResponse(recvjson=False, timeout=timeout)
+        return self._WaitForResponse(recvjson=False, timeout=timeout, zerocopy=zerocopy)
 
-    def _SendConfiguration(self, configuration, fireandforget=False, timeout=2.0, checkpreempt=True, recvjson=True, slaverequestid=None):
-        # type: (Dict, bool, float, bool, bool, str) -> Any
+    def _SendConfiguration(self, configuration, fireandforget=False, timeout=2.0, checkpreempt=True, recvjson=True, slaverequestid=None, returnfuture=False):
+        # type: (Dict, bool, float, bool, bool, str, bool) -> Any
         """Sends a configuration command.
 
         Args:
@@ -215,6 +523,7 @@ class VisionControllerClient(object):
             checkpreempt (bool, optional): If a preempt function should be checked during execution.
             recvjson (bool, optional): If True, a json is received.
             slaverequestid (str, optional): id of slave to be configured
+            returnfuture (bool, optional): If True, returns a VisionCommandFuture right away. (Default: False)
         """
         assert self._configurationsocket is not None
         if self._callerid:
@@ -223,10 +532,26 @@ class VisionControllerClient(object):
             slaverequestid = self._slaverequestid
         if slaverequestid is not None:
             configuration['slaverequestid'] = slaverequestid
-        response = self._configurationsocket.SendCommand(configuration, fireandforget=fireandforget, timeout=timeout, checkpreempt=checkpreempt)
-        if not fireandforget:
-            return self._ProcessResponse(response, command=configuration, recvjson=recvjson)
-        return response
+        event = self._StartCommandEvent(configuration, 'configuration')
+        payload = self._EncodeCommand(configuration, event)
+        if returnfuture and not fireandforget:
+            return self._SubmitCommand(self._configurationsocket, configuration, payload, timeout=timeout, recvjson=recvjson, checkpreempt=checkpreempt, event=event)
+        if event is not None:
+            starttime = time.perf_counter()
+        try:
+            response = self._configurationsocket.SendCommand(payload, fireandforget=fireandforget, timeout=timeout, sendjson=False, recvjson=False, checkpreempt=checkpreempt)
+        except Exception as e:
+            if event is not None:
+                CallOnError(event, e)
+            raise
+        if fireandforget:
+            if event is not None:
+                event.sendUS = _GetElapsedUS(starttime)
+                CallAfterReceive(event)
+            return response
+        if event is not None:
+            event.waitUS = _GetElapsedUS(starttime)
+        return self._ProcessResponse(response, command=configuration, recvjson=recvjson, event=event)
     
     def TerminateSlaves(self, slaverequestids, timeout=None, fireandforget=None, checkpreempt=True):
         # type: (List[str], Optional[float], Optional[bool], Optional[bool]) -> Any
@@ -256,8 +581,8 @@ class VisionControllerClient(object):
     # Commands
     #
 
-    def StartObjectDetectionTask(self, taskId=None, systemState=None, visionTaskParameters=None, timeout=2.0, **ignoredArgs):
-        # type: (Optional[str], Optional[types.SystemState], Optional[types.visionTaskObjectDetectionParametersSchema], float, Any) -> Optional[Dict[str, str]]
+    def StartObjectDetectionTask(self, taskId=None, systemState=None, visionTaskParameters=None, timeout=2.0, returnfuture=False, **ignoredArgs):
+        # type: (Optional[str], Optional[types.SystemState], Optional[types.visionTaskObjectDetectionParametersSchema], float, bool, Any) -> Optional[Dict[str, str]]
         """Starts detection thread to continuously detect objects. the vision server will send detection results directly to mujin controller.
 
         Args:
@@ -265,6 +590,7 @@ class VisionControllerClient(object):
             systemState (types.SystemState, optional): The state of the system. Used to select the profile that the vision task will use. See "Profile Selection" documentation for more details.
             visionTaskParameters (types.visionTaskObjectDetectionParametersSchema, optional): Parameters for the object detection task. These take precedence over the base profile selected via the system state, but are overwritten by the overwrite profile.
             timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            returnfuture (bool, optional): If True, returns a VisionCommandFuture of the result right away instead of waiting for it. (Default: False)
 
         Returns:
             dict: Returns immediately once the call completes
@@ -283,10 +609,10 @@ class VisionControllerClient(object):
             command['systemState'] = systemState
         if visionTaskParameters is not None:
             command['visionTaskParameters'] = visionTaskParameters
-        return self._ExecuteCommand(command, timeout=timeout)
+        return self._ExecuteCommand(command, timeout=timeout, returnfuture=returnfuture)
 
-    def StartContainerDetectionTask(self, taskId=None, systemState=None, visionTaskParameters=None, timeout=2.0, **ignoredArgs):
-        # type: (Optional[str], Optional[types.SystemState], Optional[types.visionTaskContainerDetectionParametersSchema], float, Any) -> Optional[Dict[str, str]]
+    def StartContainerDetectionTask(self, taskId=None, systemState=None, visionTaskParameters=None, timeout=2.0, returnfuture=False, **ignoredArgs):
+        # type: (Optional[str], Optional[types.SystemState], Optional[types.visionTaskContainerDetectionParametersSchema], float, bool, Any) -> Optional[Dict[str, str]]
         """Starts container detection thread to continuously detect a container. the vision server will send detection results directly to mujin controller.
 
         Args:
@@ -294,6 +620,7 @@ class VisionControllerClient(object):
             systemState (types.SystemState, optional): The state of the system. Used to select the profile that the vision task will use. See "Profile Selection" documentation for more details.
             visionTaskParameters (types.visionTaskContainerDetectionParametersSchema, optional): Parameters for the object detection task. These take precedence over the base profile selected via the system state, but are overwritten by the overwrite profile.
             timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            returnfuture (bool, optional): If True, returns a VisionCommandFuture of the result right away instead of waiting for it. (Default: False)
 
         Returns:
             dict: Returns immediately once the call completes
@@ -312,10 +639,10 @@ class VisionControllerClient(object):
             command['systemState'] = systemState
         if visionTaskParameters is not None:
             command['visionTaskParameters'] = visionTaskParameters
-        return self._ExecuteCommand(command, timeout=timeout)
+        return self._ExecuteCommand(command, timeout=timeout, returnfuture=returnfuture)
 
-    def StartVisualizePointCloudTask(self, taskId=None, systemState=None, visionTaskParameters=None, timeout=2.0):
-        # type: (Optional[str], Optional[types.SystemState], Optional[types.visionTaskVisualizePointCloudParametersSchema], float) -> Optional[Dict]
+    def StartVisualizePointCloudTask(self, taskId=None, systemState=None, visionTaskParameters=None, timeout=2.0, returnfuture=False):
+        # type: (Optional[str], Optional[types.SystemState], Optional[types.visionTaskVisualizePointCloudParametersSchema], float, bool) -> Optional[Dict]
         """Start point cloud visualization thread to sync camera info from the Mujin controller and send the raw camera point clouds to Mujin controller
 
         Args:
@@ -323,6 +650,7 @@ class VisionControllerClient(object):
             systemState (types.SystemState, optional): The state of the system. Used to select the profile that the vision task will use. See "Profile Selection" documentation for more details.
             visionTaskParameters (types.visionTaskVisualizePointCloudParametersSchema, optional): Parameters for the object detection task. These take precedence over the base profile selected via the system state, but are overwritten by the overwrite profile.
             timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            returnfuture (bool, optional): If True, returns a VisionCommandFuture of the result right away instead of waiting for it. (Default: False)
 
         Returns:
             dict: An unstructured dictionary.
@@ -337,10 +665,10 @@ class VisionControllerClient(object):
             command['systemState'] = systemState
         if visionTaskParameters is not None:
             command['visionTaskParameters'] = visionTaskParameters
-        return self._ExecuteCommand(command, timeout=timeout)
+        return self._ExecuteCommand(command, timeout=timeout, returnfuture=returnfuture)
 
-    def StopTask(self, taskId=None, taskIds=None, taskType=None, taskTypes=None, cycleIndex=None, waitForStop=True, removeTask=False, fireandforget=False, timeout=2.0):
-        # type: (Optional[str], Optional[List[str]], Optional[str], Optional[List[str]], Optional[str], bool, bool, bool, float) -> Optional[Dict[str, bool]]
+    def StopTask(self, taskId=None, taskIds=None, taskType=None, taskTypes=None, cycleIndex=None, waitForStop=True, removeTask=False, fireandforget=False, timeout=2.0, returnfuture=False):
+        # type: (Optional[str], Optional[List[str]], Optional[str], Optional[List[str]], Optional[str], bool, bool, bool, float, bool) -> Optional[Dict[str, bool]]
         """Stops a set of tasks that meet the filter criteria
 
         Args:
@@ -353,6 +681,7 @@ class VisionControllerClient(object):
             removeTask (bool, optional): If True, then remove the task from being tracked by the vision manager and destroy all its resources. Will wait for the task to end before returning. (Default: False)
             fireandforget (bool, optional): If True, does not wait for the command to finish and returns immediately. The command remains queued on the server. (Default: False)
             timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            returnfuture (bool, optional): If True, returns a VisionCommandFuture of the result right away instead of waiting for it. (Default: False)
 
         Returns:
             dict: A dictionary with the structure:
@@ -375,10 +704,10 @@ class VisionControllerClient(object):
             command['taskType'] = taskType
         if cycleIndex is not None:
             command['cycleIndex'] = cycleIndex
-        return self._ExecuteCommand(command, timeout=timeout, fireandforget=fireandforget)
+        return self._ExecuteCommand(command, timeout=timeout, fireandforget=fireandforget, returnfuture=returnfuture)
 
-    def ResumeTask(self, taskId=None, taskIds=None, taskType=None, taskTypes=None, cycleIndex=None, waitForStop=_deprecated, fireandforget=False, timeout=2.0):
-        # type: (Optional[str], Optional[List[str]], Optional[str], Optional[List[str]], Optional[str], Optional[bool], bool, float) -> Optional[Dict[str, List[str]]]
+    def ResumeTask(self, taskId=None, taskIds=None, taskType=None, taskTypes=None, cycleIndex=None, waitForStop=_deprecated, fireandforget=False, timeout=2.0, returnfuture=False):
+        # type: (Optional[str], Optional[List[str]], Optional[str], Optional[List[str]], Optional[str], Optional[bool], bool, float, bool) -> Optional[Dict[str, List[str]]]
         """Resumes a set of tasks that meet the filter criteria
 
         Args:
@@ -390,6 +719,7 @@ class VisionControllerClient(object):
             waitForStop (bool, optional): **deprecated** This is unused.
             fireandforget (bool, optional): If True, does not wait for the command to finish and returns immediately. The command remains queued on the server. (Default: False)
             timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            returnfuture (bool, optional): If True, returns a VisionCommandFuture of the result right away instead of waiting for it. (Default: False)
 
         Returns:
             dict: A dictionary with the structure:
@@ -410,10 +740,10 @@ class VisionControllerClient(object):
             command['taskTypes'] = taskTypes
         if cycleIndex is not None:
             command['cycleIndex'] = cycleIndex
-        return self._ExecuteCommand(command, timeout=timeout, fireandforget=fireandforget)
+        return self._ExecuteCommand(command, timeout=timeout, fireandforget=fireandforget, returnfuture=returnfuture)
 
-    def BackupVisionLog(self, cycleIndex, sensorTimestamps=None, fireandforget=False, timeout=2.0):
-        # type: (str, Optional[List[float]], bool, float) -> Optional[Dict]
+    def BackupVisionLog(self, cycleIndex, sensorTimestamps=None, fireandforget=False, timeout=2.0, returnfuture=False):
+        # type: (str, Optional[List[float]], bool, float, bool) -> Optional[Dict]
         """Backs up the vision log for a given cycle index and/or sensor timestamps.
 
         Args:
@@ -421,6 +751,7 @@ class VisionControllerClient(object):
             sensorTimestamps (list[float], optional): The sensor timestamps to backup
             fireandforget (bool, optional): If True, does not wait for the command to finish and returns immediately. The command remains queued on the server. (Default: False)
             timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            returnfuture (bool, optional): If True, returns a VisionCommandFuture of the result right away instead of waiting for it. (Default: False)
 
         Returns:
             dict: An unstructured dictionary.
@@ -431,16 +762,22 @@ class VisionControllerClient(object):
         }  # type: Dict[str, Any]
         if sensorTimestamps is not None:
             command['sensorTimestamps'] = sensorTimestamps
-        return self._ExecuteCommand(command, fireandforget=fireandforget, timeout=timeout)
+        return self._ExecuteCommand(command, fireandforget=fireandforget, timeout=timeout, returnfuture=returnfuture)
     
-    def GetLatestDetectedObjects(self, taskId=None, cycleIndex=None, taskType=None, timeout=2.0, slaverequestid=None):
+    def GetLatestDetectedObjects(self, taskId=None, cycleIndex=None, taskType=None, timeout=2.0, slaverequestid=None, returnfuture=False, usecache=True):
         """Gets the latest detected objects.
+
+        If EnableDetectedObjectsCache was called, the response is shared with the other callers asking for the same taskId, taskType and cycleIndex until the published state of the slave changes. The returned dict must then not be modified.
+
+        detectionresults.ParseDetectionResults wraps the response in DetectionResult objects with the poses packed in numpy arrays.
         
         Args:
             taskId (str, optional): If specified, the taskId to retrieve the detected objects from.
             cycleIndex (str, optional): Unique cycle index string for tracking, backing up, and differentiating cycles.
             taskType (str, optional): The task type to retrieve the detected objects from.
             timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            returnfuture (bool, optional): If True, returns a VisionCommandFuture of the result right away instead of waiting for it. The cache is not used. (Default: False)
+            usecache (bool, optional): If False, always asks the vision manager even when the cache is enabled. (Default: True)
 
         Returns:
             dict: A dictionary with the structure:
@@ -471,9 +808,109 @@ class VisionControllerClient(object):
             command['cycleIndex'] = cycleIndex
         if taskType is not None:
             command['taskType'] = taskType
-        return self._ExecuteCommand(command, timeout=timeout, slaverequestid=slaverequestid)
+        cache = self._detectedobjectscache
+        if cache is not None and usecache and not returnfuture:
+            key = (taskId, taskType, cycleIndex, slaverequestid or self._slaverequestid)
+            return cache.Get(key, timeout=timeout)
+        return self._ExecuteCommand(command, timeout=timeout, slaverequestid=slaverequestid, returnfuture=returnfuture)
+
+    def _FetchDetectedObjects(self, key, timeout):
+        # type: (Tuple[Optional[str], Optional[str], Optional[str], Optional[str]], Optional[float]) -> Dict[str, Any]
+        taskId, taskType, cycleIndex, slaverequestid = key
+        return self.GetLatestDetectedObjects(taskId=taskId, cycleIndex=cycleIndex, taskType=taskType, timeout=timeout, slaverequestid=slaverequestid, usecache=False)
+
+    def EnableDetectedObjectsCache(self, maxAge=None):
+        # type: (Optional[float]) -> DetectedObjectsCache
+        """Caches the responses of GetLatestDetectedObjects by taskId, taskType and cycleIndex, so that callers asking for the same detected objects in a cycle share one request and one decoded response.
+
+        The cache is emptied every time the published state of the slave changes, which is when a newer result can be available. Starts the published state thread if needed; stopping it disables the cache.
+
+        Args:
+            maxAge (float, optional): Time in seconds after which a response is asked again even if the published state did not change. None means rely on the published state only.
+
+        Returns:
+            DetectedObjectsCache: The cache, e.g. to read its statistics.
+        """
+        if self._detectedobjectscache is not None:
+            return self._detectedobjectscache
+        self.StartPublishedStateThread()
+        cache = DetectedObjectsCache(self._FetchDetectedObjects, maxAge=maxAge)
+        lastSlaveState = [self._GetSlaveState(self._publishedstatecache.GetLatestState()[0])]
+
+        def _Listener(serverState):
+            slaveState = self._GetSlaveState(serverState)
+            if slaveState != lastSlaveState[0]:
+                lastSlaveState[0] = slaveState
+                cache.Invalidate()
+        self._publishedstatecache.AddListener(_Listener)
+        self._detectedobjectscache = cache
+        self._detectedobjectscachelistener = _Listener
+        return cache
+
+    def DisableDetectedObjectsCache(self):
+        # type: () -> None
+        """Stops caching the responses of GetLatestDetectedObjects, see EnableDetectedObjectsCache."""
+        if self._detectedobjectscachelistener is not None and self._publishedstatecache is not None:
+            self._publishedstatecache.RemoveListener(self._detectedobjectscachelistener)
+        self._detectedobjectscache = None
+        self._detectedobjectscachelistener = None
+
+    def WaitForNewDetectedObjects(self, taskId=None, newerThanResultTimestampUS=0, timeout=10.0, cycleIndex=None, taskType=None, slaverequestid=None, pollInterval=1.0, commandTimeout=2.0):
+        # type: (Optional[str], int, float, Optional[str], Optional[str], Optional[str], Optional[float], float) -> Dict[str, Any]
+        """Blocks until the latest detected objects have a detection result newer than newerThanResultTimestampUS, and returns them.
+
+        Instead of polling, GetLatestDetectedObjects is sent again only when the published state of this slave changes, so a new result is picked up as soon as the vision manager publishes its state. In case the published state does not change with the results, GetLatestDetectedObjects is also sent every pollInterval seconds. Starts the published state thread if needed.
 
-    def GetLatestDetectionResultImages(self, taskId=None, cycleIndex=None, taskType=None, newerThanResultTimestampUS=0, sensorSelectionInfo=None, metadataOnly=False, imageTypes=None, limit=None, blockwait=True, timeout=2.0, slaverequestid=None):
+        Args:
+            taskId (str, optional): If specified, the taskId to retrieve the detected objects from.
+            newerThanResultTimestampUS (int, optional): resultTimestampUS that a detection result has to be newer than. (Default: 0)
+            timeout (float, optional): Time in seconds to wait for a new result. (Default: 10.0)
+            cycleIndex (str, optional): Unique cycle index string for tracking, backing up, and differentiating cycles.
+            taskType (str, optional): The task type to retrieve the detected objects from.
+            slaverequestid (str, optional): Overrides the slave request id of the client.
+            pollInterval (float, optional): Time in seconds between two GetLatestDetectedObjects when the published state does not change. None means only rely on the published state. (Default: 1.0)
+            commandTimeout (float, optional): Timeout in seconds of each GetLatestDetectedObjects, shortened to the time left until timeout. (Default: 2.0)
+
+        Returns:
+            dict: The response of GetLatestDetectedObjects, see GetLatestDetectedObjects.
+
+        Raises:
+            VisionControllerTimeoutError: If there is no new result within timeout.
+        """
+        deadline = time.monotonic() + timeout
+        self.StartPublishedStateThread()
+        cache = self._publishedstatecache
+        # listen before querying, so that a state published in between is not missed
+        queue = PublishedStateQueue(maxQueueSize=1)
+        cache.AddListener(queue.Put)
+        try:
+            slaveState = self._GetSlaveState(cache.GetLatestState()[0])
+            while True:
+                # a query never outlives the deadline, and timing out on it is timing out on the wait
+                try:
+                    response = self.GetLatestDetectedObjects(taskId=taskId, cycleIndex=cycleIndex, taskType=taskType, timeout=min(commandTimeout, max(0.0, deadline - time.monotonic())), slaverequestid=slaverequestid, usecache=False)
+                except TimeoutError as e:
+                    raise VisionControllerTimeoutError(_('Timed out after %.03f seconds waiting for detected objects newer than %d from %s:%d: %s') % (timeout, newerThanResultTimestampUS, self.hostname, self.commandport, e), errortype='timeout')
+                if _GetNewestResultTimestampUS(response) > newerThanResultTimestampUS:
+                    return response
+                # wait until the state of this slave changes, or it is time to poll
+                polldeadline = deadline if pollInterval is None else min(deadline, time.monotonic() + pollInterval)
+                while True:
+                    waittime = polldeadline - time.monotonic()
+                    if waittime <= 0:
+                        break
+                    hasState, serverState = queue.Get(timeout=waittime)
+                    if hasState:
+                        newSlaveState = self._GetSlaveState(serverState)
+                        if newSlaveState != slaveState:
+                            slaveState = newSlaveState
+                            break
+                if time.monotonic() >= deadline:
+                    raise VisionControllerTimeoutError(_('Timed out after %.03f seconds waiting for detected objects newer than %d from %s:%d') % (timeout, newerThanResultTimestampUS, self.hostname, self.commandport), errortype='timeout')
+        finally:
+            cache.RemoveListener(queue.Put)
+
+    def GetLatestDetectionResultImages(self, taskId=None, cycleIndex=None, taskType=None, newerThanResultTimestampUS=0, sensorSelectionInfo=None, metadataOnly=False, imageTypes=None, limit=None, blockwait=True, timeout=2.0, slaverequestid=None, returnfuture=False, zerocopy=False):
         """Gets the latest detected result images.
 
         Args:
@@ -487,9 +924,11 @@ class VisionControllerClient(object):
             limit (int, optional):
             blockwait (bool, optional): If true, waits for the next image to be available. If false, returns immediately. (Default: True)
             timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            returnfuture (bool, optional): If True, returns a VisionCommandFuture of the result right away instead of waiting for it. (Default: False)
+            zerocopy (bool, optional): If True, returns a memoryview of the received data instead of bytes. With a pipelined command socket the data is never copied after being received. (Default: False)
 
         Returns:
-            str: Raw image data
+            str: Raw image data, as sent by the vision manager.
         """
         log.verbose("Getting latest detection result images...")
         command = {
@@ -509,15 +948,147 @@ class VisionControllerClient(object):
             command['imageTypes'] = imageTypes
         if limit is not None:
             command['limit'] = limit
-        return self._ExecuteCommand(command, timeout=timeout, recvjson=False, blockwait=blockwait, slaverequestid=slaverequestid)
+        return self._ExecuteCommand(command, timeout=timeout, recvjson=False, blockwait=blockwait, slaverequestid=slaverequestid, returnfuture=returnfuture, zerocopy=zerocopy)
+
+    def GetLatestDetectionResultImagesToStream(self, stream, taskId=None, cycleIndex=None, taskType=None, newerThanResultTimestampUS=0, sensorSelectionInfo=None, metadataOnly=False, imageTypes=None, limit=None, timeout=2.0, slaverequestid=None, chunkSize=1024 * 1024):
+        # type: (Any, Optional[str], Optional[str], Optional[str], int, Optional[Dict], bool, Optional[List[str]], Optional[int], float, Optional[str], int) -> int
+        """Gets the latest detected result images and writes them to stream without copying them in memory.
+
+        The response is received as one zmq message, which is written from a memoryview in chunks and released when this returns, so the peak memory is the size of one response.
+
+        Args:
+            stream (file): Binary file-like object with a write method.
+            chunkSize (int, optional): Size in bytes of the slices written to stream. (Default: 1 MiB)
+
+            See GetLatestDetectionResultImages for the other arguments.
+
+        Returns:
+            int: Number of bytes written
+        """
+        response = self.GetLatestDetectionResultImages(taskId=taskId, cycleIndex=cycleIndex, taskType=taskType, newerThanResultTimestampUS=newerThanResultTimestampUS, sensorSelectionInfo=sensorSelectionInfo, metadataOnly=metadataOnly, imageTypes=imageTypes, limit=limit, timeout=timeout, slaverequestid=slaverequestid, zerocopy=True)
+        return _WriteResponse(response, stream, chunkSize=chunkSize)
+
+    def GetLatestDetectionResultImagesToFile(self, filename, taskId=None, cycleIndex=None, taskType=None, newerThanResultTimestampUS=0, sensorSelectionInfo=None, metadataOnly=False, imageTypes=None, limit=None, timeout=2.0, slaverequestid=None, chunkSize=1024 * 1024):
+        # type: (str, Optional[str], Optional[str], Optional[str], int, Optional[Dict], bool, Optional[List[str]], Optional[int], float, Optional[str], int) -> int
+        """Gets the latest detected result images and writes them to a file, see GetLatestDetectionResultImagesToStream. The file is only created once the whole response is written.
+
+        Args:
+            filename (str): Path of the file to write.
+
+            See GetLatestDetectionResultImagesToStream for the other arguments.
+
+        Returns:
+            int: Number of bytes written
+        """
+        response = self.GetLatestDetectionResultImages(taskId=taskId, cycleIndex=cycleIndex, taskType=taskType, newerThanResultTimestampUS=newerThanResultTimestampUS, sensorSelectionInfo=sensorSelectionInfo, metadataOnly=metadataOnly, imageTypes=imageTypes, limit=limit, timeout=timeout, slaverequestid=slaverequestid, zerocopy=True)
+        return _WriteResponseToFile(response, filename, chunkSize=chunkSize)
+
+    def StreamDetectionResultImages(self, taskId=None, cycleIndex=None, taskType=None, newerThanResultTimestampUS=0, sensorSelectionInfo=None, metadataOnly=False, imageTypes=None, limit=None, timeout=2.0, slaverequestid=None, timestampfn=None, parsefn=None, decodePool=None):
+        """Yields the detection result images one after the other, each newer than the previous one.
 
-    def GetDetectionHistory(self, timestamp, timeout=2.0):
-        # type: (int, float) -> Optional[str]
+        As soon as a result is received, the request for the next one is sent with newerThanResultTimestampUS set to its result timestamp, before the result is yielded. So the next result is already on its way while the caller processes the current one. Errors, including timeouts, are raised from the generator and end the stream. Closing the generator cancels the request in flight.
+
+        The result timestamp is given by timestampfn when the caller knows how to read it from the images. Otherwise it is the latestResultTimestampUS of the published state of the slave, waiting up to timeout for the state to show a result newer than the previous one, so the published state thread is started. Results produced between the reply and the state read are skipped, as they would be by GetLatestDetectionResultImages. When no result timestamp is found, the stream ends after yielding the result, since the next request could only return the same images again.
+
+        Args:
+            taskId (str, optional): If specified, the taskId to retrieve the detected objects from.
+            cycleIndex (str, optional): Unique cycle index string for tracking, backing up, and differentiating cycles.
+            taskType (str, optional): If specified, the task type to retrieve the detected objects from.
+            newerThanResultTimestampUS (int, optional): Result timestamp in microseconds the first result has to be newer than. (Default: 0)
+            sensorSelectionInfo (dict, optional): Sensor selection infos (see schema).
+            metadataOnly (bool, optional): (Default: False)
+            imageTypes (list, optional): Mujin image types
+            limit (int, optional):
+            timeout (float, optional): Time in seconds to wait for each result. (Default: 2.0)
+            slaverequestid (str, optional): Overrides the slave request id of the client.
+            timestampfn (Callable, optional): Called with the raw data of every result, returns its result timestamp in microseconds, or None if it has none.
+            parsefn (Callable, optional): Called with the raw data of every result, its return value is yielded instead of the raw data.
+            decodePool (ImageDecodePool, optional): If given, parsefn has to return the (key, data) entries of the images, they are submitted to the pool as soon as the result is received, and (entries, list of futures of the decoded images) is yielded. The stream waits when the pool falls behind.
+
+        Returns:
+            Iterator: The raw data of every result as a memoryview, or what parsefn returns.
+
+        Raises:
+            VisionControllerClientError: If decodePool is given without parsefn.
+        """
+        if decodePool is not None and parsefn is None:
+            raise VisionControllerClientError(_('Decoding streamed detection result images needs parsefn to split the results into images'), errortype='invalidargument')
+        if timestampfn is None:
+            self.StartPublishedStateThread()
+        return self._StreamDetectionResultImages(taskId, cycleIndex, taskType, newerThanResultTimestampUS, sensorSelectionInfo, metadataOnly, imageTypes, limit, timeout, slaverequestid, timestampfn, parsefn, decodePool)
+
+    def _StreamDetectionResultImages(self, taskId, cycleIndex, taskType, newerThanResultTimestampUS, sensorSelectionInfo, metadataOnly, imageTypes, limit, timeout, slaverequestid, timestampfn, parsefn, decodePool):
+        # type: (Optional[str], Optional[str], Optional[str], int, Optional[Dict], bool, Optional[List[str]], Optional[int], float, Optional[str], Optional[Callable[[Any], Optional[int]]], Optional[Callable[[Any], Any]], Any) -> Iterator[Any]
+        """Generator of StreamDetectionResultImages, separate so that the arguments are checked when it is called instead of on the first result."""
+        slavekey = 'slaverequestid-%s' % (slaverequestid or self._slaverequestid)
+
+        def _RequestNext(newerThanResultTimestampUS):
+            # type: (int) -> VisionCommandFuture
+            return self.GetLatestDetectionResultImages(taskId=taskId, cycleIndex=cycleIndex, taskType=taskType, newerThanResultTimestampUS=newerThanResultTimestampUS, sensorSelectionInfo=sensorSelectionInfo, metadataOnly=metadataOnly, imageTypes=imageTypes, limit=limit, timeout=timeout, slaverequestid=slaverequestid, returnfuture=True, zerocopy=True)
+
+        def _GetLatestResultTimestampUS(serverState):
+            # type: (Optional[Dict]) -> Optional[int]
+            slaveState = serverState.get('slavestates', {}).get(slavekey) if serverState is not None else None
+            return slaveState.get('latestResultTimestampUS') if slaveState is not None else None
+
+        def _WaitForResultTimestampUS(newerThanResultTimestampUS):
+            # type: (int) -> Optional[int]
+            """Returns the latestResultTimestampUS of the published state once it is newer than newerThanResultTimestampUS, the result just received being newer. None if the state does not show it within timeout."""
+            resultTimestampUS = _GetLatestResultTimestampUS(cache.GetLatestState()[0])
+            deadline = time.monotonic() + timeout
+            while resultTimestampUS is None or resultTimestampUS <= newerThanResultTimestampUS:
+                waittime = deadline - time.monotonic()
+                if waittime <= 0:
+                    return None
+                hasState, serverState = queue.Get(timeout=waittime)
+                if hasState:
+                    resultTimestampUS = _GetLatestResultTimestampUS(serverState)
+            return resultTimestampUS
+
+        cache = queue = None
+        if timestampfn is None:
+            # listen before the first request, so that a state published in between is not missed
+            cache = self._publishedstatecache
+            queue = PublishedStateQueue(maxQueueSize=1)
+            cache.AddListener(queue.Put)
+        future = _RequestNext(newerThanResultTimestampUS)  # type: Optional[VisionCommandFuture]
+        try:
+            while future is not None:
+                rawImages = future.result()
+                if timestampfn is not None:
+                    resultTimestampUS = timestampfn(rawImages)
+                else:
+                    resultTimestampUS = _WaitForResultTimestampUS(newerThanResultTimestampUS)
+                future = None
+                if resultTimestampUS is None:
+                    log.warning('no result timestamp for the detection result images, ending the stream since the next request could return the same images')
+                else:
+                    newerThanResultTimestampUS = max(newerThanResultTimestampUS, resultTimestampUS)
+                    future = _RequestNext(newerThanResultTimestampUS)
+                if parsefn is None:
+                    yield rawImages
+                elif decodePool is not None:
+                    images = list(parsefn(rawImages))
+                    yield images, decodePool.SubmitImages(images)
+                else:
+                    yield parsefn(rawImages)
+        finally:
+            if future is not None:
+                future.cancel()
+            if queue is not None:
+                cache.RemoveListener(queue.Put)
+
+    def GetDetectionHistory(self, timestamp, timeout=2.0, returnfuture=False, zerocopy=False):
+        # type: (int, float, bool, bool) -> Optional[str]
         """Gets detection result with given timestamp (sensor time)
 
+        If the client has a detection history cache, the blob is returned from it when cached, and added to it otherwise.
+
         Args:
             timestamp (int): Unix timestamp in milliseconds of the sensor capture time ("targetsensortimestamp" from detected objects).
             timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            returnfuture (bool, optional): If True, returns a VisionCommandFuture of the result right away instead of waiting for it. (Default: False)
+            zerocopy (bool, optional): If True, returns a memoryview of the received data instead of bytes. (Default: False)
 
         Returns:
             str: Binary blob of detection data
@@ -527,14 +1098,109 @@ class VisionControllerClient(object):
             'command': 'GetDetectionHistory',
             'timestamp': timestamp,
         }  # type: Dict[str, Any]
-        return self._ExecuteCommand(command, timeout=timeout, recvjson=False)
+        if self._detectionhistorycache is None:
+            return self._ExecuteCommand(command, timeout=timeout, recvjson=False, returnfuture=returnfuture, zerocopy=zerocopy)
+
+        cache = self._detectionhistorycache
+        data = cache.Get(timestamp)
+        if data is not None:
+            response = memoryview(data) if zerocopy else bytes(data)
+            if returnfuture:
+                future = Future()
+                future.set_result(response)
+                return VisionCommandFuture(future, command=command)
+            return response
+        if not returnfuture:
+            response = self._ExecuteCommand(command, timeout=timeout, recvjson=False, zerocopy=zerocopy)
+            cache.Put(timestamp, response)
+            return response
+
+        def _CacheResponse(commandfuture):
+            # type: (VisionCommandFuture) -> None
+            if not commandfuture.cancelled() and commandfuture.exception() is None:
+                cache.Put(timestamp, commandfuture.result())
+        commandfuture = self._ExecuteCommand(command, timeout=timeout, recvjson=False, returnfuture=True, zerocopy=zerocopy)
+        commandfuture.add_done_callback(_CacheResponse)
+        return commandfuture
+
+    def _GetDetectionHistoryView(self, timestamp, timeout=2.0):
+        # type: (int, float) -> memoryview
+        """Returns the blob of the timestamp as a memoryview, from the detection history cache if it has it, without adding it to the cache."""
+        if self._detectionhistorycache is not None:
+            data = self._detectionhistorycache.Get(timestamp)
+            if data is not None:
+                return memoryview(data)
+        command = {
+            'command': 'GetDetectionHistory',
+            'timestamp': timestamp,
+        }  # type: Dict[str, Any]
+        return self._ExecuteCommand(command, timeout=timeout, recvjson=False, zerocopy=True)
 
-    def Ping(self, timeout=2.0, fireandforget=False):
-        # type: (float) -> Optional[Dict]
+    def GetDetectionHistoryToStream(self, timestamp, stream, timeout=2.0, chunkSize=1024 * 1024):
+        # type: (int, Any, float, int) -> int
+        """Gets the detection result with given timestamp and writes it to stream without copying it in memory. The blob is not added to the detection history cache.
+
+        Args:
+            timestamp (int): Unix timestamp in milliseconds of the sensor capture time ("targetsensortimestamp" from detected objects).
+            stream (file): Binary file-like object with a write method.
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            chunkSize (int, optional): Size in bytes of the slices written to stream. (Default: 1 MiB)
+
+        Returns:
+            int: Number of bytes written
+        """
+        return _WriteResponse(self._GetDetectionHistoryView(timestamp, timeout=timeout), stream, chunkSize=chunkSize)
+
+    def GetDetectionHistoryToFile(self, timestamp, filename, timeout=2.0, chunkSize=1024 * 1024):
+        # type: (int, str, float, int) -> int
+        """Gets the detection result with given timestamp and writes it to a file, see GetDetectionHistoryToStream. The file is only created once the whole blob is written.
+
+        Args:
+            timestamp (int): Unix timestamp in milliseconds of the sensor capture time ("targetsensortimestamp" from detected objects).
+            filename (str): Path of the file to write.
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            chunkSize (int, optional): Size in bytes of the slices written to the file. (Default: 1 MiB)
+
+        Returns:
+            int: Number of bytes written
+        """
+        return _WriteResponseToFile(self._GetDetectionHistoryView(timestamp, timeout=timeout), filename, chunkSize=chunkSize)
+
+    def GetDetectionHistories(self, timestamps, timeout=2.0, maxInFlight=8, zerocopy=False):
+        # type: (Iterable[int], float, int, bool) -> Iterator[Tuple[int, Any]]
+        """Yields (timestamp, blob) for every timestamp, in the order of the timestamps.
+
+        Up to maxInFlight GetDetectionHistory requests are kept outstanding, so that the blobs keep coming while the caller processes the previous ones. On a pipelined command socket they all share one connection, on REQ sockets they are spread over the socket pool. The vision manager has no command returning a range of timestamps, get the timestamps to fetch from the detected objects ("targetsensortimestamp").
+
+        Errors, including timeouts, are raised from the iterator and cancel the remaining requests.
+
+        Args:
+            timestamps (Iterable[int]): Unix timestamps in milliseconds of the sensor capture times. Can be a generator, it is only consumed as requests are sent.
+            timeout (float, optional): Time in seconds after which each request is assumed to have failed. (Default: 2.0)
+            maxInFlight (int, optional): Number of requests outstanding at any time. (Default: 8)
+            zerocopy (bool, optional): If True, the blobs are memoryviews instead of bytes. (Default: False)
+        """
+        pending = collections.deque()  # type: Deque[Tuple[int, VisionCommandFuture]]
+        timestampiter = iter(timestamps)
+        try:
+            while True:
+                for timestamp in itertools.islice(timestampiter, max(0, maxInFlight - len(pending))):
+                    pending.append((timestamp, self.GetDetectionHistory(timestamp, timeout=timeout, returnfuture=True, zerocopy=zerocopy)))
+                if not pending:
+                    break
+                timestamp, future = pending.popleft()
+                yield timestamp, future.result()
+        finally:
+            for timestamp, future in pending:
+                future.cancel()
+
+    def Ping(self, timeout=2.0, fireandforget=False, returnfuture=False):
+        # type: (float, bool, bool) -> Optional[Dict]
         """Sends a ping to the visionmanager.
 
         Args:
             timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            returnfuture (bool, optional): If True, returns a VisionCommandFuture of the result right away instead of waiting for it. (Default: False)
 
         Returns:
             dict: An unstructured dictionary.
@@ -542,7 +1208,7 @@ class VisionControllerClient(object):
         command = {
             'command': 'Ping',
         }
-        return self._ExecuteCommand(command, fireandforget=fireandforget, timeout=timeout)
+        return self._ExecuteCommand(command, fireandforget=fireandforget, timeout=timeout, returnfuture=returnfuture)
     
     def SetLogLevel(self, componentLevels, timeout=2.0):
         # type: (Dict, float) -> Optional[Dict]
@@ -593,8 +1259,8 @@ class VisionControllerClient(object):
         }
         return self._SendConfiguration(command, timeout=timeout)
     
-    def GetTaskStateService(self, taskId=None, cycleIndex=None, taskType=None, timeout=4.0):
-        # type: (Optional[str], Optional[str], Optional[str], float) -> Optional[Dict[str, Any]]
+    def GetTaskStateService(self, taskId=None, cycleIndex=None, taskType=None, timeout=4.0, returnfuture=False):
+        # type: (Optional[str], Optional[str], Optional[str], float, bool) -> Optional[Dict[str, Any]]
         """Gets the task state from visionmanager.
 
         Args:
@@ -602,6 +1268,7 @@ class VisionControllerClient(object):
             cycleIndex (str, optional): Unique cycle index string for tracking, backing up, and differentiating cycles.
             taskType (str, optional): The taskType for which the status was requested. If not specified, defaults to the controller monitor task.
             timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 4.0)
+            returnfuture (bool, optional): If True, returns a VisionCommandFuture of the result right away instead of waiting for it. (Default: False)
 
         Returns:
             dict: A dictionary with the structure:
@@ -626,14 +1293,15 @@ class VisionControllerClient(object):
             command['cycleIndex'] = cycleIndex
         if taskType is not None:
             command['taskType'] = taskType
-        return self._ExecuteCommand(command, timeout=timeout)
+        return self._ExecuteCommand(command, timeout=timeout, returnfuture=returnfuture)
     
-    def GetPublishedStateService(self, timeout=4.0):
-        # type: (float) -> Optional[Dict[str, Any]]
+    def GetPublishedStateService(self, timeout=4.0, returnfuture=False):
+        # type: (float, bool) -> Optional[Dict[str, Any]]
         """Gets the published state of the visionmanager.
 
         Args:
             timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 4.0)
+            returnfuture (bool, optional): If True, returns a VisionCommandFuture of the result right away instead of waiting for it. (Default: False)
 
         Returns:
             dict: A dictionary with the structure:
@@ -643,23 +1311,158 @@ class VisionControllerClient(object):
                 - timestamp (int)
                 - version (str)
         """
-        response = self._ExecuteCommand({"command": "GetPublishedState"}, timeout=timeout)
+        response = self._ExecuteCommand({"command": "GetPublishedState"}, timeout=timeout, returnfuture=returnfuture)
         return response
     
-    def GetPublishedServerState(self, timeout=2.0):
+    def StartPublishedStateThread(self, selectiveDecode=False, topLevelKeys=None):
+        # type: (bool, Optional[List[str]]) -> None
+        """Starts receiving the published state on a background thread, so that GetPublishedServerState and GetPublishedState return the cached state without waiting.
+
+        Args:
+            selectiveDecode (bool, optional): If True, only the state of this client's slave is decoded from every published message, and the cached server state only has that entry in slavestates. Saves most of the decoding cost when many slaves share the vision manager. (Default: False)
+            topLevelKeys (list[str], optional): Only used with selectiveDecode. Names of the top-level members of the server state to keep as well, e.g. ['tasks', 'timestamp']. Keeping any of them costs close to a full decode.
+
+        Does nothing when the client was given a shared publishedstatecache, which decodes the full state once for all the clients sharing it.
+        """
+        if self._publishedstatecache is None:
+            def _DecodePartialServerState(rawServerState):
+                # type: (bytes) -> Dict[str, Any]
+                return DecodePartialServerState(rawServerState, self._slaverequestid, topLevelKeys=topLevelKeys)
+
+            decodefn = None
+            if selectiveDecode and topLevelKeys:
+                decodefn = _DecodePartialServerState
+            elif selectiveDecode:
+                decodefn = self._DecodeSelectedServerState
+            self._publishedstatecache = PublishedStateCache('tcp://%s:%d' % (self.hostname, self.statusport), ctx=self._ctx, decodefn=decodefn or self._codec.Decode)
+            if self._recorder is not None:
+                self._publishedstatecache.AddListener(self._recorder.RecordPublishedState)
+
+    def _DecodeSelectedServerState(self, rawServerState):
+        # type: (bytes) -> Dict[str, Any]
+        slavekey = 'slaverequestid-%s' % self._slaverequestid
+        slaveState = DecodeSlaveState(rawServerState, self._slaverequestid)
+        return {'slavestates': {slavekey: slaveState} if slaveState is not None else {}}
+
+    def StopPublishedStateThread(self):
+        # type: () -> None
+        """Stops the background thread started by StartPublishedStateThread.
+
+        A shared publishedstatecache keeps running for the other clients, only the callbacks of this client are removed from it.
+        """
+        # the detected objects cache would not be invalidated anymore
+        self.DisableDetectedObjectsCache()
+        if self._publishedstatecache is not None and self._publishedstatecache is self._sharedpublishedstatecache:
+            for listener in (self._publishedstatecallbacks or {}).values():
+                self._publishedstatecache.RemoveListener(listener)
+        elif self._publishedstatecache is not None:
+            self._publishedstatecache.Destroy()
+            self._publishedstatecache = None
+        self._publishedstatecallbacks = None
+
+    def GetPublishedServerState(self, timeout=2.0, maxAge=None):
         """Return most recent published state. If publishing is disabled, then will return None
+
+        Args:
+            timeout (float, optional): Time in seconds to wait for a state. (Default: 2.0)
+            maxAge (float, optional): Only used when the published state thread is running. If the cached state is older than this many seconds, waits for a new one. If not specified, the cached state is returned right away.
         """
+        event = self._StartCommandEvent(None, 'publishedstate', commandName='GetPublishedServerState')
+        if event is None:
+            if self._publishedstatecache is not None:
+                return self._publishedstatecache.GetState(maxAge=maxAge, timeout=timeout)
+            rawServerState = self._ReceiveRawPublishedServerState(timeout=timeout)
+            if rawServerState is not None:
+                return self._codec.Decode(rawServerState)
+            return None
+
+        CallBeforeSend(event)
+        starttime = time.perf_counter()
+        try:
+            if self._publishedstatecache is not None:
+                serverState = self._publishedstatecache.GetState(maxAge=maxAge, timeout=timeout)
+                event.waitUS = _GetElapsedUS(starttime)
+            else:
+                serverState = None
+                rawServerState = self._ReceiveRawPublishedServerState(timeout=timeout)
+                event.waitUS = _GetElapsedUS(starttime)
+                if rawServerState is not None:
+                    event.response = rawServerState
+                    event.responseBytes = _GetResponseSize(rawServerState)
+                    event.recvjson = True
+                    starttime = time.perf_counter()
+                    serverState = self._codec.Decode(rawServerState)
+                    event.decodeUS = _GetElapsedUS(starttime)
+        except Exception as e:
+            CallOnError(event, e)
+            raise
+        CallAfterReceive(event)
+        return serverState
+
+    def _ReceiveRawPublishedServerState(self, timeout=2.0):
+        # type: (float) -> Optional[bytes]
         if self._subscriber is None:
             self._subscriber = zmqsubscriber.ZmqSubscriber('tcp://%s:%d' % (self.hostname, self.statusport), ctx=self._ctx)
-        rawServerState = self._subscriber.SpinOnce(timeout=timeout)
-        if rawServerState is not None:
-            return json.loads(rawServerState)
-        return None
-    
-    def GetPublishedState(self, timeout=2.0):
+        return self._subscriber.SpinOnce(timeout=timeout)
+
+    def GetPublishedState(self, timeout=2.0, maxAge=None):
         """Return most recent published state. If publishing is disabled, then will return None
+
+        Only the state of this slave is decoded from the published message, unless the published state thread is running.
+
+        Args:
+            timeout (float, optional): Time in seconds to wait for a state. (Default: 2.0)
+            maxAge (float, optional): See GetPublishedServerState.
         """
-        serverState = self.GetPublishedServerState(timeout=timeout)
+        if self._publishedstatecache is not None:
+            return self._GetSlaveState(self._publishedstatecache.GetState(maxAge=maxAge, timeout=timeout))
+        rawServerState = self._ReceiveRawPublishedServerState(timeout=timeout)
+        if rawServerState is not None:
+            return DecodeSlaveState(rawServerState, self._slaverequestid)
+        return None
+
+    def _GetSlaveState(self, serverState):
+        # type: (Optional[Dict]) -> Optional[Dict]
         if serverState is not None and 'slavestates' in serverState:
             return serverState['slavestates'].get('slaverequestid-%s' % self._slaverequestid)
         return None
+
+    def IterPublishedStates(self, maxQueueSize=16, timeout=None):
+        """Returns an iterator yielding the published state of this slave, as returned by GetPublishedState, every time a new one arrives on the status port. Starts the published state thread if needed.
+
+        The iterator has to be closed (or used in a with statement) when breaking out of the iteration early.
+
+        Args:
+            maxQueueSize (int, optional): Number of states kept when the caller is slower than the publisher. The oldest ones are dropped first. (Default: 16)
+            timeout (float, optional): The iteration ends if no new state arrives within this many seconds. None means wait forever.
+        """
+        self.StartPublishedStateThread()
+        return self._publishedstatecache.IterStates(maxQueueSize=maxQueueSize, timeout=timeout, convertfn=self._GetSlaveState)
+
+    def AddPublishedStateCallback(self, fn):
+        # type: (Callable[[Dict], None]) -> None
+        """Calls fn with the published state of this slave, as returned by GetPublishedState, every time a new one arrives on the status port. Starts the published state thread if needed.
+
+        fn is called on the published state thread and should return quickly. States published while it runs are conflated to the latest one.
+        """
+        self.StartPublishedStateThread()
+        if self._publishedstatecallbacks is None:
+            self._publishedstatecallbacks = {}
+        if fn in self._publishedstatecallbacks:
+            return
+
+        def _Listener(serverState):
+            slaveState = self._GetSlaveState(serverState)
+            if slaveState is not None:
+                fn(slaveState)
+        self._publishedstatecallbacks[fn] = _Listener
+        self._publishedstatecache.AddListener(_Listener)
+
+    def RemovePublishedStateCallback(self, fn):
+        # type: (Callable[[Dict], None]) -> None
+        """Stops calling fn registered with AddPublishedStateCallback."""
+        if self._publishedstatecallbacks is None:
+            return
+        listener = self._publishedstatecallbacks.pop(fn, None)
+        if listener is not None and self._publishedstatecache is not None:
+            self._publishedstatecache.RemoveListener(listener)
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2026 MUJIN Inc
+# Pool of vision controller clients sharing one zmq context and the sockets of each vision manager
+
+# system imports
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, List, Optional, Tuple, Union # noqa: F401 # used in type check
+    from .codec import Codec # noqa: F401 # used in type check
+
+# mujin imports
+from mujinplanningclient import zmqclient
+from . import VisionControllerTimeoutError
+from . import zmq
+from . import ugettext as _
+from .checkoutzmqclient import CheckoutZmqClient
+from .codec import GetCodec
+from .pipelinedcommandchannel import PipelinedCommandChannel
+from .publishedstatecache import PublishedStateCache
+from .visioncommandfuture import VisionCommandFuture
+from .visioncontrollerclient import VisionControllerClient
+
+# logging
+import logging
+log = logging.getLogger(__name__)
+
+
+class _EndpointSockets(object):
+    """Command and configuration sockets and published state cache of one vision manager, shared by all clients talking to it."""
+
+    commandsocket = None  # type: Optional[Union[CheckoutZmqClient, PipelinedCommandChannel]]
+    configurationsocket = None  # type: Optional[CheckoutZmqClient]
+    publishedstatecache = None  # type: Optional[PublishedStateCache]
+
+    def __init__(self, commandsocket, configurationsocket, publishedstatecache):
+        self.commandsocket = commandsocket
+        self.configurationsocket = configurationsocket
+        self.publishedstatecache = publishedstatecache
+
+    def SetDestroy(self):
+        # type: () -> None
+        self.commandsocket.SetDestroy()
+        self.configurationsocket.SetDestroy()
+
+    def Destroy(self):
+        # type: () -> None
+        for socket in (self.commandsocket, self.configurationsocket, self.publishedstatecache):
+            try:
+                socket.Destroy()
+            except Exception as e:
+                log.exception('problem destroying socket: %s', e)
+
+
+class VisionControllerClientPool(object):
+    """Pool of VisionControllerClient instances for an orchestrator talking to many vision managers and many slaves.
+
+    All clients share one zmq context, and the clients for the different slaverequestids of one vision manager share its command and configuration sockets and its published state cache, which are created when the first client for that vision manager is requested. Commands issued with returnfuture=True on REQ sockets run on one thread pool shared by all clients.
+
+    The sockets of each vision manager do not depend on the number of clients, slaves or calling threads:
+
+    - command port: one DEALER socket of a PipelinedCommandChannel, or without pipelined, at most maxZmqClients REQ ZmqClients lent to the threads by a CheckoutZmqClient.
+    - configuration port: at most maxZmqClients REQ ZmqClients lent by a CheckoutZmqClient.
+    - status port: one SUB socket, on the thread of a PublishedStateCache decoding every published state once for all the clients.
+
+    A ZmqClient normally holds one REQ socket and opens another only to replace a socket left waiting by a timeout or fireandforget. ZmqClients are only created when that many commands are outstanding at once, threads sending more wait for one to be free.
+
+    Since sockets are shared, blockwait=False followed by WaitForGetLatestDetectionResultImages should not be used on clients of the pool, use returnfuture=True instead.
+    """
+
+    _ctx = None  # type: Optional[zmq.Context] # zeromq context to use
+    _ctxown = None  # type: Optional[zmq.Context] # if owning the zeromq context, need to destroy it once done, so this value is set
+    _checkpreemptfn = None  # type: Optional[Callable]
+    _reconnectionTimeout = 40  # type: float
+    _callerid = None  # type: Optional[str]
+    _pipelined = True  # type: bool
+    _maxZmqClients = 4  # type: int # maximum number of REQ ZmqClients per port of a vision manager
+    _codec = None  # type: Optional[Codec] # codec of all clients of the pool
+
+    _lock = None  # type: Optional[threading.Lock] # guards _endpoints and _clients
+    _endpoints = None  # type: Optional[Dict[Tuple[str, int], _EndpointSockets]] # (hostname, commandport) -> shared sockets and published state cache
+    _clients = None  # type: Optional[Dict[Tuple[str, int, Optional[str]], VisionControllerClient]] # (hostname, commandport, slaverequestid) -> client
+    _executor = None  # type: Optional[ThreadPoolExecutor]
+
+    def __init__(self, ctx=None, checkpreemptfn=None, reconnectionTimeout=40, callerid=None, pipelined=True, maxWorkers=16, codec=None, maxZmqClients=4):
+        # type: (Optional[zmq.Context], Optional[Callable], float, Optional[str], bool, int, Optional[Union[str, Codec]], int) -> None
+        """Sets up an empty pool
+
+        Args:
+            ctx (zmq.Context, optional): The ZMQ context shared by all clients.
+            checkpreemptfn (Callable, optional): Called periodically when in a loop. The function should raise an exception if a preempt is desired.
+            reconnectionTimeout (float, optional): Sets the "timeout" parameter of the ZmqSocketPool instances
+            callerid (str, optional): The callerid to send to vision.
+            pipelined (bool, optional): If True, the command sockets are PipelinedCommandChannel instances. Otherwise they are REQ sockets like the configuration sockets. (Default: True)
+            maxWorkers (int, optional): Number of threads running concurrent commands on REQ sockets. (Default: 16)
+            codec (str or Codec, optional): Codec of all clients of the pool, see VisionControllerClient.
+            maxZmqClients (int, optional): Maximum number of REQ ZmqClients per port of a vision manager, see CheckoutZmqClient. (Default: 4)
+        """
+        if ctx is None:
+            self._ctxown = zmq.Context()
+            self._ctxown.linger = 100
+            self._ctx = self._ctxown
+        else:
+            self._ctx = ctx
+        self._checkpreemptfn = checkpreemptfn
+        self._reconnectionTimeout = reconnectionTimeout
+        self._callerid = callerid
+        self._pipelined = pipelined
+        self._maxZmqClients = maxZmqClients
+        self._codec = GetCodec(codec)
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._clients = {}
+        self._executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix='VisionControllerClientPool')
+
+    def __del__(self):
+        self.Destroy()
+
+    def Destroy(self):
+        # type: () -> None
+        if self._lock is None:
+            return
+        with self._lock:
+            clients = list(self._clients.values())
+            endpoints = list(self._endpoints.values())
+            self._clients.clear()
+            self._endpoints.clear()
+        for endpoint in endpoints:
+            endpoint.SetDestroy()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        for client in clients:
+            client.Destroy()
+        for endpoint in endpoints:
+            endpoint.Destroy()
+        if self._ctxown is not None:
+            try:
+                self._ctxown.destroy()
+                self._ctxown = None
+            except Exception as e:
+                log.exception('problem destroying ctxown: %s', e)
+        self._ctx = None
+
+    def _GetEndpointSockets(self, hostname, commandport):
+        # type: (str, int) -> _EndpointSockets
+        # called with _lock held
+        endpoint = self._endpoints.get((hostname, commandport))
+        if endpoint is None:
+            if self._pipelined:
+                commandsocket = PipelinedCommandChannel(hostname, commandport, ctx=self._ctx, checkpreemptfn=self._checkpreemptfn)
+            else:
+                commandsocket = CheckoutZmqClient(lambda: zmqclient.ZmqClient(hostname, commandport, ctx=self._ctx, limit=3, checkpreemptfn=self._checkpreemptfn, reusetimeout=self._reconnectionTimeout), maxClients=self._maxZmqClients)
+            configurationsocket = CheckoutZmqClient(lambda: zmqclient.ZmqClient(hostname, commandport + 2, ctx=self._ctx, limit=3, checkpreemptfn=self._checkpreemptfn, reusetimeout=self._reconnectionTimeout), maxClients=self._maxZmqClients)
+            publishedstatecache = PublishedStateCache('tcp://%s:%d' % (hostname, commandport + 1), ctx=self._ctx, decodefn=self._codec.Decode)
+            endpoint = _EndpointSockets(commandsocket, configurationsocket, publishedstatecache)
+            self._endpoints[(hostname, commandport)] = endpoint
+        return endpoint
+
+    def GetClient(self, hostname='127.0.0.1', commandport=7004, slaverequestid=None):
+        # type: (str, int, Optional[str]) -> VisionControllerClient
+        """Returns the client for the given vision manager and slave, creating it and the sockets of the vision manager if needed.
+
+        Args:
+            hostname (str, optional): e.g. visioncontroller1
+            commandport (int, optional): e.g. 7004
+            slaverequestid (str, optional): slave request id used when calling vision manager master to route to the correct vision manager slave
+        """
+        key = (hostname, commandport, slaverequestid)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                endpoint = self._GetEndpointSockets(hostname, commandport)
+                client = VisionControllerClient(hostname=hostname, commandport=commandport, ctx=self._ctx, checkpreemptfn=self._checkpreemptfn, callerid=self._callerid, slaverequestid=slaverequestid, commandsocket=endpoint.commandsocket, configurationsocket=endpoint.configurationsocket, executor=self._executor, codec=self._codec, publishedstatecache=endpoint.publishedstatecache)
+                self._clients[key] = client
+            return client
+
+    def RemoveClient(self, hostname='127.0.0.1', commandport=7004, slaverequestid=None):
+        # type: (str, int, Optional[str]) -> None
+        """Destroys the client for the given vision manager and slave. The sockets and published state cache of the vision manager are kept for the other clients."""
+        with self._lock:
+            client = self._clients.pop((hostname, commandport, slaverequestid), None)
+        if client is not None:
+            client.Destroy()
+
+    def GetClientKeys(self):
+        # type: () -> List[Tuple[str, int, Optional[str]]]
+        """Returns the (hostname, commandport, slaverequestid) of all clients in the pool."""
+        with self._lock:
+            return list(self._clients.keys())
+
+    def FanOut(self, fn, keys=None, timeout=None):
+        # type: (Callable[[VisionControllerClient], Any], Optional[List[Tuple[str, int, Optional[str]]]], Optional[float]) -> Tuple[Dict[Tuple[str, int, Optional[str]], Any], Dict[Tuple[str, int, Optional[str]], Exception]]
+        """Calls fn on the clients and gathers the results.
+
+        To run the commands concurrently, fn should issue them with returnfuture=True and return the VisionCommandFuture, e.g. lambda client: client.Ping(returnfuture=True). Otherwise fn is simply called on each client in turn.
+
+        Args:
+            fn (Callable): Called with each client.
+            keys (list, optional): (hostname, commandport, slaverequestid) of the clients to use. If not specified, all clients of the pool.
+            timeout (float, optional): Time in seconds to wait for all results, on top of the timeout of each command. Members not done by then get a VisionControllerTimeoutError.
+
+        Returns:
+            tuple: (results, errors), two dictionaries from (hostname, commandport, slaverequestid) to the result or to the error raised for that client.
+        """
+        if keys is None:
+            keys = self.GetClientKeys()
+        results = {}  # type: Dict[Tuple[str, int, Optional[str]], Any]
+        errors = {}  # type: Dict[Tuple[str, int, Optional[str]], Exception]
+        futures = []  # type: List[Tuple[Tuple[str, int, Optional[str]], VisionCommandFuture]]
+        for key in keys:
+            try:
+                result = fn(self.GetClient(*key))
+            except Exception as e:
+                errors[key] = e
+                continue
+            if isinstance(result, VisionCommandFuture):
+                futures.append((key, result))
+            else:
+                results[key] = result
+
+        starttime = time.monotonic()
+        for key, future in futures:
+            remaining = None
+            if timeout is not None:
+                remaining = max(0.0, starttime + timeout - time.monotonic())
+            try:
+                results[key] = future.result(timeout=remaining)
+            except Exception as e:
+                if not future.done():
+                    future.cancel()
+                    e = VisionControllerTimeoutError(_('Timed out after %.03f seconds waiting for %s:%d slaverequestid=%s') % (timeout, key[0], key[1], key[2]), errortype='timeout')
+                errors[key] = e
+        return results, errors
+
+    def Ping(self, timeout=2.0, keys=None):
+        # type: (float, Optional[List[Tuple[str, int, Optional[str]]]]) -> Tuple[Dict, Dict]
+        """Pings the vision managers of the clients concurrently. See FanOut for the returned value.
+
+        Args:
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            keys (list, optional): (hostname, commandport, slaverequestid) of the clients to use. If not specified, all clients of the pool.
+        """
+        return self.FanOut(lambda client: client.Ping(timeout=timeout, returnfuture=True), keys=keys)
+
+    def GetLatestDetectedObjects(self, taskId=None, cycleIndex=None, taskType=None, timeout=2.0, keys=None):
+        # type: (Optional[str], Optional[str], Optional[str], float, Optional[List[Tuple[str, int, Optional[str]]]]) -> Tuple[Dict, Dict]
+        """Gets the latest detected objects from the clients concurrently. See FanOut for the returned value.
+
+        Args:
+            taskId (str, optional): If specified, the taskId to retrieve the detected objects from.
+            cycleIndex (str, optional): Unique cycle index string for tracking, backing up, and differentiating cycles.
+            taskType (str, optional): The task type to retrieve the detected objects from.
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 2.0)
+            keys (list, optional): (hostname, commandport, slaverequestid) of the clients to use. If not specified, all clients of the pool.
+        """
+        return self.FanOut(lambda client: client.GetLatestDetectedObjects(taskId=taskId, cycleIndex=cycleIndex, taskType=taskType, timeout=timeout, returnfuture=True), keys=keys)
+
+    def GetTaskStateService(self, taskId=None, cycleIndex=None, taskType=None, timeout=4.0, keys=None):
+        # type: (Optional[str], Optional[str], Optional[str], float, Optional[List[Tuple[str, int, Optional[str]]]]) -> Tuple[Dict, Dict]
+        """Gets the task states from the clients concurrently. See FanOut for the returned value.
+
+        Args:
+            taskId (str, optional): The taskId to retrieve the state from.
+            cycleIndex (str, optional): Unique cycle index string for tracking, backing up, and differentiating cycles.
+            taskType (str, optional): The taskType for which the status was requested.
+            timeout (float, optional): Time in seconds after which the command is assumed to have failed. (Default: 4.0)
+            keys (list, optional): (hostname, commandport, slaverequestid) of the clients to use. If not specified, all clients of the pool.
+        """
+        return self.FanOut(lambda client: client.GetTaskStateService(taskId=taskId, cycleIndex=cycleIndex, taskType=taskType, timeout=timeout, returnfuture=True), keys=keys)